@@ -0,0 +1,87 @@
+"""Compare json codecs on eth_getBlockByNumber responses of increasing size.
+
+Usage: python bench/codec.py [rounds]
+"""
+
+# standard imports
+import os
+import sys
+import timeit
+
+# local imports
+from chainlib.eth.codec import (
+        JSONCodec,
+        OrjsonCodec,
+        orjson,
+        )
+
+
+def h(n):
+    return '0x' + os.urandom(n).hex()
+
+
+def block_response(tx_count):
+    txs = []
+    for i in range(tx_count):
+        txs.append({
+            'hash': h(32),
+            'blockHash': h(32),
+            'blockNumber': '0xe4e1c0',
+            'transactionIndex': hex(i),
+            'from': h(20),
+            'to': h(20),
+            'value': hex(10**18),
+            'nonce': hex(i),
+            'gas': '0x5208',
+            'gasPrice': '0x3b9aca00',
+            'maxFeePerGas': '0x4a817c800',
+            'maxPriorityFeePerGas': '0x3b9aca00',
+            'input': h(196),
+            'type': '0x2',
+            'chainId': '0x1',
+            'accessList': [],
+            'v': '0x1',
+            'r': h(32),
+            's': h(32),
+            })
+    return {
+        'jsonrpc': '2.0',
+        'id': 1,
+        'result': {
+            'hash': h(32),
+            'parentHash': h(32),
+            'number': '0xe4e1c0',
+            'timestamp': '0x62c4e2a1',
+            'miner': h(20),
+            'gasLimit': '0x1c9c380',
+            'gasUsed': '0x1c9c380',
+            'baseFeePerGas': '0x3b9aca00',
+            'logsBloom': h(256),
+            'extraData': h(32),
+            'transactions': txs,
+            'uncles': [],
+            },
+        }
+
+
+def main():
+    rounds = 20
+    if len(sys.argv) > 1:
+        rounds = int(sys.argv[1])
+    codecs = [JSONCodec()]
+    if orjson != None:
+        codecs.append(OrjsonCodec())
+    else:
+        sys.stderr.write('orjson not installed, only measuring stdlib json\n')
+
+    for tx_count in [10, 100, 500, 1000]:
+        o = block_response(tx_count)
+        data = JSONCodec().dumps(o).encode('utf-8')
+        for c in codecs:
+            t_loads = timeit.timeit(lambda: c.loads(data), number=rounds) / rounds
+            t_dumps = timeit.timeit(lambda: c.dumps(o), number=rounds) / rounds
+            print('{} txs\t{} bytes\t{}\tloads {:.3f} ms\tdumps {:.3f} ms'.format(tx_count, len(data), c.name, t_loads * 1000, t_dumps * 1000))
+
+
+if __name__ == '__main__':
+    main()
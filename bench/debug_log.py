@@ -0,0 +1,130 @@
+"""Measure the share of transaction and ABI coding time spent on logging when debug logging is disabled.
+
+Runs are interleaved, and the fastest run of each kind is compared, to even out noise.
+
+Usage: python bench/debug_log.py [rounds] [ops]
+"""
+
+# standard imports
+import os
+import sys
+import time
+import logging
+
+# external imports
+from funga.eth.keystore.dict import DictKeystore
+from funga.eth.signer import EIP155Signer
+from chainlib.chain import ChainSpec
+
+# local imports
+import chainlib.eth.tx
+import chainlib.eth.contract
+from chainlib.eth.tx import (
+        TxFactory,
+        TxFormat,
+        SenderCache,
+        unpack,
+        )
+from chainlib.eth.contract import (
+        ABIContractEncoder,
+        ABIContractDecoder,
+        ABIContractType,
+        )
+from chainlib.eth.nonce import OverrideNonceOracle
+from chainlib.eth.gas import OverrideGasOracle
+
+
+class NullLogger:
+
+    def isEnabledFor(self, level):
+        return False
+
+
+    def debug(self, *args, **kwargs):
+        pass
+
+    info = debug
+    warning = debug
+
+
+def setup():
+    chain_spec = ChainSpec('evm', 'foo', 42)
+    keystore = DictKeystore()
+    signer = EIP155Signer(keystore)
+    address = keystore.new()
+    c = TxFactory(chain_spec, signer=signer, gas_oracle=OverrideGasOracle(price=100, limit=21000), nonce_oracle=OverrideNonceOracle(address, 42))
+    tx = c.template(address, address)
+    tx = c.set_code(tx, os.urandom(128).hex())
+    (tx_hash_hex, tx_raw_hex) = c.finalize(tx, tx_format=TxFormat.RLP_SIGNED)
+    tx_raw = bytes.fromhex(tx_raw_hex[2:])
+
+    e = ABIContractEncoder()
+    e.uint256(42)
+    e.address(address)
+    e.string('foo')
+    data = e.get_contents()
+    return (chain_spec, address, tx_raw, data,)
+
+
+def run_ops(n, chain_spec, address, tx_raw, data):
+    for i in range(n):
+        unpack(tx_raw, chain_spec)
+
+        e = ABIContractEncoder()
+        e.method('foo')
+        e.typ(ABIContractType.UINT256)
+        e.typ(ABIContractType.ADDRESS)
+        e.typ(ABIContractType.STRING)
+        e.uint256(42)
+        e.address(address)
+        e.string('foo')
+        e.get()
+
+        d = ABIContractDecoder()
+        d.typ(ABIContractType.UINT256)
+        d.typ(ABIContractType.ADDRESS)
+        d.typ(ABIContractType.STRING)
+        d.val(data[:64])
+        d.val(data[64:128])
+        d.val(data[128:])
+        d.decode()
+
+
+def measure(n, args):
+    start = time.perf_counter()
+    run_ops(n, *args)
+    return time.perf_counter() - start
+
+
+def main():
+    rounds = 7
+    ops = 1000
+    if len(sys.argv) > 1:
+        rounds = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        ops = int(sys.argv[2])
+
+    logging.getLogger('chainlib.eth').setLevel(logging.WARNING)
+    # recover the sender every time, as without cache
+    chainlib.eth.tx.sender_cache = SenderCache(size=0)
+    args = setup()
+    loggers = (chainlib.eth.tx.logg, chainlib.eth.contract.logg,)
+    null = NullLogger()
+
+    run_ops(10, *args)
+    t_logging = []
+    t_null = []
+    for i in range(rounds):
+        (chainlib.eth.tx.logg, chainlib.eth.contract.logg) = loggers
+        t_logging.append(measure(ops, args))
+        chainlib.eth.tx.logg = null
+        chainlib.eth.contract.logg = null
+        t_null.append(measure(ops, args))
+    t_logging = min(t_logging)
+    t_null = min(t_null)
+    overhead = (t_logging - t_null) / t_logging
+    print('logging overhead {:.2%} ({:.4f}s with logging, {:.4f}s without, {} ops)'.format(overhead, t_logging, t_null, ops))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 # standard imports
 import logging
 import datetime
+import collections.abc
 
 # external imports
 from chainlib.jsonrpc import JSONRPCRequest
@@ -9,13 +10,20 @@ from hexathon import (
         add_0x,
         strip_0x,
         compact,
+        uniform,
         to_int as hex_to_int,
         )
 
 # local imports
-from chainlib.eth.tx import Tx
+from chainlib.eth.tx import (
+        Tx,
+        LazyTx,
+        )
 from chainlib.eth.tx import eth_dialect_filter
-from .src import Src
+from .src import (
+        Src,
+        block_schema,
+        )
 
 logg = logging.getLogger(__name__)
 
@@ -84,6 +92,52 @@ def syncing(id_generator=None):
     return j.finalize(o)
 
 
+class BlockTxs(collections.abc.Sequence):
+    """Read-only sequence view of the transactions in a block.
+
+    Transaction objects are created only when an index is accessed, and are kept for subsequent access. The transaction objects are chainlib.eth.tx.LazyTx, which parse the transaction fields only when they are accessed.
+
+    The view is reset if the transaction list of the block is replaced.
+
+    :param block: Block, with transaction data
+    :type block: chainlib.eth.block.Block
+    :param dialect_filter: Dialect filter to apply to transactions
+    :type dialect_filter: chainlib.eth.dialect.DialectFilter
+    """
+
+    tx_generator = LazyTx
+
+    def __init__(self, block, dialect_filter=eth_dialect_filter):
+        self.block = block
+        self.dialect_filter = dialect_filter
+        self.__src = None
+        self.__txs = {}
+
+
+    def __len__(self):
+        return len(self.block.txs)
+
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if self.__src is not self.block.txs:
+            self.__src = self.block.txs
+            self.__txs = {}
+        if idx < 0:
+            idx += len(self.__src)
+        tx = self.__txs.get(idx)
+        if tx == None:
+            src = self.__src[idx]
+            if not isinstance(src, dict):
+                raise ValueError('block {} has no transaction data for tx {}'.format(self.block.hash, src))
+            tx = self.tx_generator(src, dialect_filter=self.dialect_filter)
+            tx.block = self.block
+            tx.index = idx
+            self.__txs[idx] = tx
+        return tx
+
+
 class Block(BaseBlock, Src):
     """Encapsulates an Ethereum block
 
@@ -93,8 +147,13 @@ class Block(BaseBlock, Src):
     """
    
     tx_generator = Tx
+    src_schema = block_schema
 
     def __init__(self, src=None, dialect_filter=None):
+        self.__tx_index_txs = None
+        self.__tx_index_len = 0
+        self.__tx_index_map = None
+        self.__tx_view = None
         super(Block, self).__init__(src=src, dialect_filter=dialect_filter)
 
 
@@ -126,6 +185,7 @@ class Block(BaseBlock, Src):
             self.number = int(strip_0x(self.src['number']), 16)
         except TypeError:
             self.number = int(self.src['number'])
+        self.parent_hash = self.src.get('parent_hash')
         self.txs = self.src['transactions']
         self.block_src = self.src
         try:
@@ -140,22 +200,55 @@ class Block(BaseBlock, Src):
         return super(Block, self).tx_by_index(idx, dialect_filter=dialect_filter)
 
 
-    def tx_index_by_hash(self, tx_hash):
-        i = 0
-        idx = -1
-        tx_hash = add_0x(tx_hash)
-        for tx in self.txs:
-            tx_hash_block = None
+    def tx_view(self, dialect_filter=eth_dialect_filter):
+        """Get a lazy sequence view of the transactions in the block.
+
+        Use this instead of tx_by_index when only some of the transactions, or only some of their fields, are needed.
+
+        :param dialect_filter: Dialect filter to apply to transactions
+        :type dialect_filter: chainlib.eth.dialect.DialectFilter
+        :rtype: chainlib.eth.block.BlockTxs
+        :returns: Transactions view
+        """
+        if self.__tx_view == None or self.__tx_view.dialect_filter != dialect_filter:
+            self.__tx_view = BlockTxs(self, dialect_filter=dialect_filter)
+        return self.__tx_view
+
+
+    def __tx_index(self):
+        # rebuild if the transaction list was replaced, extend if it was appended to
+        n = len(self.txs)
+        if self.__tx_index_txs is self.txs and self.__tx_index_len <= n:
+            i = self.__tx_index_len
+        else:
+            self.__tx_index_map = {}
+            i = 0
+        for tx in self.txs[i:]:
             try:
-                tx_hash_block = add_0x(tx['hash'])
+                tx_hash = tx['hash']
             except TypeError:
-                tx_hash_block = add_0x(tx)
-            if tx_hash_block == tx_hash:
-                idx = i
-                break
+                tx_hash = tx
+            self.__tx_index_map.setdefault(uniform(strip_0x(tx_hash)), i)
             i += 1
-        if idx == -1:
-            raise AttributeError('tx {} not found in block {}'.format(tx_hash, self.hash))
+        self.__tx_index_txs = self.txs
+        self.__tx_index_len = n
+        return self.__tx_index_map
+
+
+    def tx_index_by_hash(self, tx_hash):
+        """Get the index of a transaction in the block.
+
+        The lookup uses a map of transaction hashes to indices, built on first use. The map is extended when transactions are appended to the transaction list, and rebuilt when the list is replaced. Changes to existing entries of the list are not detected.
+
+        :param tx_hash: Transaction hash, hex
+        :type tx_hash: str
+        :raises AttributeError: Transaction not in block
+        :rtype: int
+        :returns: Transaction index
+        """
+        idx = self.__tx_index().get(uniform(strip_0x(tx_hash)))
+        if idx == None:
+            raise AttributeError('tx {} not found in block {}'.format(add_0x(tx_hash), self.hash))
         return idx
 
 
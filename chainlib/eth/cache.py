@@ -0,0 +1,292 @@
+# standard imports
+import logging
+import threading
+import collections
+import shelve
+import time
+
+# external imports
+from hexathon import strip_0x
+from chainlib.connection import error_parser
+
+# local imports
+from . import codec
+from .connection import EthConnection
+from .block import block_latest
+
+logg = logging.getLogger(__name__)
+
+DEFAULT_FINALITY_DEPTH = 64
+
+
+class LRUCache:
+    """Thread-safe in-memory least-recently-used cache, with optional persistent backing store.
+
+    Values are stored serialized as json, so that callers modifying a returned value do not change the cached value.
+
+    If path is given, all values are also written to a shelve database at that path. Values missing from memory are looked up there, so that the cache survives restarts.
+
+    :param size: Max number of values to keep in memory
+    :type size: int
+    :param path: Path to persistent store
+    :type path: str
+    """
+
+    def __init__(self, size=1024, path=None):
+        if size < 1:
+            raise ValueError('cache size must be at least 1')
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.store = None
+        if path != None:
+            self.store = shelve.open(path)
+        self.__items = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+
+    def get(self, k):
+        """Retrieve a value from the cache.
+
+        :param k: Cache key
+        :type k: str
+        :rtype: any
+        :returns: Value, or None if not in cache
+        """
+        with self.__lock:
+            v = self.__items.get(k)
+            if v != None:
+                self.__items.move_to_end(k)
+            elif self.store != None:
+                v = self.store.get(k)
+                if v != None:
+                    self.__put(k, v)
+            if v == None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return codec.loads(v)
+
+
+    def __put(self, k, v):
+        self.__items[k] = v
+        self.__items.move_to_end(k)
+        if len(self.__items) > self.size:
+            self.__items.popitem(last=False)
+
+
+    def put(self, k, v):
+        """Add a value to the cache, evicting the least recently used value if the cache is full.
+
+        :param k: Cache key
+        :type k: str
+        :param v: Value; must be json serializable, and not None
+        :type v: any
+        """
+        v = codec.dumps(v)
+        with self.__lock:
+            self.__put(k, v)
+            if self.store != None:
+                self.store[k] = v
+
+
+    def __len__(self):
+        return len(self.__items)
+
+
+    def close(self):
+        """Close the persistent store, if any.
+        """
+        with self.__lock:
+            if self.store != None:
+                self.store.close()
+                self.store = None
+
+
+def _block_number(v):
+    if v == None:
+        return None
+    n = v.get('blockNumber')
+    if n == None:
+        return None
+    return int(strip_0x(n), 16)
+
+
+def _height_param(v):
+    try:
+        return int(strip_0x(v), 16)
+    except (TypeError, ValueError):
+        # block tags like "latest" refer to a moving target
+        return None
+
+
+class EthCacheConnection(EthConnection):
+    """Caches the results of json-rpc requests that cannot change, in front of another connection.
+
+    The results that are cached are:
+
+    - chain id and network version
+    - blocks by hash
+    - blocks by number, transactions by hash and transaction receipts, once the block they are in is finalized
+    - contract code at a given block height, once that block is finalized
+
+    A block is considered finalized when it is at least finality_depth blocks behind the latest block of the node. The latest block height is taken from eth_blockNumber results passing through the cache, and is queried if it is older than head_interval seconds when needed.
+
+    Results of all other requests, and of requests that resulted in error, are passed through untouched.
+
+    :param conn: Connection to cache results of
+    :type conn: chainlib.eth.connection.EthConnection
+    :param cache: Cache to use. If not set, an in-memory cache of size 1024 is used.
+    :type cache: chainlib.eth.cache.LRUCache
+    :param finality_depth: Number of blocks after which a block is considered final
+    :type finality_depth: int
+    :param head_interval: Max age of known latest block height, in seconds
+    :type head_interval: float
+    """
+
+    def __init__(self, conn, cache=None, finality_depth=DEFAULT_FINALITY_DEPTH, head_interval=10.0):
+        if cache == None:
+            cache = LRUCache()
+        self.cache = cache
+        self.conn = conn
+        super(EthCacheConnection, self).__init__(chain_spec=conn.chain_spec, timeout=conn.timeout)
+        self.location = conn.location
+        self.finality_depth = finality_depth
+        self.head_interval = head_interval
+        self.head = None
+        self.__head_time = 0.0
+
+
+    @property
+    def hits(self):
+        """Number of cache hits.
+        """
+        return self.cache.hits
+
+
+    @property
+    def misses(self):
+        """Number of cache misses.
+        """
+        return self.cache.misses
+
+
+    def key(self, o):
+        """Generate the cache key for a json-rpc query.
+
+        :param o: json-rpc query
+        :type o: dict
+        :rtype: str
+        :returns: Cache key, or None if the result of the query may change
+        """
+        m = o['method']
+        p = o['params']
+        if m in ['eth_chainId', 'net_version']:
+            return m
+        if m in ['eth_getBlockByHash', 'eth_getTransactionByHash', 'eth_getTransactionReceipt']:
+            return '{}:{}'.format(m, ':'.join([str(v).lower() for v in p]))
+        if m in ['eth_getBlockByNumber', 'eth_getCode']:
+            if _height_param(p[-1] if m == 'eth_getCode' else p[0]) == None:
+                return None
+            return '{}:{}'.format(m, ':'.join([str(v).lower() for v in p]))
+        return None
+
+
+    def __final(self, n):
+        if n == None:
+            return False
+        if self.head == None or time.monotonic() - self.__head_time > self.head_interval:
+            self.__set_head(self.conn.do(block_latest()))
+        return self.head - n >= self.finality_depth
+
+
+    def __set_head(self, r):
+        self.head = int(strip_0x(r), 16)
+        self.__head_time = time.monotonic()
+
+
+    def cacheable(self, o, r):
+        """Check whether the result of a query cannot change.
+
+        :param o: json-rpc query
+        :type o: dict
+        :param r: Result of query
+        :type r: any
+        :rtype: bool
+        """
+        if r == None:
+            return False
+        m = o['method']
+        if m in ['eth_chainId', 'net_version', 'eth_getBlockByHash']:
+            return True
+        if m == 'eth_getBlockByNumber':
+            return self.__final(_height_param(o['params'][0]))
+        if m == 'eth_getCode':
+            return self.__final(_height_param(o['params'][-1]))
+        return self.__final(_block_number(r))
+
+
+    def __store(self, k, o, r):
+        if r == None or isinstance(r, Exception):
+            return
+        if o['method'] == 'eth_blockNumber':
+            self.__set_head(r)
+        if k == None:
+            return
+        if self.cacheable(o, r):
+            self.cache.put(k, r)
+
+
+    def do(self, o, error_parser=error_parser):
+        """Execute a JSON-RPC query, using the cached result if available.
+
+        See chainlib.eth.connection.EthConnection.do
+
+        A list of queries is passed on to the wrapped connection uncached. Use do_batch to use the cache for several queries.
+        """
+        if not isinstance(o, dict):
+            return self.conn.do(o, error_parser=error_parser)
+        k = self.key(o)
+        if k != None:
+            r = self.cache.get(k)
+            if r != None:
+                logg.debug('({}) cache hit {}'.format(str(self), k))
+                return r
+        r = self.conn.do(o, error_parser=error_parser)
+        self.__store(k, o, r)
+        return r
+
+
+    def do_batch(self, o, error_parser=error_parser, batch_limit=0):
+        """Execute several JSON-RPC queries as json-rpc batch requests. Only queries without cached results are sent to the node.
+
+        See chainlib.eth.connection.EthConnection.do_batch
+        """
+        results = [None] * len(o)
+        keys = [None] * len(o)
+        missing = []
+        for i, v in enumerate(o):
+            k = self.key(v)
+            keys[i] = k
+            if k != None:
+                results[i] = self.cache.get(k)
+            if results[i] == None:
+                missing.append(i)
+
+        if len(missing) > 0:
+            r = self.conn.do_batch([o[i] for i in missing], error_parser=error_parser, batch_limit=batch_limit)
+            for i, v in zip(missing, r):
+                results[i] = v
+                self.__store(keys[i], o[i], v)
+        return results
+
+
+    def disconnect(self):
+        """Disconnect the underlying connection, and close the cache.
+        """
+        self.cache.close()
+        self.conn.disconnect()
+
+
+    def __str__(self):
+        return 'ETH CACHE ' + str(self.conn)
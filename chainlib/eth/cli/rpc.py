@@ -1,6 +1,10 @@
+# standard imports
+import functools
+
 # external imports
 from chainlib.cli import Rpc as BaseRpc
 from chainlib.eth.connection import EthHTTPConnection
+from chainlib.eth.router import EthRouterConnection
 from chainlib.eth.constant import ZERO_ADDRESS
 
 # local imports
@@ -31,8 +35,24 @@ class Rpc(BaseRpc):
         """
 
         If the standard arguments for nonce and fee price/price have been defined (which generate the configuration keys "_NONCE", "_FEE_PRICE" and "_FEE_LIMIT" respectively) , the corresponding overrides for fee and nonce generators will be defined.
+
+        If the "RPC_POOL_SIZE" configuration key is set to a positive value, the connection will keep a pool of that many persistent connections to the node.
+
+        If the "RPC_PROVIDER" configuration key is a comma-separated list of urls, requests are routed across all of them with chainlib.eth.router.EthRouterConnection, and the pool size applies to each http node.
     
         """
+        pool_size = 0
+        try:
+            pool_size = int(config.get('RPC_POOL_SIZE') or 0)
+        except KeyError:
+            pass
+        if pool_size > 0:
+            self.constructor = functools.partial(EthHTTPConnection, pool_size=pool_size)
+        if ',' in config.get('RPC_PROVIDER'):
+            self.constructor = EthRouterConnection
+            if pool_size > 0:
+                self.constructor = functools.partial(EthRouterConnection, pool_size=pool_size)
+
         super(Rpc, self).connect_by_config(config)
 
         if self.can_sign():
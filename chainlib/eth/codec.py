@@ -0,0 +1,110 @@
+# standard imports
+import json
+import logging
+
+# external imports
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logg = logging.getLogger(__name__)
+
+
+class JSONCodec:
+    """Codec for serializing json-rpc payloads, using the standard library json module.
+
+    Output is compact, without whitespace between separators.
+
+    Codec implementations must provide the dumps and loads methods.
+    """
+
+    name = 'json'
+
+    def dumps(self, o):
+        """Serialize object to json.
+
+        :param o: Object to serialize
+        :type o: any
+        :rtype: str
+        :returns: Serialized object
+        """
+        return json.dumps(o, separators=(',', ':'))
+
+
+    def loads(self, s):
+        """Deserialize object from json.
+
+        :param s: Serialized object
+        :type s: str or bytes
+        :raises ValueError: Invalid json
+        :rtype: any
+        :returns: Object
+        """
+        return json.loads(s)
+
+
+    def __str__(self):
+        return self.name
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec using the orjson module, which is considerably faster on large payloads.
+
+    Objects that orjson cannot serialize, such as integers outside the 64 bit range, are serialized with the standard library json module instead.
+
+    Integers outside the 64 bit range are deserialized as float. The Ethereum json-rpc specification encodes quantities as hex strings, so this only affects nodes that deviate from it. Use the chainlib.eth.codec.JSONCodec with such nodes.
+    """
+
+    name = 'orjson'
+
+    def dumps(self, o):
+        try:
+            return orjson.dumps(o).decode('utf-8')
+        except TypeError:
+            return super(OrjsonCodec, self).dumps(o)
+
+
+    def loads(self, s):
+        return orjson.loads(s)
+
+
+def default_codec():
+    """Get the fastest available codec.
+
+    :rtype: chainlib.eth.codec.JSONCodec
+    :returns: Codec
+    """
+    if orjson != None:
+        return OrjsonCodec()
+    return JSONCodec()
+
+
+codec = default_codec()
+logg.debug('using json codec {}'.format(codec))
+
+
+def set_codec(v):
+    """Set the codec used for all json-rpc connections.
+
+    :param v: Codec
+    :type v: chainlib.eth.codec.JSONCodec
+    """
+    global codec
+    codec = v
+
+
+def dumps(o):
+    """Serialize object to json with the current codec.
+
+    See chainlib.eth.codec.JSONCodec.dumps
+    """
+    return codec.dumps(o)
+
+
+def loads(s):
+    """Deserialize object from json with the current codec.
+
+    See chainlib.eth.codec.JSONCodec.loads
+    """
+    return codec.loads(s)
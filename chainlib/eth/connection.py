@@ -1,23 +1,41 @@
 # standard imports
+import re
 import copy
 import logging
-import json
-import datetime
-import time
 import socket
+import base64
+import asyncio
+import threading
+import collections
 from urllib.request import (
         Request,
         urlopen,
+        build_opener,
+        install_opener,
         )
+from urllib.error import URLError
 
 # third-party imports
+import websocket
 from hexathon import (
         add_0x,
         strip_0x,
         )
 
 # local imports
-from .error import RevertEthException
+from . import codec
+from .jsonrpc import jsonrpc_batch_result
+from .src import log_schema
+from .poll import (
+        ReceiptPoller,
+        poll_receipts,
+        poll_receipts_async,
+        )
+from .http import (
+        HTTPConnectionPool,
+        AsyncHTTPConnectionPool,
+        DEFAULT_POOL_SIZE,
+        )
 from chainlib.eth.dialect import DefaultErrorParser
 from .sign import (
         sign_transaction,
@@ -25,6 +43,8 @@ from .sign import (
 from chainlib.connection import (
         ConnType,
         RPCConnection,
+        HTTPConnection,
+        UnixConnection,
         JSONRPCHTTPConnection,
         JSONRPCUnixConnection,
         error_parser,
@@ -33,21 +53,166 @@ from chainlib.jsonrpc import (
         JSONRPCRequest,
         jsonrpc_result,
         )
+from chainlib.http import PreemptiveBasicAuthHandler
+from chainlib.error import RPCException
 from chainlib.eth.tx import (
         unpack,
         )
-from potaahto.symbols import snake_and_camel
+from chainlib.eth.block import Block
 
 logg = logging.getLogger(__name__)
 
 
-class EthHTTPConnection(JSONRPCHTTPConnection):
-    """HTTP Interface for Ethereum node JSON-RPC
+def _ssl_context(verify_identity):
+    ssl_ctx = None
+    if not verify_identity:
+        import ssl
+        ssl_ctx = ssl.SSLContext()
+        ssl_ctx.verify_mode = ssl.CERT_NONE
+    return ssl_ctx
 
-    :todo: support https
+
+def _http_headers(conn):
+    headers = {
+        'Content-Type': 'application/json',
+        }
+    if conn.auth != None:
+        p = conn.auth.urllib_header()
+        headers[p[0]] = p[1]
+    elif conn.basic != None:
+        v = '{}:{}'.format(conn.basic[0], conn.basic[1])
+        v = base64.b64encode(v.encode('utf-8')).decode('ascii')
+        headers['Authorization'] = 'Basic ' + v
+    return headers
+
+
+def _jsonrpc_result(o, result, error_parser):
+    if type(result).__name__ != 'list':
+        if o['id'] != result['id']:
+            raise ValueError('RPC id mismatch; sent {} received {}'.format(o['id'], result['id']))
+        return jsonrpc_result(result, error_parser)
+
+    results = []
+    for i in range(len(o)):
+        if o[i]['id'] != result[i]['id']:
+            raise ValueError('RPC id mismatch; sent {} received {}'.format(o[i]['id'], result[i]['id']))
+        results.append(jsonrpc_result(result[i], error_parser))
+    return results
+
+
+_json_token = re.compile(rb'[\[\]{}"\\]')
+
+
+class _JSONScanner:
+    # A node may keep the socket open, so a response is done as soon as it is a complete json value.
+    # The nesting depth is tracked across chunks, so that every received byte is only scanned once.
+
+    def __init__(self):
+        self.depth = 0
+        self.string = False
+        self.escaped = -1
+        self.offset = 0
+
+
+    def feed(self, b):
+        for m in _json_token.finditer(b):
+            pos = self.offset + m.start()
+            if pos == self.escaped:
+                continue
+            c = b[m.start()]
+            if self.string:
+                if c == 0x5c:
+                    self.escaped = pos + 1
+                elif c == 0x22:
+                    self.string = False
+            elif c == 0x22:
+                self.string = True
+            elif c == 0x7b or c == 0x5b:
+                self.depth += 1
+            elif c == 0x7d or c == 0x5d:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.offset += len(b)
+                    return True
+        self.offset += len(b)
+        return False
+
+
+class EthConnection(RPCConnection):
+    """Base class for blocking interfaces to Ethereum node JSON-RPC.
+
+    Implementations must provide the _request method, which sends a serialized json-rpc payload to the node and returns the serialized response.
     """
 
-    def wait(self, tx_hash_hex, delay=0.5, timeout=0.0, error_parser=error_parser, id_generator=None):
+    def _request(self, data):
+        raise NotImplementedError()
+
+
+    def _request_query(self, o, data):
+        """Send a json-rpc query to the node.
+
+        Implementations that need the query object itself, and not only the serialized payload, may override this method to avoid parsing the payload again.
+
+        :param o: JSON-RPC query object, or list of query objects for a batch
+        :type o: dict or list
+        :param data: Serialized json-rpc payload
+        :type data: str
+        :rtype: bytes
+        :returns: Response body
+        """
+        return self._request(data)
+
+
+    def do(self, o, error_parser=error_parser):
+        """Execute a JSON-RPC query, from dict as generated by chainlib.jsonrpc.JSONRPCRequest:finalize.
+
+        See chainlib.connection.JSONRPCHTTPConnection.do
+        """
+        data = codec.dumps(o)
+        debug = logg.isEnabledFor(logging.DEBUG)
+        if debug:
+            logg.debug('({}) send {}'.format(str(self), data))
+        resp = self._request_query(o, data)
+        if debug:
+            logg.debug('({}) recv {}'.format(str(self), resp.decode('utf-8')))
+        result = codec.loads(resp)
+        return _jsonrpc_result(o, result, error_parser)
+
+
+    def do_batch(self, o, error_parser=error_parser, batch_limit=0):
+        """Execute several JSON-RPC queries as json-rpc batch requests.
+
+        Each query is a dict as generated by chainlib.jsonrpc.JSONRPCRequest:finalize, for example by any of the query builders in this package. Results are returned in the order of the queries, regardless of the order the node responds in.
+
+        An error in one of the queries does not fail the batch. Instead the exception generated by the error parser is returned in place of the result for that query.
+
+        :param o: JSON-RPC query objects
+        :type o: list of dict
+        :param error_parser: Error parser object to process JSON-RPC error responses with.
+        :type error_parser: chainlib.jsonrpc.ErrorParser
+        :param batch_limit: Maximum number of queries per batch request (0 = no limit)
+        :type batch_limit: int
+        :raises ValueError: Invalid response from JSON-RPC endpoint
+        :raises chainlib.error.RPCException: Endpoint could not be reached
+        :rtype: list
+        :returns: Result values, or exception objects for queries that resulted in error
+        """
+        results = []
+        if len(o) == 0:
+            return results
+        if batch_limit <= 0:
+            batch_limit = len(o)
+        for i in range(0, len(o), batch_limit):
+            batch = o[i:i+batch_limit]
+            data = codec.dumps(batch)
+            logg.debug('({}) send batch of {}'.format(str(self), len(batch)))
+            r = self._request_query(batch, data)
+            r = codec.loads(r)
+            results += jsonrpc_batch_result(batch, r, error_parser)
+        return results
+
+
+    def wait(self, tx_hash_hex, delay=0.5, timeout=0.0, error_parser=error_parser, id_generator=None, strategy=None):
         """Poll for confirmation of a transaction on network.
 
         Returns the result of the transaction if it was successfully executed on the network, and raises RevertEthException if execution fails.
@@ -56,7 +221,7 @@ class EthHTTPConnection(JSONRPCHTTPConnection):
 
         :param tx_hash_hex: Transaction hash to wait for, hex
         :type tx_hash_hex: str
-        :param delay: Polling interval
+        :param delay: Polling interval, if no strategy is given
         :type delay: float
         :param timeout: Max time to wait for confirmation (0 = no timeout)
         :type timeout: float
@@ -64,49 +229,129 @@ class EthHTTPConnection(JSONRPCHTTPConnection):
         :type error_parser: chainlib.jsonrpc.ErrorParser
         :param id_generator: json-rpc id generator
         :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        :param strategy: Polling strategy, see chainlib.eth.poll.PollStrategy
+        :type strategy: chainlib.eth.poll.PollStrategy
         :raises TimeoutError: Timeout reached
         :raises chainlib.eth.error.RevertEthException: Transaction confirmed but failed
         :rtype: dict
         :returns: Transaction receipt
         """
-        t = datetime.datetime.utcnow()
-        i = 0
-        while True:
-            j = JSONRPCRequest(id_generator)
-            o = j.template()
-            o['method'] ='eth_getTransactionReceipt'
-            o['params'].append(add_0x(tx_hash_hex))
-            o = j.finalize(o)
-            req = Request(
-                    self.location,
-                    method='POST',
+        poller = ReceiptPoller([tx_hash_hex], delay=delay, timeout=timeout, id_generator=id_generator, strategy=strategy)
+        for e in poll_receipts(self, poller, error_parser=error_parser):
+            return e
+
+
+    def wait_many(self, tx_hashes_hex, delay=0.5, timeout=0.0, error_parser=error_parser, id_generator=None, ignore=[], ignore_all=False, batch_limit=0, strategy=None):
+        """Poll for confirmation of several transactions on network.
+
+        All transactions not yet confirmed are polled together in one json-rpc batch request per polling interval. Receipts are yielded in the order the transactions are confirmed.
+
+        If execution of a transaction fails, RevertEthException is raised, unless the transaction hash is in the ignore list or ignore_all is set. In that case the receipt of the failed transaction is yielded like any other.
+
+        This is a blocking call.
+
+        :param tx_hashes_hex: Transaction hashes to wait for, hex
+        :type tx_hashes_hex: list of str
+        :param delay: Polling interval, if no strategy is given
+        :type delay: float
+        :param timeout: Max time to wait for confirmation of all transactions (0 = no timeout)
+        :type timeout: float
+        :param error_parser: json-rpc response error parser
+        :type error_parser: chainlib.jsonrpc.ErrorParser
+        :param id_generator: json-rpc id generator
+        :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        :param ignore: Transaction hashes for which to ignore execution failures, hex
+        :type ignore: list of str
+        :param ignore_all: Ignore execution failures of all transactions
+        :type ignore_all: bool
+        :param batch_limit: Maximum number of queries per batch request (0 = no limit)
+        :type batch_limit: int
+        :param strategy: Polling strategy, see chainlib.eth.poll.PollStrategy
+        :type strategy: chainlib.eth.poll.PollStrategy
+        :raises TimeoutError: Timeout reached
+        :raises chainlib.eth.error.RevertEthException: Transaction confirmed but failed
+        :rtype: generator of dict
+        :returns: Transaction receipts
+        """
+        poller = ReceiptPoller(tx_hashes_hex, delay=delay, timeout=timeout, id_generator=id_generator, ignore=ignore, ignore_all=ignore_all, strategy=strategy)
+        for e in poll_receipts(self, poller, error_parser=error_parser, batch_limit=batch_limit):
+            yield e
+
+
+class EthHTTPConnection(EthConnection, JSONRPCHTTPConnection):
+    """HTTP Interface for Ethereum node JSON-RPC
+
+    If pool_size is set, requests are sent over a pool of persistent (keep-alive) connections of that size, shared by all calls to the same connection object and safe to use from several threads. Otherwise, a new connection is opened for every request.
+
+    :param pool_size: Number of persistent connections to keep open to the node (0 = no connection reuse)
+    :type pool_size: int
+    :todo: support https
+    """
+
+    def __init__(self, url=None, chain_spec=None, auth=None, verify_identity=True, timeout=1.0, pool_size=0):
+        self.pool = None
+        super(EthHTTPConnection, self).__init__(url=url, chain_spec=chain_spec, auth=auth, verify_identity=verify_identity, timeout=timeout)
+        if url != None and pool_size > 0:
+            self.pool = HTTPConnectionPool(self.location, size=pool_size, timeout=timeout, ssl_context=_ssl_context(self.verify_identity))
+            self.headers = _http_headers(self)
+
+
+    def _request(self, data):
+        """Send a serialized json-rpc payload to the node.
+
+        Applies the same authentication and identity verification settings as chainlib.connection.JSONRPCHTTPConnection.do.
+
+        :param data: Serialized json-rpc payload
+        :type data: str
+        :raises chainlib.error.RPCException: Endpoint could not be reached
+        :rtype: bytes
+        :returns: Response body
+        """
+        if self.pool != None:
+            try:
+                return self.pool.request(data.encode('utf-8'), headers=self.headers)
+            except URLError as e:
+                raise RPCException(e)
+
+        req = Request(
+                self.location,
+                method='POST',
+                )
+        req.add_header('Content-Type', 'application/json')
+
+        if self.auth != None:
+            p = self.auth.urllib_header()
+            req.add_header(p[0], p[1])
+
+        if self.basic != None:
+            handler = PreemptiveBasicAuthHandler()
+            handler.add_password(
+                    realm=None,
+                    uri=self.location,
+                    user=self.basic[0],
+                    passwd=self.basic[1],
                     )
-            req.add_header('Content-Type', 'application/json')
-            data = json.dumps(o)
-            logg.debug('({}) poll receipt attempt {} {}'.format(str(self), i, data))
-            res = urlopen(req, data=data.encode('utf-8'))
-            r = json.load(res)
-
-            e = jsonrpc_result(r, error_parser)
-            if e != None:
-                e = snake_and_camel(e)
-                # In openethereum we encounter receipts that have NONE block hashes and numbers. WTF...
-                logg.debug('({}) poll receipt received {}'.format(str(self), r))
-                if e['block_hash'] == None:
-                    logg.warning('poll receipt attempt {} returned receipt but with a null block hash value!'.format(i))
-                else:
-                    logg.debug('e {}'.format(strip_0x(e['status'])))
-                    if strip_0x(e['status']) == '00':
-                        raise RevertEthException(tx_hash_hex)
-                    return e
-
-            if timeout > 0.0:
-                delta = (datetime.datetime.utcnow() - t) + datetime.timedelta(seconds=delay)
-                if  delta.total_seconds() >= timeout:
-                    raise TimeoutError(tx_hash)
-
-            time.sleep(delay)
-            i += 1
+            ho = build_opener(handler)
+            install_opener(ho)
+
+        try:
+            r = urlopen(
+                req,
+                data=data.encode('utf-8'),
+                context=_ssl_context(self.verify_identity),
+                timeout=self.timeout,
+                )
+        except URLError as e:
+            raise RPCException(e)
+
+        return r.read()
+
+
+    def disconnect(self):
+        """Close any idle pooled connections.
+        """
+        if self.pool != None:
+            self.pool.close()
 
 
     def __str__(self):
@@ -126,15 +371,627 @@ class EthHTTPConnection(JSONRPCHTTPConnection):
         req = j.finalize(req)
         r = self.do(req)
  
-
-class EthUnixConnection(JSONRPCUnixConnection):
+class EthUnixConnection(EthConnection, JSONRPCUnixConnection):
     """Unix socket implementation of Ethereum JSON-RPC
     """
 
-    def wait(self, tx_hash_hex, delay=0.5, timeout=0.0, error_parser=error_parser):
-        """See EthHTTPConnection. Not yet implemented for unix socket.
+    def _request(self, data):
+        """Send a serialized json-rpc payload to the node.
+
+        Every request opens its own socket connection. The response is complete when a full json value has been received, or the node closes the connection.
+
+        :param data: Serialized json-rpc payload
+        :type data: str
+        :raises chainlib.error.RPCException: Endpoint could not be reached
+        :rtype: bytes
+        :returns: Response body
+        """
+        conn = socket.socket(family=socket.AF_UNIX, type=socket.SOCK_STREAM, proto=0)
+        conn.settimeout(self.timeout)
+        try:
+            conn.connect(self.location)
+            data = data.encode('utf-8')
+            n = 0
+            while n < len(data):
+                c = conn.send(data[n:])
+                if c == 0:
+                    raise IOError('unix socket ({}/{}) {}'.format(n, len(data), data))
+                n += c
+            r = []
+            scanner = _JSONScanner()
+            while True:
+                b = conn.recv(4096)
+                if len(b) == 0:
+                    break
+                r.append(b)
+                if scanner.feed(b):
+                    break
+            r = b''.join(r)
+        except OSError as e:
+            raise RPCException(e)
+        finally:
+            conn.close()
+        return r
+
+
+    def __str__(self):
+        return 'ETH UNIX JSONRPC'
+
+
+class AsyncEthConnection(RPCConnection):
+    """Base class for asyncio interfaces to Ethereum node JSON-RPC.
+
+    Implementations must provide the _request coroutine, which sends a serialized json-rpc payload to the node and returns the serialized response.
+    """
+
+    async def _request(self, data):
+        raise NotImplementedError()
+
+
+    async def do(self, o, error_parser=error_parser):
+        """Execute a JSON-RPC query.
+
+        See chainlib.eth.connection.EthConnection.do
+        """
+        data = codec.dumps(o)
+        debug = logg.isEnabledFor(logging.DEBUG)
+        if debug:
+            logg.debug('({}) send {}'.format(str(self), data))
+        resp = await self._request(data)
+        if debug:
+            logg.debug('({}) recv {}'.format(str(self), resp.decode('utf-8')))
+        result = codec.loads(resp)
+        return _jsonrpc_result(o, result, error_parser)
+
+
+    async def do_batch(self, o, error_parser=error_parser, batch_limit=0):
+        """Execute several JSON-RPC queries as json-rpc batch requests.
+
+        If the queries are split into several batches, the batches are sent concurrently.
+
+        See chainlib.eth.connection.EthConnection.do_batch
+        """
+        if len(o) == 0:
+            return []
+        if batch_limit <= 0:
+            batch_limit = len(o)
+        batches = []
+        for i in range(0, len(o), batch_limit):
+            batches.append(o[i:i+batch_limit])
+
+        async def send(batch):
+            data = codec.dumps(batch)
+            logg.debug('({}) send batch of {}'.format(str(self), len(batch)))
+            r = await self._request(data)
+            r = codec.loads(r)
+            return jsonrpc_batch_result(batch, r, error_parser)
+
+        results = []
+        for r in await asyncio.gather(*[send(batch) for batch in batches]):
+            results += r
+        return results
+
+
+    async def wait(self, tx_hash_hex, delay=0.5, timeout=0.0, error_parser=error_parser, id_generator=None, strategy=None):
+        """Poll for confirmation of a transaction on network.
+
+        See chainlib.eth.connection.EthConnection.wait
+        """
+        poller = ReceiptPoller([tx_hash_hex], delay=delay, timeout=timeout, id_generator=id_generator, strategy=strategy)
+        async for e in poll_receipts_async(self, poller, error_parser=error_parser):
+            return e
+
+
+    async def wait_many(self, tx_hashes_hex, delay=0.5, timeout=0.0, error_parser=error_parser, id_generator=None, ignore=[], ignore_all=False, batch_limit=0, strategy=None):
+        """Poll for confirmation of several transactions on network.
+
+        See chainlib.eth.connection.EthConnection.wait_many
+        """
+        poller = ReceiptPoller(tx_hashes_hex, delay=delay, timeout=timeout, id_generator=id_generator, ignore=ignore, ignore_all=ignore_all, strategy=strategy)
+        async for e in poll_receipts_async(self, poller, error_parser=error_parser, batch_limit=batch_limit):
+            yield e
+
+
+    async def close(self):
+        """Release any resources held by the connection.
+        """
+        pass
+
+
+class AsyncEthHTTPConnection(AsyncEthConnection, HTTPConnection):
+    """Asyncio interface for Ethereum node JSON-RPC over HTTP.
+
+    Accepts the same query objects as chainlib.eth.connection.EthHTTPConnection. Requests are sent over a pool of at most pool_size persistent connections. Requests made while all connections are in use wait for one to become available.
+
+    The pool must be released with the close method when the connection is no longer needed.
+
+    :param pool_size: Maximum number of concurrent connections to the node
+    :type pool_size: int
+    """
+
+    def __init__(self, url=None, chain_spec=None, auth=None, verify_identity=True, timeout=1.0, pool_size=DEFAULT_POOL_SIZE):
+        self.pool = None
+        super(AsyncEthHTTPConnection, self).__init__(url=url, chain_spec=chain_spec, auth=auth, verify_identity=verify_identity, timeout=timeout)
+        if url != None:
+            self.pool = AsyncHTTPConnectionPool(self.location, size=pool_size, timeout=timeout, ssl_context=_ssl_context(self.verify_identity))
+            self.headers = _http_headers(self)
+
+
+    async def _request(self, data):
+        try:
+            return await self.pool.request(data.encode('utf-8'), headers=self.headers)
+        except URLError as e:
+            raise RPCException(e)
+
+
+    async def close(self):
+        """Close all idle connections to the node.
+        """
+        if self.pool != None:
+            await self.pool.close()
+
+
+    def __str__(self):
+        return 'ETH HTTP JSONRPC ASYNC'
+
+
+class AsyncEthUnixConnection(AsyncEthConnection, UnixConnection):
+    """Asyncio interface for Ethereum node JSON-RPC over unix socket.
+
+    Every request opens its own socket connection. At most pool_size requests are in flight at any time.
+
+    :param pool_size: Maximum number of concurrent connections to the node
+    :type pool_size: int
+    """
+
+    def __init__(self, url=None, chain_spec=None, auth=None, verify_identity=True, timeout=1.0, pool_size=DEFAULT_POOL_SIZE):
+        super(AsyncEthUnixConnection, self).__init__(url=url, chain_spec=chain_spec, auth=auth, verify_identity=verify_identity, timeout=timeout)
+        self.pool_size = pool_size
+        self.__slots = None
+        self.__loop = None
+
+
+    async def __request(self, data):
+        (reader, writer) = await asyncio.open_unix_connection(self.location)
+        try:
+            writer.write(data.encode('utf-8'))
+            await writer.drain()
+            r = []
+            scanner = _JSONScanner()
+            while True:
+                b = await reader.read(4096)
+                if len(b) == 0:
+                    break
+                r.append(b)
+                if scanner.feed(b):
+                    break
+        finally:
+            writer.close()
+        return b''.join(r)
+
+
+    async def _request(self, data):
+        loop = asyncio.get_running_loop()
+        if loop != self.__loop:
+            self.__slots = asyncio.Semaphore(self.pool_size)
+            self.__loop = loop
+        async with self.__slots:
+            try:
+                return await asyncio.wait_for(self.__request(data), self.timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                raise RPCException(e)
+
+
+    def __str__(self):
+        return 'ETH UNIX JSONRPC ASYNC'
+
+
+class EthSubscription:
+    """Stream of notifications for a single json-rpc subscription on a websocket connection.
+
+    The subscription can be consumed both as a blocking iterator and as an asyncio async iterator. Notifications received before they are consumed are buffered.
+
+    Iteration ends when the subscription is closed, or when the connection is lost.
+
+    :param conn: Websocket connection the subscription was made on
+    :type conn: chainlib.eth.connection.EthWebsocketConnection
+    :param subscription_id: Subscription id returned by the node
+    :type subscription_id: str
+    :param transform: Function to apply to every notification result before it is returned
+    :type transform: function
+    """
+
+    def __init__(self, conn, subscription_id, transform=None):
+        self.conn = conn
+        self.id = subscription_id
+        self.transform = transform
+        self.closed = False
+        self.__items = collections.deque()
+        self.__cond = threading.Condition()
+        self.__future = None
+
+
+    def put(self, item):
+        """Add a notification result to the stream. Used by the connection reader.
+
+        :param item: Notification result. None ends the stream.
+        :type item: any
+        """
+        with self.__cond:
+            self.__items.append(item)
+            self.__cond.notify_all()
+            f = self.__future
+            self.__future = None
+        if f != None:
+            f.get_loop().call_soon_threadsafe(self.__wake, f)
+
+
+    @staticmethod
+    def __wake(f):
+        if not f.done():
+            f.set_result(None)
+
+
+    def __result(self, item):
+        if item == None:
+            # leave the end marker for any other consumers
+            self.__items.appendleft(None)
+            return None
+        if self.transform != None:
+            item = self.transform(item)
+        return (item,)
+
+
+    def get(self, timeout=None):
+        """Get the next notification, blocking until one is available.
+
+        :param timeout: Max time to wait, in seconds. If None, wait indefinitely.
+        :type timeout: float
+        :raises TimeoutError: No notification received within timeout
+        :raises StopIteration: Subscription has ended
+        :rtype: any
+        :returns: Notification result
+        """
+        with self.__cond:
+            if not self.__cond.wait_for(lambda: len(self.__items) > 0, timeout=timeout):
+                raise TimeoutError(self.id)
+            r = self.__result(self.__items.popleft())
+        if r == None:
+            raise StopIteration()
+        return r[0]
+
+
+    def __iter__(self):
+        return self
+
+
+    def __next__(self):
+        return self.get()
+
+
+    def __aiter__(self):
+        return self
+
+
+    async def __anext__(self):
+        while True:
+            with self.__cond:
+                if len(self.__items) > 0:
+                    r = self.__result(self.__items.popleft())
+                    break
+                self.__future = asyncio.get_running_loop().create_future()
+                f = self.__future
+            await f
+        if r == None:
+            raise StopAsyncIteration()
+        return r[0]
+
+
+    def close(self):
+        """Cancel the subscription on the node, and end the stream.
         """
-        raise NotImplementedError('Not yet implemented for unix socket')
+        if self.closed:
+            return
+        self.closed = True
+        self.conn.unsubscribe(self)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+def _block_notification(v):
+    # header notifications do not include transactions
+    if v.get('transactions') == None:
+        v['transactions'] = []
+    return Block(v)
+
+
+class EthWebsocketConnection(EthConnection):
+    """Websocket interface for Ethereum node JSON-RPC.
+
+    A single websocket is shared by requests from any number of threads, and by any number of subscriptions. A background thread reads all incoming messages, and routes responses to the request waiting for them and notifications to their subscription.
+
+    The websocket is opened on the first request, and reopened on the next request after it has been lost. Subscriptions do not survive a lost websocket.
+    """
+
+    def __init__(self, url=None, chain_spec=None, auth=None, verify_identity=True, timeout=1.0):
+        super(EthWebsocketConnection, self).__init__(url=url, chain_spec=chain_spec, auth=auth, verify_identity=verify_identity, timeout=timeout)
+        self.ws = None
+        self.__lock = threading.Lock()
+        self.__pending = {}
+        self.__subscriptions = {}
+
+
+    def __connect(self):
+        headers = _http_headers(self)
+        del headers['Content-Type']
+        sslopt = {}
+        if not self.verify_identity:
+            import ssl
+            sslopt['cert_reqs'] = ssl.CERT_NONE
+        ws = websocket.create_connection(
+                self.location,
+                timeout=self.timeout,
+                header=['{}: {}'.format(k, v) for k, v in headers.items()],
+                sslopt=sslopt,
+                enable_multithread=True,
+                )
+        # the reader waits indefinitely, request timeouts are handled by the requesting thread
+        ws.settimeout(None)
+        thread = threading.Thread(target=self.__read, args=(ws,), daemon=True)
+        thread.start()
+        return ws
+
+
+    def __read(self, ws):
+        while True:
+            try:
+                data = ws.recv()
+            except (websocket.WebSocketException, OSError) as e:
+                logg.debug('({}) reader stopped: {}'.format(str(self), e))
+                break
+            if not data:
+                break
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            try:
+                o = codec.loads(data)
+            except ValueError:
+                logg.warning('({}) discarding invalid message {}'.format(str(self), data))
+                continue
+            self.__dispatch(o, data)
+        self.__lost(ws)
+
+
+    def __dispatch(self, o, data):
+        if isinstance(o, dict) and o.get('method') == 'eth_subscription':
+            with self.__lock:
+                s = self.__subscriptions.get(o['params']['subscription'])
+            if s == None:
+                logg.debug('({}) discarding notification for unknown subscription {}'.format(str(self), o['params']['subscription']))
+                return
+            s.put(o['params']['result'])
+            return
+
+        if isinstance(o, list):
+            ids = [v.get('id') for v in o]
+        else:
+            ids = [o.get('id')]
+        with self.__lock:
+            waiter = None
+            for i in ids:
+                waiter = self.__pending.get(i)
+                if waiter != None:
+                    break
+            if waiter == None:
+                logg.warning('({}) discarding response with unknown id {}'.format(str(self), ids))
+                return
+            for i in waiter['ids']:
+                del self.__pending[i]
+            # register a new subscription before its first notification can be read
+            if waiter['subscribe'] and o.get('result') != None:
+                s = EthSubscription(self, o['result'])
+                self.__subscriptions[s.id] = s
+                waiter['subscription'] = s
+        waiter['data'] = data
+        waiter['event'].set()
+
+
+    def __lost(self, ws):
+        with self.__lock:
+            if self.ws == ws:
+                self.ws = None
+            pending = list(self.__pending.values())
+            self.__pending = {}
+            subscriptions = list(self.__subscriptions.values())
+            self.__subscriptions = {}
+        for waiter in pending:
+            waiter['event'].set()
+        for s in subscriptions:
+            s.put(None)
+
+
+    def __send(self, o, data, subscribe=False):
+        if isinstance(o, list):
+            ids = [v['id'] for v in o]
+        else:
+            ids = [o['id']]
+        waiter = {
+            'ids': ids,
+            'event': threading.Event(),
+            'data': None,
+            'subscribe': subscribe,
+            'subscription': None,
+            }
+
+        try:
+            with self.__lock:
+                if self.ws == None:
+                    self.ws = self.__connect()
+                ws = self.ws
+                for i in ids:
+                    self.__pending[i] = waiter
+            ws.send(data)
+        except (websocket.WebSocketException, OSError) as e:
+            self.__forget(waiter)
+            raise RPCException(e)
+
+        if not waiter['event'].wait(self.timeout):
+            self.__forget(waiter)
+            raise RPCException(TimeoutError('no response from {}'.format(self.location)))
+        if waiter['data'] == None:
+            raise RPCException(ConnectionError('connection to {} lost'.format(self.location)))
+        return waiter
+
+
+    def __forget(self, waiter):
+        with self.__lock:
+            for i in waiter['ids']:
+                if self.__pending.get(i) == waiter:
+                    del self.__pending[i]
+
+
+    def _request(self, data):
+        """Send a serialized json-rpc payload to the node, and wait for the response to it.
+
+        :param data: Serialized json-rpc payload
+        :type data: str
+        :raises chainlib.error.RPCException: Endpoint could not be reached, or did not respond within timeout
+        :rtype: bytes
+        :returns: Response body
+        """
+        return self.__send(codec.loads(data), data)['data']
+
+
+    def _request_query(self, o, data):
+        return self.__send(o, data)['data']
+
+
+    def subscribe(self, kind, params=[], transform=None, error_parser=error_parser, id_generator=None):
+        """Create a subscription with the eth_subscribe json-rpc method.
+
+        :param kind: Subscription type, e.g. newHeads
+        :type kind: str
+        :param params: Additional subscription parameters
+        :type params: list
+        :param transform: Function to apply to every notification result
+        :type transform: function
+        :param error_parser: json-rpc response error parser
+        :type error_parser: chainlib.jsonrpc.ErrorParser
+        :param id_generator: json-rpc id generator
+        :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        :raises chainlib.error.RPCException: Endpoint could not be reached, or did not respond within timeout
+        :rtype: chainlib.eth.connection.EthSubscription
+        :returns: Subscription
+        """
+        j = JSONRPCRequest(id_generator)
+        o = j.template()
+        o['method'] = 'eth_subscribe'
+        o['params'].append(kind)
+        o['params'] += params
+        o = j.finalize(o)
+        waiter = self.__send(o, codec.dumps(o), subscribe=True)
+        result = codec.loads(waiter['data'])
+        _jsonrpc_result(o, result, error_parser)
+        s = waiter['subscription']
+        s.transform = transform
+        logg.debug('({}) subscribed {} as {}'.format(str(self), kind, s.id))
+        return s
+
+
+    def unsubscribe(self, subscription, id_generator=None):
+        """Cancel a subscription with the eth_unsubscribe json-rpc method.
+
+        Notifications still buffered by the subscription may still be consumed. The subscription stream ends after them.
+
+        :param subscription: Subscription to cancel
+        :type subscription: chainlib.eth.connection.EthSubscription
+        :param id_generator: json-rpc id generator
+        :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        """
+        with self.__lock:
+            s = self.__subscriptions.pop(subscription.id, None)
+        if s == None:
+            return
+        subscription.put(None)
+        j = JSONRPCRequest(id_generator)
+        o = j.template()
+        o['method'] = 'eth_unsubscribe'
+        o['params'].append(subscription.id)
+        o = j.finalize(o)
+        try:
+            self.do(o)
+        except RPCException as e:
+            logg.warning('({}) unsubscribe {} failed: {}'.format(str(self), subscription.id, e))
+
+
+    def heads(self, id_generator=None):
+        """Subscribe to new block headers.
+
+        Since headers are delivered without transactions, the transaction list of the blocks is empty.
+
+        :param id_generator: json-rpc id generator
+        :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        :rtype: chainlib.eth.connection.EthSubscription
+        :returns: Subscription yielding chainlib.eth.block.Block objects
+        """
+        return self.subscribe('newHeads', transform=_block_notification, id_generator=id_generator)
+
+
+    def logs(self, address=None, topics=None, id_generator=None):
+        """Subscribe to logs emitted in new blocks.
+
+        Logs are returned as dicts where fields can be accessed by both camel case and snake case keys, like transaction receipts.
+
+        If a chain reorganization drops a log already delivered, it is delivered again with "removed" set to True.
+
+        :param address: Only match logs from contract address, or list of addresses
+        :type address: str or list
+        :param topics: Topic filter, as for eth_getLogs
+        :type topics: list
+        :param id_generator: json-rpc id generator
+        :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        :rtype: chainlib.eth.connection.EthSubscription
+        :returns: Subscription yielding log dicts
+        """
+        f = {}
+        if address != None:
+            f['address'] = address
+        if topics != None:
+            f['topics'] = topics
+        return self.subscribe('logs', params=[f], transform=log_schema.normalize, id_generator=id_generator)
+
+
+    def pending_transactions(self, id_generator=None):
+        """Subscribe to hashes of transactions entering the mempool of the node.
+
+        :param id_generator: json-rpc id generator
+        :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        :rtype: chainlib.eth.connection.EthSubscription
+        :returns: Subscription yielding transaction hashes, hex
+        """
+        return self.subscribe('newPendingTransactions', id_generator=id_generator)
+
+
+    def disconnect(self):
+        """Close the websocket. Ends all subscriptions.
+        """
+        with self.__lock:
+            ws = self.ws
+            self.ws = None
+        if ws != None:
+            ws.abort()
+            ws.shutdown()
+            self.__lost(ws)
+
+
+    def __str__(self):
+        return 'ETH WEBSOCKET JSONRPC'
 
 
 def sign_transaction_to_rlp(chain_spec, doer, tx):
@@ -233,3 +1090,5 @@ class EthHTTPSignerConnection(EthHTTPConnection):
 RPCConnection.register_constructor(ConnType.HTTP, EthHTTPConnection, tag='eth_default')
 RPCConnection.register_constructor(ConnType.HTTP_SSL, EthHTTPConnection, tag='eth_default')
 RPCConnection.register_constructor(ConnType.UNIX, EthUnixConnection, tag='eth_default')
+RPCConnection.register_constructor(ConnType.WEBSOCKET, EthWebsocketConnection, tag='eth_default')
+RPCConnection.register_constructor(ConnType.WEBSOCKET_SSL, EthWebsocketConnection, tag='eth_default')
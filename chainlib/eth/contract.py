@@ -22,6 +22,8 @@ logg = logging.getLogger(__name__)
 
 re_method = r'^[a-zA-Z0-9_]+$'
 
+_binary_types = (bytes, bytearray, memoryview,)
+
 class ABIContractType(enum.Enum):
     """Data types used by ABI encoders
     """
@@ -131,7 +133,8 @@ class ABIMethodEncoder(ABIContract):
 
 
     def __log_method(self):
-        logg.debug('method set to {}'.format(self.get_method()))
+        if logg.isEnabledFor(logging.DEBUG):
+            logg.debug('method set to {}'.format(self.get_method()))
 
 
     def get_signature(self):
@@ -176,21 +179,26 @@ class ABIContractDecoder(ABIContract):
     def val(self, v):
         """Add value to value array.
 
-        :param v: Value, in hex
-        :type v: str
+        Values given as bytes are decoded without conversion to hex.
+
+        :param v: Value, in hex or bytes
+        :type v: str or bytes
         """
         self.contents.append(v)
-        logg.debug('content is now {}'.format(self.contents))
+        if logg.isEnabledFor(logging.DEBUG):
+            logg.debug('content is now {}'.format(self.contents))
 
 
     def uint256(self, v):
         """Parse value as uint256.
 
-        :param v: Value, in hex
-        :type v: str
+        :param v: Value, in hex or bytes
+        :type v: str or bytes
         :rtype: int
         :returns: Int value
         """
+        if isinstance(v, _binary_types):
+            return int.from_bytes(v, 'big')
         return int(v, 16)
 
 
@@ -211,11 +219,13 @@ class ABIContractDecoder(ABIContract):
     def bytes32(self, v):
         """Parse value as bytes32.
 
-        :param v: Value, in hex
-        :type v: str
+        :param v: Value, in hex or bytes
+        :type v: str or bytes
         :rtype: str
         :returns: Value, in hex
         """
+        if isinstance(v, _binary_types):
+            return bytes(v).hex()
         return v
 
 
@@ -239,11 +249,13 @@ class ABIContractDecoder(ABIContract):
     def address(self, v):
         """Parse value as address.
 
-        :param v: Value, in hex
-        :type v: str
+        :param v: Value, in hex or bytes
+        :type v: str or bytes
         :rtype: str
         :returns: Value. in hex
         """
+        if isinstance(v, _binary_types):
+            return to_checksum_address(bytes(v[12:32]).hex())
         a = strip_0x(v)[64-40:]
         return to_checksum_address(a)
 
@@ -251,25 +263,29 @@ class ABIContractDecoder(ABIContract):
     def string(self, v):
         """Parse value as string.
 
-        :param v: Value, in hex
-        :type v: str
+        :param v: Value, in hex or bytes
+        :type v: str or bytes
         :rtype: str
         :returns: Value
         """
-        s = strip_0x(v)
-        b = bytes.fromhex(s)
+        if isinstance(v, _binary_types):
+            b = v
+        else:
+            b = bytes.fromhex(strip_0x(v))
         cursor = 0
         offset = int.from_bytes(b[cursor:cursor+32], 'big')
         cursor += 32
         length = int.from_bytes(b[cursor:cursor+32], 'big')
         cursor += 32
-        content = b[cursor:cursor+length]
-        logg.debug('parsing string offset {} length {} content {}'.format(offset, length, content))
+        content = bytes(b[cursor:cursor+length])
+        if logg.isEnabledFor(logging.DEBUG):
+            logg.debug('parsing string offset {} length {} content {}'.format(offset, length, content))
         return content.decode('utf-8')
 
 
     def __log_typ(self):
-        logg.debug('types set to ({})'.format(','.join(self.types)))
+        if logg.isEnabledFor(logging.DEBUG):
+            logg.debug('types set to ({})'.format(','.join(self.types)))
 
 
     def decode(self):
@@ -279,12 +295,15 @@ class ABIContractDecoder(ABIContract):
         :returns: List of decoded values
         """
         r = []
-        logg.debug('contents {}'.format(self.contents))
+        debug = logg.isEnabledFor(logging.DEBUG)
+        if debug:
+            logg.debug('contents {}'.format(self.contents))
         for i in range(len(self.types)):
             m = None
             try:
                 m = getattr(self, self.types[i])
-                logg.debug('executing module {}'.format(m))
+                if debug:
+                    logg.debug('executing module {}'.format(m))
                 s = self.contents[i]
                 r.append(m(s))
             except AttributeError as e:
@@ -367,6 +386,8 @@ class ABIContractLogDecoder(ABIMethodEncoder, ABIContractDecoder):
 class ABIContractEncoder(ABIMethodEncoder):
 
     def __log_latest(self, v):
+        if not logg.isEnabledFor(logging.DEBUG):
+            return
         l = len(self.types) - 1 
         logg.debug('Encoder added {} -> {} ({})'.format(v, self.contents[l], self.types[l].value))
 
@@ -554,11 +575,9 @@ class ABIContractEncoder(ABIMethodEncoder):
             else:
                 direct_contents += self.contents[i]
         s = ''.join(direct_contents + pointer_contents)
-        for i in range(0, len(s), 64):
-            l = len(s) - i
-            if l > 64:
-                l = 64
-            logg.debug('code word {} {}'.format(int(i / 64), s[i:i+64]))
+        if logg.isEnabledFor(logging.DEBUG):
+            for i in range(0, len(s), 64):
+                logg.debug('code word {} {}'.format(int(i / 64), s[i:i+64]))
         self.dirty = False
         return s
 
@@ -592,8 +611,8 @@ def abi_decode_single(typ, v):
 
     :param typ: Type to parse value as
     :type typ: chainlib.eth.contract.ABIContractEncoder
-    :param v: Value to parse, in hex
-    :type v: str
+    :param v: Value to parse, in hex or bytes
+    :type v: str or bytes
     """
     d = ABIContractDecoder()
     d.typ(typ)
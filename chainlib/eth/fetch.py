@@ -0,0 +1,119 @@
+# standard imports
+import logging
+import collections
+import concurrent.futures
+
+# external imports
+from chainlib.connection import error_parser
+
+# local imports
+from .block import (
+        Block,
+        block_by_number,
+        )
+from .tx import receipt
+
+logg = logging.getLogger(__name__)
+
+
+def _do(conn, o, error_parser):
+    if len(o) == 1:
+        return [conn.do(o[0], error_parser=error_parser)]
+    return conn.do_batch(o, error_parser=error_parser)
+
+
+def _fetch_chunk(conn, start, end, receipts, error_parser, id_generator):
+    o = []
+    for i in range(start, end):
+        o.append(block_by_number(i, include_tx=True, id_generator=id_generator))
+    r = _do(conn, o, error_parser)
+    for i, v in enumerate(r):
+        if isinstance(v, Exception):
+            raise v
+        if v == None:
+            raise ValueError('block {} not found'.format(start + i))
+
+    rcpts = None
+    if receipts:
+        o = []
+        for v in r:
+            for tx in v['transactions']:
+                if isinstance(tx, dict):
+                    tx = tx['hash']
+                o.append(receipt(tx, id_generator=id_generator))
+        rcpts = []
+        if len(o) > 0:
+            rcpts = _do(conn, o, error_parser)
+        for v in rcpts:
+            if isinstance(v, Exception):
+                raise v
+    return (r, rcpts,)
+
+
+def fetch_blocks(conn, start, end, max_in_flight=4, batch_size=10, receipts=False, error_parser=error_parser, id_generator=None, dialect_filter=None):
+    """Retrieve a range of blocks, in order, fetching several blocks concurrently.
+
+    The range is split into chunks of batch_size blocks. Each chunk is retrieved with a single json-rpc batch request, and at most max_in_flight chunks are retrieved concurrently, each in a separate thread. Blocks are yielded in order as soon as their chunk is complete.
+
+    New chunks are only requested as the blocks of earlier chunks are consumed, so that a slow consumer does not cause blocks to pile up in memory. Closing the generator abandons any chunks still in flight.
+
+    If receipts is set, the receipts of all transactions in a chunk are retrieved with another batch request, and added to each block as a list in the receipts attribute, in the order of the transactions.
+
+    The connection must be safe to use from several threads, and must implement do_batch if batch_size is more than 1.
+
+    :param conn: RPC connection
+    :type conn: chainlib.eth.connection.EthConnection
+    :param start: First block number
+    :type start: int
+    :param end: Block number after last block to retrieve
+    :type end: int
+    :param max_in_flight: Max number of chunks being retrieved concurrently
+    :type max_in_flight: int
+    :param batch_size: Number of blocks per chunk
+    :type batch_size: int
+    :param receipts: Retrieve transaction receipts
+    :type receipts: bool
+    :param error_parser: json-rpc response error parser
+    :type error_parser: chainlib.jsonrpc.ErrorParser
+    :param id_generator: json-rpc id generator
+    :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+    :param dialect_filter: Dialect filter to apply to blocks
+    :type dialect_filter: chainlib.eth.dialect.DialectFilter
+    :raises ValueError: Block in range not found
+    :rtype: generator of chainlib.eth.block.Block
+    :returns: Blocks, in order
+    """
+    if max_in_flight < 1 or batch_size < 1:
+        raise ValueError('max_in_flight and batch_size must be at least 1')
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight)
+    futures = collections.deque()
+    cursor = start
+
+    def submit():
+        nonlocal cursor
+        if cursor >= end:
+            return
+        chunk_end = min(cursor + batch_size, end)
+        logg.debug('fetch blocks {}-{}'.format(cursor, chunk_end - 1))
+        futures.append(executor.submit(_fetch_chunk, conn, cursor, chunk_end, receipts, error_parser, id_generator))
+        cursor = chunk_end
+
+    try:
+        for i in range(max_in_flight):
+            submit()
+        while len(futures) > 0:
+            (r, rcpts) = futures.popleft().result()
+            # keep the window full while the consumer works through this chunk
+            submit()
+            c = 0
+            for src in r:
+                block = Block(src, dialect_filter=dialect_filter)
+                if rcpts != None:
+                    n = len(block.txs)
+                    block.receipts = rcpts[c:c+n]
+                    c += n
+                yield block
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -1,5 +1,8 @@
 # standard imports
 import logging
+import time
+import threading
+import collections
 
 # external imports
 from hexathon import (
@@ -12,6 +15,10 @@ from funga.eth.transaction import EIP155Transaction
 from chainlib.fee import FeeOracle
 from chainlib.hash import keccak256_hex_to_hex
 from chainlib.jsonrpc import JSONRPCRequest
+from chainlib.error import (
+        JSONRPCException,
+        RPCException,
+        )
 from chainlib.eth.tx import (
         TxFactory,
         TxFormat,
@@ -21,7 +28,9 @@ from chainlib.eth.jsonrpc import to_blockheight_param
 from chainlib.block import BlockSpec
 from chainlib.eth.constant import (
         MINIMUM_FEE_UNITS,
+        MINIMUM_FEE_PRICE,
     )
+from chainlib.eth.error import EthException
 
 logg = logging.getLogger(__name__)
 
@@ -40,6 +49,32 @@ def price(id_generator=None):
     return j.finalize(o)
 
 
+def fee_history(block_count, percentiles=None, id_generator=None, height=BlockSpec.LATEST):
+    """Generate json-rpc query to retrieve base fees and priority fee percentiles of recent blocks from node.
+
+    :param block_count: Number of blocks to retrieve fees for
+    :type block_count: int
+    :param percentiles: Priority fee percentiles to retrieve for each block, in ascending order. If None, no priority fees are retrieved.
+    :type percentiles: list of float
+    :param id_generator: json-rpc id generator 
+    :type id_generator: chainlib.connection.JSONRPCIdGenerator
+    :param height: Block height specifier of newest block
+    :type height: chainlib.block.BlockSpec
+    :rtype: dict
+    :returns: rpc query object
+    """
+    j = JSONRPCRequest(id_generator)
+    o = j.template()
+    o['method'] = 'eth_feeHistory'
+    o['params'].append(hex(block_count))
+    height = to_blockheight_param(height)
+    o['params'].append(height)
+    if percentiles == None:
+        percentiles = []
+    o['params'].append(percentiles)
+    return j.finalize(o)
+
+
 def balance(address, id_generator=None, height=BlockSpec.LATEST):
     """Generate json-rpc query to retrieve gas balance of address.
 
@@ -219,11 +254,12 @@ class OverrideGasOracle(RPCGasOracle):
         
 
     def get_fee(self, code=None, input_data=None):
-        r = None
         fee_units = None
         fee_price = None
 
-        rpc_results = super(OverrideGasOracle, self).get_fee(code)
+        rpc_results = None
+        if self.limit == None or self.price == None:
+            rpc_results = super(OverrideGasOracle, self).get_fee(code)
  
         if self.limit != None:
             fee_units = self.limit
@@ -252,4 +288,161 @@ class OverrideGasOracle(RPCGasOracle):
         return self.get_fee(code=code, input_data=input_data)
 
 
+class FeeHistoryGasOracle(RPCGasOracle):
+    """Gas parameter helper answering from an in-memory model of recent network fees.
+
+    The model holds the base fees, and the priority fees at the given reward percentile, of the most recent block_count blocks. The priority fee of empty blocks is None. It is refreshed with eth_feeHistory at most once every refresh_interval seconds, on the first request after the interval has passed, and only blocks not already in the model are added. All other requests are answered without rpc queries.
+
+    The priority fee is the median of the priority fees of the non-empty blocks in the model. The gas price is the base fee of the next block plus the priority fee, and the max fee per gas is the base fee of the next block multiplied by base_fee_multiplier plus the priority fee.
+
+    If the node does not support eth_feeHistory, gas price is retrieved with eth_gasPrice instead, as chainlib.eth.gas.RPCGasOracle.
+
+    If a refresh fails because the node cannot be reached, the existing model is used until the next refresh. The error is only raised if there is no model yet.
+
+    :param conn: RPC connection
+    :type conn: chainlib.connection.RPCConnection
+    :param code_callback: Callback method to evaluate gas usage for method and inputs.
+    :type code_callback: method taking abi encoded input data as single argument
+    :param min_price: Override gas price if less than given value
+    :type min_price: int
+    :param id_generator: json-rpc id generator 
+    :type id_generator: chainlib.connection.JSONRPCIdGenerator
+    :param block_count: Number of recent blocks in model
+    :type block_count: int
+    :param percentile: Reward percentile of priority fees to use for each block
+    :type percentile: float
+    :param refresh_interval: Minimum number of seconds between model refreshes
+    :type refresh_interval: float
+    :param base_fee_multiplier: Headroom for base fee increases in max fee per gas
+    :type base_fee_multiplier: int
+    """
+
+    def __init__(self, conn, code_callback=None, min_price=1, id_generator=None, block_count=20, percentile=50, refresh_interval=12.0, base_fee_multiplier=2):
+        super(FeeHistoryGasOracle, self).__init__(conn, code_callback=code_callback, min_price=min_price, id_generator=id_generator)
+        self.block_count = block_count
+        self.percentile = percentile
+        self.refresh_interval = refresh_interval
+        self.base_fee_multiplier = base_fee_multiplier
+        self.base_fees = collections.deque(maxlen=block_count)
+        self.priority_fees = collections.deque(maxlen=block_count)
+        self.next_base_fee = None
+        self.last_block = None
+        self.last_update = None
+        self.supported = True
+        self.__lock = threading.Lock()
+
+
+    def __fetch(self):
+        o = fee_history(self.block_count, percentiles=[self.percentile], id_generator=self.id_generator)
+        r = self.conn.do(o)
+        oldest = int(strip_0x(r['oldestBlock']), 16)
+        base_fees = r['baseFeePerGas']
+        rewards = r.get('reward') or []
+        ratios = r['gasUsedRatio']
+        for i in range(len(ratios)):
+            block_number = oldest + i
+            if self.last_block != None and block_number <= self.last_block:
+                continue
+            self.base_fees.append(int(strip_0x(base_fees[i]), 16))
+            priority_fee = None
+            if ratios[i] > 0 and i < len(rewards):
+                priority_fee = int(strip_0x(rewards[i][0]), 16)
+            self.priority_fees.append(priority_fee)
+            self.last_block = block_number
+        # the node returns one more base fee than blocks; the base fee of the next block
+        self.next_base_fee = int(strip_0x(base_fees[-1]), 16)
+        self.last_update = time.monotonic()
+        logg.debug('fee history updated to block {} next base fee {} priority fee {}'.format(self.last_block, self.next_base_fee, self.priority_fee()))
+
+
+    def update(self):
+        """Refresh the fee model from the node, regardless of when it was last refreshed.
+
+        :raises chainlib.error.JSONRPCException: Node does not support eth_feeHistory
+        """
+        with self.__lock:
+            self.__fetch()
+
+
+    def __refresh(self):
+        if self.conn == None or not self.supported:
+            return
+        if self.last_update != None and time.monotonic() - self.last_update < self.refresh_interval:
+            return
+        with self.__lock:
+            # another thread may have refreshed while waiting for the lock
+            if self.last_update != None and time.monotonic() - self.last_update < self.refresh_interval:
+                return
+            try:
+                self.__fetch()
+            except (JSONRPCException, EthException) as e:
+                logg.warning('fee history not available, using eth_gasPrice instead: {}'.format(e))
+                self.supported = False
+            except (RPCException, OSError) as e:
+                if self.next_base_fee == None:
+                    raise e
+                # keep serving the model until the next refresh
+                self.last_update = time.monotonic()
+                logg.warning('fee history refresh failed, using fee model from block {}: {}'.format(self.last_block, e))
+
+
+    def priority_fee(self):
+        """Calculate the priority fee from the fee model.
+
+        :rtype: int
+        :returns: Priority fee in wei, or 0 if no non-empty blocks are in the model
+        """
+        fees = sorted([v for v in self.priority_fees if v != None])
+        if len(fees) == 0:
+            return 0
+        return fees[len(fees) // 2]
+
+
+    def get_dynamic_fee(self, code=None, input_data=None):
+        """Get EIP-1559 gas parameters.
+
+        See chainlib.eth.gas.RPCGasOracle.get_fee for the calculation of the gas limit.
+
+        :param code: EVM execution code to evaluate against, in hex
+        :type code: str
+        :param input_data: Contract input data, in hex
+        :type input_data: str
+        :rtype: tuple
+        :returns: Max fee per gas in wei, max priority fee per gas in wei, and gas limit in gas units. Fees are None if the node does not support eth_feeHistory.
+        """
+        self.__refresh()
+        fee_units = MINIMUM_FEE_UNITS
+        if self.code_callback != None:
+            fee_units = self.code_callback(code)
+        if self.next_base_fee == None:
+            return (None, None, fee_units,)
+        priority_fee = self.priority_fee()
+        max_fee = self.next_base_fee * self.base_fee_multiplier + priority_fee
+        return (max_fee, priority_fee, fee_units,)
+
+
+    def get_fee(self, code=None, input_data=None):
+        """Get gas parameters from the fee model.
+
+        If the fee model is not available, gas parameters are retrieved from node as chainlib.eth.gas.RPCGasOracle.get_fee.
+
+        :param code: EVM execution code to evaluate against, in hex
+        :type code: str
+        :param input_data: Contract input data, in hex
+        :type input_data: str
+        :rtype: tuple
+        :returns: Gas price in wei, and gas limit in gas units
+        """
+        self.__refresh()
+        if self.next_base_fee == None:
+            return super(FeeHistoryGasOracle, self).get_fee(code=code, input_data=input_data)
+        fee_units = MINIMUM_FEE_UNITS
+        if self.code_callback != None:
+            fee_units = self.code_callback(code)
+        gas_price = self.next_base_fee + self.priority_fee()
+        if gas_price < self.min_price:
+            gas_price = self.min_price
+        return (gas_price, fee_units,)
+
+
 DefaultGasOracle = RPCGasOracle
@@ -0,0 +1,298 @@
+# standard imports
+import logging
+import time
+
+# external imports
+from hexathon import (
+        add_0x,
+        strip_0x,
+        uniform as hex_uniform,
+        )
+from chainlib.connection import error_parser
+
+# local imports
+from .block import (
+        Block,
+        block_latest,
+        block_by_hash,
+        block_by_number,
+        )
+
+logg = logging.getLogger(__name__)
+
+
+def _hash(v):
+    return add_0x(hex_uniform(strip_0x(v)))
+
+
+class BlockEvent:
+    """A block was added to the canonical chain.
+
+    :param block: Block
+    :type block: chainlib.eth.block.Block
+    """
+
+    def __init__(self, block):
+        self.block = block
+
+
+    def __str__(self):
+        return 'block {} {}'.format(self.block.number, self.block.hash)
+
+
+class ReorgEvent:
+    """The canonical chain was reorganized.
+
+    The reorg event is followed by a block event for each block in added.
+
+    :param ancestor: Last block common to the old and the new chain, or None if it is outside the tracked window
+    :type ancestor: chainlib.eth.block.Block
+    :param orphaned: Blocks no longer on the canonical chain, in ascending order
+    :type orphaned: list of chainlib.eth.block.Block
+    :param added: Blocks replacing the orphaned blocks, in ascending order
+    :type added: list of chainlib.eth.block.Block
+    """
+
+    def __init__(self, ancestor, orphaned, added):
+        self.ancestor = ancestor
+        self.orphaned = orphaned
+        self.added = added
+
+
+    def __str__(self):
+        ancestor = None
+        if self.ancestor != None:
+            ancestor = self.ancestor.number
+        return 'reorg from {} orphaned {} added {}'.format(ancestor, len(self.orphaned), len(self.added))
+
+
+class HeadTracker:
+    """Keeps track of a window of the most recent headers of the canonical chain, and reports chain reorganizations.
+
+    Headers are added with the add method, for example from a polling loop (see chainlib.eth.head.poll_heads) or from a newHeads subscription. The parent hash of every added block is checked against the tracked chain, until the block is linked to a tracked block. If the block is ahead of the tip, the blocks in between are retrieved by number from the node in a single batch. Any other missing ancestors are retrieved by hash.
+
+    If that tracked block is not the tip of the chain, a reorg event is emitted, carrying the tracked blocks that have been orphaned and the blocks that replace them.
+
+    If the new block is more than window blocks ahead of the tip, for example after a pause in polling, only the window of blocks before it is retrieved, in a single batch together with the canonical blocks at the tracked heights. The blocks before that window are skipped. A reorg is only reported if the tracked blocks are no longer canonical.
+
+    If the new block cannot be linked to the tracked window, the window is reset; all tracked blocks are reported as orphaned, with no common ancestor.
+
+    :param conn: RPC connection used to retrieve missing ancestors. If None, a block that cannot be linked resets the window.
+    :type conn: chainlib.connection.RPCConnection
+    :param window: Number of most recent headers to keep
+    :type window: int
+    """
+
+    def __init__(self, conn=None, window=128, error_parser=error_parser, id_generator=None):
+        self.conn = conn
+        self.window = window
+        self.error_parser = error_parser
+        self.id_generator = id_generator
+        self.by_hash = {}
+        self.by_number = {}
+        self.tip = None
+
+
+    def get_by_hash(self, block_hash):
+        """Get a tracked block by hash.
+
+        :param block_hash: Block hash, hex
+        :type block_hash: str
+        :rtype: chainlib.eth.block.Block
+        :returns: Block, or None if not tracked
+        """
+        return self.by_hash.get(_hash(block_hash))
+
+
+    def get_by_number(self, number):
+        """Get a tracked block of the canonical chain by number.
+
+        :param number: Block number
+        :type number: int
+        :rtype: chainlib.eth.block.Block
+        :returns: Block, or None if not tracked
+        """
+        return self.by_number.get(number)
+
+
+    def __fetch_parent(self, block):
+        if self.conn == None or block.parent_hash == None:
+            return None
+        o = block_by_hash(block.parent_hash, include_tx=False, id_generator=self.id_generator)
+        r = self.conn.do(o, error_parser=self.error_parser)
+        if r == None:
+            return None
+        return Block(r)
+
+
+    def __fetch_by_number(self, numbers):
+        o = []
+        for number in numbers:
+            o.append(block_by_number(number, include_tx=False, id_generator=self.id_generator))
+        r = []
+        for v in self.conn.do_batch(o, error_parser=self.error_parser):
+            if v == None or isinstance(v, Exception):
+                v = None
+            else:
+                v = Block(v)
+            r.append(v)
+        return r
+
+
+    def __prepend(self, chain, blocks):
+        # add the blocks that link to the oldest block of the chain, newest first
+        prefix = []
+        parent_hash = chain[0].parent_hash
+        for parent in reversed(blocks):
+            # the canonical chain may have changed while retrieving
+            if parent == None or parent_hash == None or _hash(parent.hash) != _hash(parent_hash):
+                break
+            prefix.append(parent)
+            parent_hash = parent.parent_hash
+        logg.debug('retrieved {} missing ancestors by number'.format(len(prefix)))
+        prefix.reverse()
+        return prefix + chain
+
+
+    def __jump(self, block):
+        # retrieve the window of blocks before the new block, and the canonical blocks at the tracked heights, in one batch
+        numbers = list(range(block.number - self.window + 1, block.number))
+        tracked = sorted(self.by_number.keys(), reverse=True)
+        r = self.__fetch_by_number(numbers + tracked)
+        chain = self.__prepend([block], r[:len(numbers)])
+        for (number, v) in zip(tracked, r[len(numbers):]):
+            ancestor = self.by_number[number]
+            if v != None and _hash(v.hash) == _hash(ancestor.hash):
+                return (ancestor, chain,)
+        return (None, chain,)
+
+
+    def __link(self, block):
+        chain = [block]
+        if self.conn != None and block.number > self.tip.number + 1:
+            if block.number - self.tip.number > self.window:
+                return self.__jump(block)
+            r = self.__fetch_by_number(range(self.tip.number + 1, block.number))
+            chain = self.__prepend(chain, r)
+
+        # walk back from block until reaching a tracked block
+        while True:
+            parent_hash = chain[0].parent_hash
+            if parent_hash != None:
+                ancestor = self.by_hash.get(_hash(parent_hash))
+                if ancestor != None:
+                    return (ancestor, chain,)
+            if chain[0].number <= self.tip.number - self.window:
+                return (None, chain,)
+            parent = self.__fetch_parent(chain[0])
+            if parent == None:
+                return (None, chain,)
+            logg.debug('retrieved missing ancestor {} {}'.format(parent.number, parent.hash))
+            chain.insert(0, parent)
+
+
+    def __append(self, block):
+        self.by_hash[_hash(block.hash)] = block
+        self.by_number[block.number] = block
+        self.tip = block
+
+
+    def __remove(self, block):
+        del self.by_hash[_hash(block.hash)]
+        if self.by_number.get(block.number) == block:
+            del self.by_number[block.number]
+
+
+    def __prune(self):
+        low = self.tip.number - self.window
+        for number in [v for v in self.by_number.keys() if v <= low]:
+            self.__remove(self.by_number[number])
+
+
+    def add(self, block):
+        """Add a new header to the tracker.
+
+        :param block: Block, or block as returned by the eth_getBlockByNumber or eth_getBlockByHash json-rpc methods
+        :type block: chainlib.eth.block.Block or dict
+        :rtype: list of chainlib.eth.head.BlockEvent and chainlib.eth.head.ReorgEvent
+        :returns: Events resulting from the new header, in order
+        """
+        if isinstance(block, dict):
+            block = Block(block)
+        if self.by_hash.get(_hash(block.hash)) != None:
+            return []
+
+        if self.tip == None:
+            self.__append(block)
+            return [BlockEvent(block)]
+
+        (ancestor, chain) = self.__link(block)
+        orphaned = []
+        if ancestor == None:
+            orphaned = [self.by_number[n] for n in sorted(self.by_number.keys())]
+            self.by_hash = {}
+            self.by_number = {}
+        elif ancestor != self.tip:
+            for n in range(ancestor.number + 1, self.tip.number + 1):
+                v = self.by_number.get(n)
+                if v != None:
+                    orphaned.append(v)
+            for v in orphaned:
+                self.__remove(v)
+
+        events = []
+        if len(orphaned) > 0:
+            e = ReorgEvent(ancestor, orphaned, chain)
+            logg.info('({}) {}'.format(str(self), e))
+            events.append(e)
+        for v in chain:
+            self.__append(v)
+            events.append(BlockEvent(v))
+        self.__prune()
+        return events
+
+
+    def follow(self, blocks):
+        """Add every header from a source of headers, and yield the resulting events.
+
+        :param blocks: Header source, e.g. chainlib.eth.head.poll_heads or chainlib.eth.connection.EthWebsocketConnection.heads
+        :type blocks: iterable of chainlib.eth.block.Block
+        :rtype: generator of chainlib.eth.head.BlockEvent and chainlib.eth.head.ReorgEvent
+        :returns: Events, in order
+        """
+        for block in blocks:
+            for e in self.add(block):
+                yield e
+
+
+    def __str__(self):
+        return 'head tracker'
+
+
+def poll_heads(conn, delay=1.0, error_parser=error_parser, id_generator=None):
+    """Poll for the latest block header of a node.
+
+    The latest header is retrieved whenever the block height of the node changes.
+
+    :param conn: RPC connection
+    :type conn: chainlib.connection.RPCConnection
+    :param delay: Polling interval, in seconds
+    :type delay: float
+    :param error_parser: json-rpc response error parser
+    :type error_parser: chainlib.jsonrpc.ErrorParser
+    :param id_generator: json-rpc id generator
+    :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+    :rtype: generator of chainlib.eth.block.Block
+    :returns: Latest block headers, without transactions
+    """
+    last = None
+    while True:
+        r = conn.do(block_latest(id_generator=id_generator), error_parser=error_parser)
+        height = int(strip_0x(r), 16)
+        if height != last:
+            r = conn.do(block_by_number(height, include_tx=False, id_generator=id_generator), error_parser=error_parser)
+            if r != None:
+                last = height
+                yield Block(r)
+                continue
+        time.sleep(delay)
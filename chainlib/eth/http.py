@@ -0,0 +1,284 @@
+# standard imports
+import logging
+import queue
+import threading
+import http.client
+import asyncio
+from urllib.parse import urlparse
+from urllib.error import (
+        URLError,
+        HTTPError,
+        )
+
+logg = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 8
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of persistent (keep-alive) HTTP connections to a single location.
+
+    At most size connections are open at any time. A request made while all connections are in use blocks until one is returned to the pool.
+
+    A connection that was closed by the remote while idle in the pool is replaced transparently, and the request is retried once on the new connection.
+
+    :param location: URL of the endpoint
+    :type location: str
+    :param size: Maximum number of open connections
+    :type size: int
+    :param timeout: Socket timeout, in seconds
+    :type timeout: float
+    :param ssl_context: SSL context to use for https locations. If None, the system default context is used.
+    :type ssl_context: ssl.SSLContext
+    """
+
+    def __init__(self, location, size=DEFAULT_POOL_SIZE, timeout=1.0, ssl_context=None):
+        if size < 1:
+            raise ValueError('pool size must be at least 1')
+        url = urlparse(location)
+        self.location = location
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.path = url.path or '/'
+        if url.query != '':
+            self.path += '?' + url.query
+        self.size = size
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.__idle = queue.LifoQueue()
+        self.__slots = threading.BoundedSemaphore(size)
+
+
+    def __connect(self):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+
+    def __get(self):
+        try:
+            return (self.__idle.get_nowait(), True,)
+        except queue.Empty:
+            return (self.__connect(), False,)
+
+
+    def __send(self, conn, data, headers):
+        conn.request('POST', self.path, body=data, headers=headers)
+        r = conn.getresponse()
+        return (r, r.read(),)
+
+
+    def request(self, data, headers={}):
+        """Send a POST request with the given body, using a pooled connection.
+
+        :param data: Request body
+        :type data: bytes
+        :param headers: Request headers
+        :type headers: dict
+        :raises urllib.error.HTTPError: Endpoint responded with error status
+        :raises urllib.error.URLError: Endpoint could not be reached
+        :rtype: bytes
+        :returns: Response body
+        """
+        self.__slots.acquire()
+        try:
+            (conn, reused) = self.__get()
+            try:
+                (r, body) = self.__send(conn, data, headers)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                conn.close()
+                if not reused:
+                    raise URLError(e)
+                logg.debug('pooled connection to {} went stale, reconnecting'.format(self.location))
+                conn = self.__connect()
+                (r, body) = self.__send(conn, data, headers)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            self.__slots.release()
+            if isinstance(e, URLError):
+                raise e
+            raise URLError(e)
+
+        if r.will_close:
+            conn.close()
+        else:
+            self.__idle.put(conn)
+        self.__slots.release()
+
+        if r.status >= 400:
+            raise HTTPError(self.location, r.status, r.reason, r.headers, None)
+        return body
+
+
+    def close(self):
+        """Close all idle connections in the pool.
+        """
+        while True:
+            try:
+                conn = self.__idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+
+class AsyncHTTPConnectionPool:
+    """Asyncio implementation of chainlib.eth.http.HTTPConnectionPool, using stream connections from the running event loop.
+
+    Only the subset of HTTP/1.1 needed to talk to a json-rpc endpoint is implemented; POST requests with a sized body, and responses with a sized, chunked or connection-delimited body.
+
+    :param location: URL of the endpoint
+    :type location: str
+    :param size: Maximum number of open connections
+    :type size: int
+    :param timeout: Max time to wait for a response, in seconds
+    :type timeout: float
+    :param ssl_context: SSL context to use for https locations. If None, the system default context is used.
+    :type ssl_context: ssl.SSLContext
+    """
+
+    def __init__(self, location, size=DEFAULT_POOL_SIZE, timeout=1.0, ssl_context=None):
+        if size < 1:
+            raise ValueError('pool size must be at least 1')
+        url = urlparse(location)
+        self.location = location
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        if self.port == None:
+            self.port = 443 if self.scheme == 'https' else 80
+        self.path = url.path or '/'
+        if url.query != '':
+            self.path += '?' + url.query
+        self.size = size
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        if self.scheme == 'https' and self.ssl_context == None:
+            import ssl
+            self.ssl_context = ssl.create_default_context()
+        self.__idle = []
+        self.__slots = None
+        self.__loop = None
+
+
+    async def __connect(self):
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+
+
+    async def __send(self, stream, data, headers):
+        (reader, writer) = stream
+        h = 'POST {} HTTP/1.1\r\nHost: {}:{}\r\nContent-Length: {}\r\n'.format(self.path, self.host, self.port, len(data))
+        for k in headers.keys():
+            h += '{}: {}\r\n'.format(k, headers[k])
+        h += '\r\n'
+        writer.write(h.encode('ascii') + data)
+        await writer.drain()
+
+        status = await reader.readline()
+        if len(status) == 0:
+            raise ConnectionResetError('connection closed by {}'.format(self.location))
+        status = status.decode('ascii').split(' ', 2)
+        code = int(status[1])
+        reason = status[2].rstrip() if len(status) > 2 else ''
+
+        response_headers = {}
+        while True:
+            l = await reader.readline()
+            l = l.decode('latin-1').rstrip('\r\n')
+            if l == '':
+                break
+            (k, v) = l.split(':', 1)
+            response_headers[k.strip().lower()] = v.strip()
+
+        will_close = response_headers.get('connection', '').lower() == 'close'
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = b''
+            while True:
+                l = await reader.readline()
+                n = int(l.split(b';', 1)[0], 16)
+                if n == 0:
+                    await reader.readline()
+                    break
+                body += await reader.readexactly(n)
+                await reader.readline()
+        elif response_headers.get('content-length') != None:
+            body = await reader.readexactly(int(response_headers['content-length']))
+        else:
+            body = await reader.read()
+            will_close = True
+
+        return (code, reason, response_headers, body, will_close,)
+
+
+    async def __request(self, data, headers):
+        reused = True
+        try:
+            stream = self.__idle.pop()
+        except IndexError:
+            stream = await self.__connect()
+            reused = False
+        try:
+            r = await self.__send(stream, data, headers)
+        except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError) as e:
+            stream[1].close()
+            if not reused:
+                raise URLError(e)
+            logg.debug('pooled connection to {} went stale, reconnecting'.format(self.location))
+            stream = await self.__connect()
+            try:
+                r = await self.__send(stream, data, headers)
+            except BaseException as e:
+                stream[1].close()
+                raise e
+        except BaseException as e:
+            stream[1].close()
+            raise e
+
+        if r[4]:
+            stream[1].close()
+        else:
+            self.__idle.append(stream)
+        return r
+
+
+    async def request(self, data, headers={}):
+        """Send a POST request with the given body, using a pooled connection.
+
+        :param data: Request body
+        :type data: bytes
+        :param headers: Request headers
+        :type headers: dict
+        :raises urllib.error.HTTPError: Endpoint responded with error status
+        :raises urllib.error.URLError: Endpoint could not be reached
+        :rtype: bytes
+        :returns: Response body
+        """
+        loop = asyncio.get_running_loop()
+        if loop != self.__loop:
+            # streams cannot be shared between event loops
+            self.__idle = []
+            self.__slots = asyncio.Semaphore(self.size)
+            self.__loop = loop
+        async with self.__slots:
+            try:
+                r = await asyncio.wait_for(self.__request(data, headers), self.timeout)
+            except URLError as e:
+                raise e
+            except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                raise URLError(e)
+
+        if r[0] >= 400:
+            raise HTTPError(self.location, r[0], r[1], r[2], None)
+        return r[3]
+
+
+    async def close(self):
+        """Close all idle connections in the pool.
+        """
+        while len(self.__idle) > 0:
+            stream = self.__idle.pop()
+            stream[1].close()
+            try:
+                await stream[1].wait_closed()
+            except OSError:
+                pass
@@ -41,3 +41,39 @@ def to_blockheight_param(height):
         else:
             height = add_0x(int(height).to_bytes(8, 'big').hex())
     return height 
+
+
+def jsonrpc_batch_result(o, r, error_parser):
+    """Retrieve the results from a json-rpc batch response, in the order of the batch request.
+
+    Responses are matched to requests by id, as a node is free to return batch items in any order. An error in an individual item does not fail the batch. Instead, the exception generated by the error parser for that item is returned in its place.
+
+    :param o: json-rpc batch request object
+    :type o: list of dict
+    :param r: json-rpc batch response object
+    :type r: list of dict
+    :param error_parser: Error parser
+    :type error_parser: chainlib.jsonrpc.ErrorParser
+    :raises ValueError: Response does not contain a result for every request
+    :rtype: list
+    :returns: Result values, or exception objects for items that resulted in error
+    """
+    if isinstance(r, dict):
+        # a node may answer an invalid or unsupported batch with a single error object
+        raise error_parser.translate(r)
+
+    responses = {}
+    for v in r:
+        responses[v.get('id')] = v
+
+    results = []
+    for v in o:
+        try:
+            item = responses[v['id']]
+        except KeyError:
+            raise ValueError('RPC batch missing response for id {}'.format(v['id']))
+        if item.get('error') != None:
+            results.append(error_parser.translate(item))
+        else:
+            results.append(item['result'])
+    return results
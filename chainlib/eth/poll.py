@@ -0,0 +1,288 @@
+# standard imports
+import logging
+import datetime
+import time
+import random
+import asyncio
+
+# external imports
+from hexathon import (
+        add_0x,
+        strip_0x,
+        uniform as hex_uniform,
+        )
+from chainlib.connection import error_parser
+
+# local imports
+from .error import RevertEthException
+from .tx import receipt
+from .block import block_latest
+from .src import receipt_schema
+
+logg = logging.getLogger(__name__)
+
+
+class PollStrategy:
+    """Polling at a fixed interval.
+
+    If head is set, receipts are only polled again after the block height of the node has advanced, since no new receipts can appear before that. Between receipt polls only the block height is polled.
+
+    :param delay: Polling interval, in seconds
+    :type delay: float
+    :param head: Only poll receipts when block height has advanced
+    :type head: bool
+    """
+
+    def __init__(self, delay=0.5, head=False):
+        self.delay = delay
+        self.head = head
+
+
+    def next_delay(self, attempt):
+        """Calculate the time to wait before the next poll.
+
+        :param attempt: Number of consecutive polls that did not yield any new receipts or blocks
+        :type attempt: int
+        :rtype: float
+        :returns: Delay, in seconds
+        """
+        return self.delay
+
+
+class BackoffPollStrategy(PollStrategy):
+    """Polling with an exponentially increasing interval.
+
+    The interval starts at min_delay, and is multiplied by factor for every consecutive poll that yields nothing new, up to max_delay. The interval is reset when new receipts or blocks are seen.
+
+    A random jitter of up to the given fraction of the interval is added or subtracted, to avoid a crowd of pollers hitting the node in lockstep.
+
+    :param min_delay: Initial polling interval, in seconds
+    :type min_delay: float
+    :param max_delay: Max polling interval, in seconds
+    :type max_delay: float
+    :param factor: Interval multiplier
+    :type factor: float
+    :param jitter: Max random deviation from interval, as fraction of interval
+    :type jitter: float
+    :param head: Only poll receipts when block height has advanced
+    :type head: bool
+    """
+
+    def __init__(self, min_delay=0.1, max_delay=10.0, factor=2.0, jitter=0.1, head=False):
+        super(BackoffPollStrategy, self).__init__(delay=min_delay, head=head)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+
+
+    def next_delay(self, attempt):
+        delay = self.max_delay
+        # avoid overflowing float on long waits
+        if attempt < 64:
+            delay = min(self.min_delay * (self.factor ** attempt), self.max_delay)
+        if self.jitter > 0:
+            delay += delay * random.uniform(-self.jitter, self.jitter)
+        return delay
+
+
+class ReceiptPoller:
+    """Transport-agnostic state of a poll for transaction receipts.
+
+    The poller generates the receipt queries for the transactions still pending, and interprets the results of those queries. Execution of the queries and waiting between polling attempts is left to the caller. See chainlib.eth.poll.poll_receipts and chainlib.eth.poll.poll_receipts_async.
+
+    If execution of a transaction fails, RevertEthException is raised when its receipt is processed, unless the transaction hash is in the ignore list or ignore_all is set.
+
+    The polling interval is decided by the polling strategy. If no strategy is given, receipts are polled every delay seconds.
+
+    :param tx_hashes_hex: Transaction hashes to wait for, hex
+    :type tx_hashes_hex: list of str
+    :param delay: Polling interval, if no strategy is given
+    :type delay: float
+    :param timeout: Max time to wait for confirmation of all transactions (0 = no timeout)
+    :type timeout: float
+    :param id_generator: json-rpc id generator
+    :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+    :param ignore: Transaction hashes for which to ignore execution failures, hex
+    :type ignore: list of str
+    :param ignore_all: Ignore execution failures of all transactions
+    :type ignore_all: bool
+    :param strategy: Polling strategy
+    :type strategy: chainlib.eth.poll.PollStrategy
+    """
+
+    def __init__(self, tx_hashes_hex, delay=0.5, timeout=0.0, id_generator=None, ignore=[], ignore_all=False, strategy=None):
+        self.pending = self.__normalize(tx_hashes_hex)
+        self.ignore = self.__normalize(ignore)
+        self.ignore_all = ignore_all
+        if strategy == None:
+            strategy = PollStrategy(delay=delay)
+        self.strategy = strategy
+        self.timeout = timeout
+        self.id_generator = id_generator
+        self.attempt = 0
+        self.idle = 0
+        self.head = None
+        self.start = datetime.datetime.utcnow()
+        self.__polled = []
+        self.__head_wait = False
+
+
+    def __normalize(self, tx_hashes_hex):
+        r = []
+        for tx_hash in tx_hashes_hex:
+            tx_hash = add_0x(hex_uniform(strip_0x(tx_hash)))
+            if tx_hash not in r:
+                r.append(tx_hash)
+        return r
+
+
+    @property
+    def done(self):
+        """True if receipts for all transactions have been received.
+        """
+        return len(self.pending) == 0
+
+
+    def request(self):
+        """Generate queries for the next poll.
+
+        This is normally the receipt queries for all pending transactions. If the strategy polls by block height, the receipt queries are preceded by a block height query, and while waiting for the block height to advance, only the block height query is returned.
+
+        :rtype: list of dict
+        :returns: rpc query objects
+        """
+        if self.__head_wait:
+            logg.debug('poll head attempt {} at block {}'.format(self.attempt, self.head))
+            return [block_latest(id_generator=self.id_generator)]
+
+        self.__polled = list(self.pending)
+        o = []
+        if self.strategy.head:
+            o.append(block_latest(id_generator=self.id_generator))
+        for tx_hash in self.__polled:
+            o.append(receipt(tx_hash, id_generator=self.id_generator))
+        logg.debug('poll receipt attempt {} for {} transactions'.format(self.attempt, len(self.__polled)))
+        return o
+
+
+    def __process_head(self, r):
+        if isinstance(r, Exception):
+            raise r
+        head = int(strip_0x(r), 16)
+        if self.head == None or head > self.head:
+            self.head = head
+            return True
+        return False
+
+
+    def process(self, results):
+        """Interpret the results of the queries generated by the last call to request.
+
+        :param results: Query results, in order of the queries. Exception objects in the results are raised.
+        :type results: list
+        :raises chainlib.eth.error.RevertEthException: Transaction confirmed but failed
+        :rtype: generator of dict
+        :returns: Receipts of transactions confirmed since last poll
+        """
+        self.idle += 1
+        if self.__head_wait:
+            if self.__process_head(results[0]):
+                logg.debug('head advanced to {}'.format(self.head))
+                self.__head_wait = False
+                self.idle = 0
+            return
+
+        if self.strategy.head:
+            self.__process_head(results[0])
+            results = results[1:]
+            self.__head_wait = True
+
+        for tx_hash, e in zip(self.__polled, results):
+            if isinstance(e, Exception):
+                raise e
+            if e == None:
+                continue
+            e = receipt_schema.normalize(e)
+            # In openethereum we encounter receipts that have NONE block hashes and numbers. WTF...
+            if e['block_hash'] == None:
+                logg.warning('poll receipt attempt {} for {} returned receipt but with a null block hash value!'.format(self.attempt, tx_hash))
+                continue
+            self.pending.remove(tx_hash)
+            self.idle = 0
+            if strip_0x(e['status']) == '00':
+                if not self.ignore_all and tx_hash not in self.ignore:
+                    raise RevertEthException(tx_hash)
+                logg.debug('ignoring revert in transaction hash {}'.format(tx_hash))
+            yield e
+
+
+    def next_delay(self):
+        """Advance to the next polling attempt.
+
+        If the block height has just advanced, receipts are polled again immediately.
+
+        :raises TimeoutError: Next attempt would exceed timeout
+        :rtype: float
+        :returns: Time to wait before next attempt, in seconds
+        """
+        delay = 0.0
+        if self.__head_wait or not self.strategy.head:
+            delay = self.strategy.next_delay(self.idle)
+        if self.timeout > 0.0:
+            delta = (datetime.datetime.utcnow() - self.start) + datetime.timedelta(seconds=delay)
+            if delta.total_seconds() >= self.timeout:
+                raise TimeoutError(','.join(self.pending))
+        self.attempt += 1
+        return delay
+
+
+def __results(conn, o, error_parser, batch_limit):
+    if len(o) == 1:
+        return [conn.do(o[0], error_parser=error_parser)]
+    return conn.do_batch(o, error_parser=error_parser, batch_limit=batch_limit)
+
+
+def poll_receipts(conn, poller, error_parser=error_parser, batch_limit=0):
+    """Run a receipt poller against a blocking connection until all transactions have been confirmed.
+
+    A single pending transaction is queried with the do method of the connection. Several pending transactions are queried together using its do_batch method.
+
+    :param conn: RPC connection
+    :type conn: chainlib.connection.RPCConnection
+    :param poller: Receipt poller
+    :type poller: chainlib.eth.poll.ReceiptPoller
+    :param error_parser: json-rpc response error parser
+    :type error_parser: chainlib.jsonrpc.ErrorParser
+    :param batch_limit: Maximum number of queries per batch request (0 = no limit)
+    :type batch_limit: int
+    :raises TimeoutError: Timeout reached
+    :raises chainlib.eth.error.RevertEthException: Transaction confirmed but failed
+    :rtype: generator of dict
+    :returns: Transaction receipts, in order of confirmation
+    """
+    while not poller.done:
+        r = __results(conn, poller.request(), error_parser, batch_limit)
+        for e in poller.process(r):
+            yield e
+        if poller.done:
+            return
+        time.sleep(poller.next_delay())
+
+
+async def __results_async(conn, o, error_parser, batch_limit):
+    if len(o) == 1:
+        return [await conn.do(o[0], error_parser=error_parser)]
+    return await conn.do_batch(o, error_parser=error_parser, batch_limit=batch_limit)
+
+
+async def poll_receipts_async(conn, poller, error_parser=error_parser, batch_limit=0):
+    """Asyncio version of chainlib.eth.poll.poll_receipts, for connections with coroutine do and do_batch methods.
+    """
+    while not poller.done:
+        r = await __results_async(conn, poller.request(), error_parser, batch_limit)
+        for e in poller.process(r):
+            yield e
+        if poller.done:
+            return
+        await asyncio.sleep(poller.next_delay())
@@ -0,0 +1,464 @@
+# standard imports
+import logging
+
+# external imports
+from hexathon import (
+        add_0x,
+        strip_0x,
+        to_int as hex_to_int,
+        )
+from chainlib.status import Status
+
+# local imports
+from .address import to_checksum
+from .block import Block
+from .tx import (
+        Tx,
+        LazyTx,
+        TxResult,
+        eth_dialect_filter,
+        )
+
+logg = logging.getLogger(__name__)
+
+
+def _bytes(v):
+    if v == None:
+        return None
+    return bytes.fromhex(strip_0x(v, allow_empty=True))
+
+
+def _int(v):
+    if v == None:
+        return None
+    try:
+        return hex_to_int(v)
+    except TypeError:
+        return int(v)
+
+
+def _hex(v):
+    if v == None:
+        return None
+    return add_0x(v.hex())
+
+
+def _quantity(v):
+    if v == None:
+        return None
+    return hex(v)
+
+
+def _address(v):
+    if v == None:
+        return None
+    return to_checksum(v.hex())
+
+
+def _get(src, k, alt):
+    try:
+        return src[k]
+    except KeyError:
+        return src.get(alt)
+
+
+class LogRecord:
+    """Compact representation of a transaction receipt log entry.
+
+    :param address: Address of emitting contract
+    :type address: bytes
+    :param topics: Log topics
+    :type topics: tuple of bytes
+    :param data: Log data
+    :type data: bytes
+    :param log_index: Index of log in block
+    :type log_index: int
+    """
+
+    __slots__ = ('address', 'topics', 'data', 'log_index',)
+
+    def __init__(self, address, topics=(), data=b'', log_index=None):
+        self.address = address
+        self.topics = topics
+        self.data = data
+        self.log_index = log_index
+
+
+    @classmethod
+    def from_src(cls, src):
+        """Create record from log entry data.
+
+        :param src: Log entry, as found in the logs of the eth_getTransactionReceipt json-rpc result
+        :type src: dict
+        :rtype: chainlib.eth.record.LogRecord
+        :returns: Log record
+        """
+        return cls(
+            _bytes(src['address']),
+            tuple([_bytes(v) for v in src['topics']]),
+            _bytes(src['data']),
+            _int(_get(src, 'logIndex', 'log_index')),
+            )
+
+
+    def to_src(self):
+        """Render record as log entry data.
+
+        :rtype: dict
+        :returns: Log entry
+        """
+        return {
+            'address': _address(self.address),
+            'topics': [_hex(v) for v in self.topics],
+            'data': _hex(self.data),
+            'logIndex': _quantity(self.log_index),
+            }
+
+
+class TxRecord:
+    """Compact representation of a transaction, for keeping large numbers of transactions in memory.
+
+    Hashes, addresses and data are stored as bytes, and quantities as ints. No other data is kept.
+
+    :param hash: Transaction hash
+    :type hash: bytes
+    :param sender: Sender address
+    :type sender: bytes
+    :param recipient: Recipient address, or None for contract creation
+    :type recipient: bytes
+    :param value: Value
+    :type value: int
+    :param nonce: Nonce
+    :type nonce: int
+    :param fee_limit: Gas limit
+    :type fee_limit: int
+    :param fee_price: Gas price
+    :type fee_price: int
+    :param payload: Input data
+    :type payload: bytes
+    :param v: Signature v
+    :type v: int
+    :param r: Signature r
+    :type r: int
+    :param s: Signature s
+    :type s: int
+    :param block_number: Number of block transaction is included in, or None
+    :type block_number: int
+    :param index: Index of transaction in block, or None
+    :type index: int
+    """
+
+    __slots__ = ('hash', 'sender', 'recipient', 'value', 'nonce', 'fee_limit', 'fee_price', 'payload', 'v', 'r', 's', 'block_number', 'index',)
+
+    def __init__(self, hash, sender, recipient, value=0, nonce=0, fee_limit=0, fee_price=0, payload=b'', v=None, r=None, s=None, block_number=None, index=None):
+        self.hash = hash
+        self.sender = sender
+        self.recipient = recipient
+        self.value = value
+        self.nonce = nonce
+        self.fee_limit = fee_limit
+        self.fee_price = fee_price
+        self.payload = payload
+        self.v = v
+        self.r = r
+        self.s = s
+        self.block_number = block_number
+        self.index = index
+
+
+    @classmethod
+    def from_tx(cls, tx):
+        """Create record from transaction object.
+
+        :param tx: Transaction
+        :type tx: chainlib.eth.tx.Tx
+        :rtype: chainlib.eth.record.TxRecord
+        :returns: Transaction record
+        """
+        block_number = None
+        index = None
+        if tx.block != None:
+            block_number = tx.block.number
+            index = tx.index
+        return cls(
+            _bytes(tx.hash),
+            _bytes(tx.outputs[0]),
+            _bytes(tx.inputs[0]),
+            value=tx.value,
+            nonce=tx.nonce,
+            fee_limit=tx.fee_limit,
+            fee_price=tx.fee_price,
+            payload=_bytes(tx.payload),
+            v=tx.v,
+            r=_int(tx.r),
+            s=_int(tx.s),
+            block_number=block_number,
+            index=index,
+            )
+
+
+    @classmethod
+    def from_src(cls, src, dialect_filter=eth_dialect_filter):
+        """Create record from transaction data.
+
+        :param src: Transaction, as returned by the eth_getTransactionByHash json-rpc method
+        :type src: dict
+        :param dialect_filter: Dialect filter to apply to transaction
+        :type dialect_filter: chainlib.eth.dialect.DialectFilter
+        :rtype: chainlib.eth.record.TxRecord
+        :returns: Transaction record
+        """
+        o = cls.from_tx(LazyTx(src, dialect_filter=dialect_filter))
+        o.block_number = _int(_get(src, 'blockNumber', 'block_number'))
+        o.index = _int(_get(src, 'transactionIndex', 'transaction_index'))
+        return o
+
+
+    def to_src(self):
+        """Render record as transaction data.
+
+        :rtype: dict
+        :returns: Transaction, in the format returned by the eth_getTransactionByHash json-rpc method
+        """
+        return {
+            'hash': _hex(self.hash),
+            'from': _address(self.sender),
+            'to': _address(self.recipient),
+            'value': _quantity(self.value),
+            'nonce': _quantity(self.nonce),
+            'gas': _quantity(self.fee_limit),
+            'gasPrice': _quantity(self.fee_price),
+            'input': _hex(self.payload),
+            'v': _quantity(self.v),
+            'r': _quantity(self.r),
+            's': _quantity(self.s),
+            'blockNumber': _quantity(self.block_number),
+            'transactionIndex': _quantity(self.index),
+            }
+
+
+    def to_tx(self, block=None, rcpt=None, dialect_filter=eth_dialect_filter):
+        """Create transaction object from record.
+
+        :param block: Block to apply
+        :type block: chainlib.eth.block.Block
+        :param rcpt: Receipt to apply
+        :type rcpt: dict
+        :rtype: chainlib.eth.tx.Tx
+        :returns: Transaction
+        """
+        return Tx(self.to_src(), block=block, rcpt=rcpt, dialect_filter=dialect_filter)
+
+
+class TxResultRecord:
+    """Compact representation of a transaction receipt.
+
+    :param hash: Transaction hash
+    :type hash: bytes
+    :param block_hash: Hash of block transaction is included in, or None if pending
+    :type block_hash: bytes
+    :param block_number: Number of block transaction is included in, or None if pending
+    :type block_number: int
+    :param index: Index of transaction in block, or None if pending
+    :type index: int
+    :param status: Execution status; 1 for success, 0 for failure
+    :type status: int
+    :param fee_cost: Gas used
+    :type fee_cost: int
+    :param contract: Address of created contract, or None
+    :type contract: bytes
+    :param logs: Log entries
+    :type logs: tuple of chainlib.eth.record.LogRecord
+    """
+
+    __slots__ = ('hash', 'block_hash', 'block_number', 'index', 'status', 'fee_cost', 'contract', 'logs',)
+
+    def __init__(self, hash, block_hash=None, block_number=None, index=None, status=1, fee_cost=0, contract=None, logs=()):
+        self.hash = hash
+        self.block_hash = block_hash
+        self.block_number = block_number
+        self.index = index
+        self.status = status
+        self.fee_cost = fee_cost
+        self.contract = contract
+        self.logs = logs
+
+
+    @classmethod
+    def from_result(cls, result):
+        """Create record from transaction result object.
+
+        :param result: Transaction result
+        :type result: chainlib.eth.tx.TxResult
+        :rtype: chainlib.eth.record.TxResultRecord
+        :returns: Transaction result record
+        """
+        src = result.src
+        block_hash = None
+        index = None
+        status = _int(src.get('status', 1))
+        if result.status != Status.PENDING:
+            block_hash = _bytes(result.block_hash)
+            index = result.tx_index
+        return cls(
+            _bytes(result.hash),
+            block_hash=block_hash,
+            block_number=_int(src['block_number']),
+            index=index,
+            status=status,
+            fee_cost=result.fee_cost,
+            contract=_bytes(result.contract),
+            logs=tuple([LogRecord.from_src(v) for v in result.logs]),
+            )
+
+
+    @classmethod
+    def from_src(cls, src):
+        """Create record from transaction receipt data.
+
+        :param src: Receipt, as returned by the eth_getTransactionReceipt json-rpc method
+        :type src: dict
+        :rtype: chainlib.eth.record.TxResultRecord
+        :returns: Transaction result record
+        """
+        return cls.from_result(TxResult(src=src))
+
+
+    def to_src(self):
+        """Render record as transaction receipt data.
+
+        :rtype: dict
+        :returns: Receipt, in the format returned by the eth_getTransactionReceipt json-rpc method
+        """
+        tx_hash = _hex(self.hash)
+        block_hash = _hex(self.block_hash)
+        block_number = _quantity(self.block_number)
+        index = _quantity(self.index)
+        logs = []
+        for v in self.logs:
+            log = v.to_src()
+            log['transactionHash'] = tx_hash
+            log['transactionIndex'] = index
+            log['blockHash'] = block_hash
+            log['blockNumber'] = block_number
+            logs.append(log)
+        return {
+            'transactionHash': tx_hash,
+            'blockHash': block_hash,
+            'blockNumber': block_number,
+            'transactionIndex': index,
+            'status': _quantity(self.status),
+            'gasUsed': _quantity(self.fee_cost),
+            'contractAddress': _address(self.contract),
+            'logs': logs,
+            }
+
+
+    def to_result(self):
+        """Create transaction result object from record.
+
+        :rtype: chainlib.eth.tx.TxResult
+        :returns: Transaction result
+        """
+        return TxResult(src=self.to_src())
+
+
+class BlockRecord:
+    """Compact representation of a block.
+
+    Transactions are kept as hashes only; use chainlib.eth.record.TxRecord for the transactions themselves.
+
+    :param hash: Block hash
+    :type hash: bytes
+    :param number: Block number
+    :type number: int
+    :param parent_hash: Parent block hash
+    :type parent_hash: bytes
+    :param timestamp: Block timestamp
+    :type timestamp: int
+    :param author: Block author address
+    :type author: bytes
+    :param fee_limit: Block gas limit
+    :type fee_limit: int
+    :param fee_cost: Block gas used
+    :type fee_cost: int
+    :param txs: Transaction hashes
+    :type txs: tuple of bytes
+    """
+
+    __slots__ = ('hash', 'number', 'parent_hash', 'timestamp', 'author', 'fee_limit', 'fee_cost', 'txs',)
+
+    def __init__(self, hash, number, parent_hash=None, timestamp=0, author=None, fee_limit=0, fee_cost=0, txs=()):
+        self.hash = hash
+        self.number = number
+        self.parent_hash = parent_hash
+        self.timestamp = timestamp
+        self.author = author
+        self.fee_limit = fee_limit
+        self.fee_cost = fee_cost
+        self.txs = txs
+
+
+    @classmethod
+    def from_block(cls, block):
+        """Create record from block object.
+
+        :param block: Block
+        :type block: chainlib.eth.block.Block
+        :rtype: chainlib.eth.record.BlockRecord
+        :returns: Block record
+        """
+        txs = []
+        for tx in block.txs:
+            if isinstance(tx, dict):
+                tx = tx['hash']
+            txs.append(_bytes(tx))
+        return cls(
+            _bytes(block.hash),
+            block.number,
+            parent_hash=_bytes(block.parent_hash),
+            timestamp=block.timestamp,
+            author=_bytes(block.author),
+            fee_limit=_int(block.src.get('gas_limit', 0)),
+            fee_cost=_int(block.src.get('gas_used', 0)),
+            txs=tuple(txs),
+            )
+
+
+    @classmethod
+    def from_src(cls, src, dialect_filter=None):
+        """Create record from block data.
+
+        :param src: Block, as returned by the eth_getBlockByNumber or eth_getBlockByHash json-rpc methods
+        :type src: dict
+        :rtype: chainlib.eth.record.BlockRecord
+        :returns: Block record
+        """
+        return cls.from_block(Block(src, dialect_filter=dialect_filter))
+
+
+    def to_src(self):
+        """Render record as block data.
+
+        :rtype: dict
+        :returns: Block, in the format returned by the eth_getBlockByNumber json-rpc method without transaction details
+        """
+        return {
+            'hash': _hex(self.hash),
+            'number': _quantity(self.number),
+            'parentHash': _hex(self.parent_hash),
+            'timestamp': _quantity(self.timestamp),
+            'miner': _address(self.author),
+            'gasLimit': _quantity(self.fee_limit),
+            'gasUsed': _quantity(self.fee_cost),
+            'transactions': [_hex(v) for v in self.txs],
+            }
+
+
+    def to_block(self, dialect_filter=None):
+        """Create block object from record.
+
+        :rtype: chainlib.eth.block.Block
+        :returns: Block
+        """
+        return Block(self.to_src(), dialect_filter=dialect_filter)
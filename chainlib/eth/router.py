@@ -0,0 +1,400 @@
+# standard imports
+import logging
+import threading
+import time
+import collections
+import concurrent.futures
+
+# external imports
+from hexathon import strip_0x
+from chainlib.connection import (
+        RPCConnection,
+        ConnType,
+        str_to_connspec,
+        error_parser,
+        )
+from chainlib.error import (
+        RPCException,
+        JSONRPCException,
+        )
+
+# local imports
+from .connection import EthConnection
+from .block import block_latest
+
+logg = logging.getLogger(__name__)
+
+# json-rpc methods that may safely be sent again to another node if a node fails
+IDEMPOTENT_METHODS = [
+    'eth_blockNumber',
+    'eth_call',
+    'eth_chainId',
+    'eth_estimateGas',
+    'eth_feeHistory',
+    'eth_gasPrice',
+    'eth_getBalance',
+    'eth_getBlockByHash',
+    'eth_getBlockByNumber',
+    'eth_getBlockTransactionCountByHash',
+    'eth_getBlockTransactionCountByNumber',
+    'eth_getCode',
+    'eth_getLogs',
+    'eth_getStorageAt',
+    'eth_getTransactionByBlockHashAndIndex',
+    'eth_getTransactionByBlockNumberAndIndex',
+    'eth_getTransactionByHash',
+    'eth_getTransactionCount',
+    'eth_getTransactionReceipt',
+    'eth_maxPriorityFeePerGas',
+    'eth_syncing',
+    'net_version',
+    'web3_clientVersion',
+    ]
+
+
+class RouterEndpoint:
+    """Health record of a single node behind a chainlib.eth.router.EthRouterConnection.
+
+    Latency and error rate are tracked as exponentially weighted moving averages, where alpha is the weight of the latest sample.
+
+    :param conn: Connection to the node
+    :type conn: chainlib.eth.connection.EthConnection
+    :param alpha: Weight of latest sample in moving averages
+    :type alpha: float
+    :param window: Number of latest latency samples to keep for percentile calculations
+    :type window: int
+    """
+
+    def __init__(self, conn, alpha=0.2, window=100):
+        self.conn = conn
+        self.alpha = alpha
+        self.samples = collections.deque(maxlen=window)
+        self.latency = None
+        self.error_rate = 0.0
+        self.height = None
+        self.failures = 0
+        self.retry_at = 0.0
+        self.lagging = False
+
+
+    def success(self, latency):
+        """Record a successful request.
+
+        :param latency: Request duration, in seconds
+        :type latency: float
+        """
+        self.samples.append(latency)
+        if self.latency == None:
+            self.latency = latency
+        else:
+            self.latency += self.alpha * (latency - self.latency)
+        self.error_rate -= self.alpha * self.error_rate
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+    def failure(self, cooldown, max_cooldown):
+        """Record a failed request, and take the node out of rotation for a time growing with the number of consecutive failures.
+
+        :param cooldown: Time to skip the node after first failure, in seconds
+        :type cooldown: float
+        :param max_cooldown: Max time to skip the node, in seconds
+        :type max_cooldown: float
+        """
+        self.error_rate += self.alpha * (1.0 - self.error_rate)
+        self.failures += 1
+        delay = max_cooldown
+        if self.failures < 32:
+            delay = min(cooldown * (2 ** (self.failures - 1)), max_cooldown)
+        self.retry_at = time.monotonic() + delay
+
+
+    def available(self, now):
+        """True if the node is in rotation.
+
+        :param now: Current monotonic time
+        :type now: float
+        :rtype: bool
+        """
+        return not self.lagging and self.retry_at <= now
+
+
+    def percentile(self, p):
+        """Latency percentile from the latest samples.
+
+        :param p: Percentile, as fraction
+        :type p: float
+        :rtype: float
+        :returns: Latency, in seconds, or None if no samples have been recorded
+        """
+        if len(self.samples) == 0:
+            return None
+        samples = sorted(self.samples)
+        return samples[int(p * (len(samples) - 1))]
+
+
+    @property
+    def score(self):
+        """Routing score of node; lower is better. Nodes without latency samples score best, so that they are tried early.
+
+        :rtype: float
+        """
+        if self.latency == None:
+            return 0.0
+        return self.latency * (1.0 + (self.error_rate * 10.0))
+
+
+    def __str__(self):
+        return '{} latency {} error rate {:.3f} height {}'.format(self.conn.location, self.latency, self.error_rate, self.height)
+
+
+class EthRouterConnection(EthConnection):
+    """Routes json-rpc requests across several Ethereum nodes.
+
+    Every request is sent to the available node with the best score, weighing the measured latency of the node against its recent error rate. A node that fails to respond is taken out of rotation for a while, and if the request only consists of read methods (see IDEMPOTENT_METHODS) it is retried on the next best node. JSON-RPC error responses, like reverted calls, are answers from a healthy node, and are raised to the caller without retry.
+
+    The block height of all nodes is checked at most every head_interval seconds, in a background thread started by the next request. Nodes that are more than lag_limit blocks behind the highest node are taken out of rotation until they catch up.
+
+    If hedge is set, read requests are hedged; if the best node has not answered within the hedge_percentile latency of its recent requests, the same request is also sent to the second best node, and whichever answer arrives first is used. A JSON-RPC error response is an answer too. Until hedge_min_samples latency samples have been recorded for the node, hedge_delay is used as deadline instead.
+
+    The nodes may be given as connection objects, or as a comma-separated list of urls in the url parameter, in which case connections are created with the constructors registered for the "eth_default" tag.
+
+    :param url: Comma-separated list of node urls
+    :type url: str
+    :param pool_size: Number of persistent connections to keep open to each http node created from url (0 = no connection reuse)
+    :type pool_size: int
+    :param connections: Connections to route between, used instead of url
+    :type connections: list of chainlib.eth.connection.EthConnection
+    :param lag_limit: Max number of blocks a node may be behind the highest node
+    :type lag_limit: int
+    :param head_interval: Min time between block height checks, in seconds (0 = no checks)
+    :type head_interval: float
+    :param cooldown: Time to skip a node after first failure, in seconds
+    :type cooldown: float
+    :param max_cooldown: Max time to skip a failing node, in seconds
+    :type max_cooldown: float
+    :param hedge: Hedge read requests
+    :type hedge: bool
+    :param hedge_percentile: Latency percentile of node to use as hedge deadline, as fraction
+    :type hedge_percentile: float
+    :param hedge_delay: Hedge deadline to use while there are too few latency samples, in seconds
+    :type hedge_delay: float
+    :param hedge_min_samples: Number of latency samples needed to use percentile deadline
+    :type hedge_min_samples: int
+    """
+
+    def __init__(self, url=None, chain_spec=None, auth=None, verify_identity=True, timeout=1.0, connections=None, lag_limit=2, head_interval=10.0, cooldown=1.0, max_cooldown=60.0, hedge=False, hedge_percentile=0.95, hedge_delay=0.1, hedge_min_samples=20, pool_size=0):
+        self.endpoints = []
+        super(EthRouterConnection, self).__init__(chain_spec=chain_spec, auth=auth, verify_identity=verify_identity, timeout=timeout)
+        if connections == None:
+            connections = []
+            for v in url.split(','):
+                v = v.strip()
+                conntype = str_to_connspec(v)
+                constructor = RPCConnection.from_conntype(conntype, tag='eth_default')
+                kwargs = {}
+                if pool_size > 0 and conntype in [ConnType.HTTP, ConnType.HTTP_SSL]:
+                    kwargs['pool_size'] = pool_size
+                connections.append(constructor(url=v, chain_spec=chain_spec, auth=auth, verify_identity=verify_identity, timeout=timeout, **kwargs))
+        if len(connections) == 0:
+            raise ValueError('router needs at least one connection')
+        self.endpoints = [RouterEndpoint(conn) for conn in connections]
+        self.location = ','.join([str(conn.location) for conn in connections])
+        self.lag_limit = lag_limit
+        self.head_interval = head_interval
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.executor = None
+        if self.hedge:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(self.endpoints) * 2)
+        self.__lock = threading.Lock()
+        self.__head_checked = 0.0
+        self.__head_thread = None
+
+
+    def __candidates(self):
+        now = time.monotonic()
+        with self.__lock:
+            endpoints = sorted(self.endpoints, key=lambda v: v.score)
+        r = [v for v in endpoints if v.available(now)]
+        if len(r) == 0:
+            # everything is failing or lagging, so best effort is all there is left
+            r = endpoints
+        return r
+
+
+    def __idempotent(self, o):
+        if isinstance(o, list):
+            for v in o:
+                if v['method'] not in IDEMPOTENT_METHODS:
+                    return False
+            return True
+        return o['method'] in IDEMPOTENT_METHODS
+
+
+    def __call(self, endpoint, f):
+        t = time.monotonic()
+        try:
+            r = f(endpoint.conn)
+        except JSONRPCException as e:
+            # the node answered, the error is the answer
+            with self.__lock:
+                endpoint.success(time.monotonic() - t)
+            raise e
+        except (RPCException, OSError) as e:
+            with self.__lock:
+                endpoint.failure(self.cooldown, self.max_cooldown)
+            logg.warning('({}) node {} failed: {}'.format(str(self), endpoint.conn.location, e))
+            raise e
+        with self.__lock:
+            endpoint.success(time.monotonic() - t)
+        return r
+
+
+    def __hedge_deadline(self, endpoint):
+        with self.__lock:
+            if len(endpoint.samples) < self.hedge_min_samples:
+                return self.hedge_delay
+            return endpoint.percentile(self.hedge_percentile)
+
+
+    def __hedged(self, primary, secondary, f):
+        deadline = self.__hedge_deadline(primary)
+        futures = [self.executor.submit(self.__call, primary, f)]
+        (done, pending) = concurrent.futures.wait(futures, timeout=deadline)
+        if len(done) == 0:
+            logg.debug('({}) node {} exceeded hedge deadline {:.3f}, hedging with node {}'.format(str(self), primary.conn.location, deadline, secondary.conn.location))
+            futures.append(self.executor.submit(self.__call, secondary, f))
+
+        last_error = None
+        pending = futures
+        while len(pending) > 0:
+            (done, pending) = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except JSONRPCException as e:
+                    raise e
+                except (RPCException, OSError) as e:
+                    last_error = e
+            # primary failed before the deadline
+            if len(pending) == 0 and len(futures) == 1:
+                futures.append(self.executor.submit(self.__call, secondary, f))
+                pending = [futures[1]]
+        raise last_error
+
+
+    def __route(self, o, f):
+        self.__maybe_check_heads()
+        retry = self.__idempotent(o)
+        candidates = self.__candidates()
+        last_error = None
+        if retry and self.hedge and len(candidates) > 1:
+            try:
+                return self.__hedged(candidates[0], candidates[1], f)
+            except JSONRPCException as e:
+                raise e
+            except (RPCException, OSError) as e:
+                last_error = e
+                candidates = candidates[2:]
+        for endpoint in candidates:
+            try:
+                return self.__call(endpoint, f)
+            except JSONRPCException as e:
+                raise e
+            except (RPCException, OSError) as e:
+                if not retry:
+                    raise e
+                last_error = e
+        raise last_error
+
+
+    def do(self, o, error_parser=error_parser):
+        """Execute a JSON-RPC query on the best available node.
+
+        See chainlib.eth.connection.EthConnection.do
+        """
+        return self.__route(o, lambda conn: conn.do(o, error_parser=error_parser))
+
+
+    def do_batch(self, o, error_parser=error_parser, batch_limit=0):
+        """Execute several JSON-RPC queries as json-rpc batch requests on the best available node.
+
+        See chainlib.eth.connection.EthConnection.do_batch
+        """
+        return self.__route(o, lambda conn: conn.do_batch(o, error_parser=error_parser, batch_limit=batch_limit))
+
+
+    def __maybe_check_heads(self):
+        if self.head_interval <= 0:
+            return
+        now = time.monotonic()
+        with self.__lock:
+            if now - self.__head_checked < self.head_interval:
+                return
+            if self.__head_thread != None and self.__head_thread.is_alive():
+                return
+            self.__head_checked = now
+            # slow or dead nodes must not hold up the request
+            self.__head_thread = threading.Thread(target=self.__check_heads_background, daemon=True)
+            self.__head_thread.start()
+
+
+    def __check_heads_background(self):
+        try:
+            self.check_heads()
+        except Exception as e:
+            logg.error('({}) height check failed: {}'.format(str(self), e))
+
+
+    def check_heads(self, id_generator=None):
+        """Query the block height of all nodes, and take nodes that are lagging out of rotation.
+
+        Failing nodes are included, so that a node that has recovered is put back in rotation.
+
+        :param id_generator: json-rpc id generator
+        :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        :rtype: int
+        :returns: Highest block height seen
+        """
+        for endpoint in self.endpoints:
+            t = time.monotonic()
+            try:
+                r = endpoint.conn.do(block_latest(id_generator=id_generator))
+            except (RPCException, OSError) as e:
+                with self.__lock:
+                    endpoint.failure(self.cooldown, self.max_cooldown)
+                logg.debug('({}) node {} failed height check: {}'.format(str(self), endpoint.conn.location, e))
+                continue
+            with self.__lock:
+                endpoint.success(time.monotonic() - t)
+                endpoint.height = int(strip_0x(r), 16)
+
+        with self.__lock:
+            heights = [v.height for v in self.endpoints if v.height != None]
+            if len(heights) == 0:
+                return None
+            head = max(heights)
+            for endpoint in self.endpoints:
+                lagging = endpoint.height == None or head - endpoint.height > self.lag_limit
+                if lagging and not endpoint.lagging:
+                    logg.info('({}) node {} is lagging at {}, head is {}'.format(str(self), endpoint.conn.location, endpoint.height, head))
+                endpoint.lagging = lagging
+        return head
+
+
+    def disconnect(self):
+        """Disconnect all nodes.
+        """
+        if self.executor != None:
+            self.executor.shutdown(wait=False)
+        for endpoint in self.endpoints:
+            endpoint.conn.disconnect()
+
+
+    def __str__(self):
+        return 'ETH ROUTER JSONRPC'
@@ -10,7 +10,6 @@ import enum
 import select
 
 # external imports
-from potaahto.symbols import snake_and_camel
 from hexathon import (
         add_0x,
         strip_0x,
@@ -42,6 +41,7 @@ from chainlib.eth.block import (
         block_by_hash,
         )
 from chainlib.eth.jsonrpc import to_blockheight_param
+from chainlib.eth.src import receipt_schema
 import chainlib.eth.cli
 from chainlib.eth.cli.arg import (
         Arg,
@@ -130,8 +130,8 @@ def get_transaction(conn, chain_spec, tx_hash, id_generator):
         tx = Tx(tx_src, dialect_filter=settings.get('RPC_DIALECT_FILTER'))
     if rcpt != None:
         tx.apply_receipt(rcpt)
-        rcpt = snake_and_camel(rcpt)
-        o = block_by_hash(rcpt['block_hash'])
+        rcpt = receipt_schema.normalize(rcpt)
+        o = block_by_hash(rcpt['block_hash'], include_tx=False)
         r = conn.do(o)
         block = Block(r, dialect_filter=settings.get('RPC_DIALECT_FILTER'))
         tx.apply_block(block)
@@ -1,21 +1,47 @@
+# standard imports
+import sys
 import json
+import argparse
+import logging
 
-import websocket
+# local imports
+from chainlib.eth.connection import EthWebsocketConnection
 
-ws = websocket.create_connection('ws://localhost:8545')
+logging.basicConfig(level=logging.WARNING)
+logg = logging.getLogger()
 
-o = {
-    "jsonrpc": "2.0",
-    "method": "eth_subscribe",
-    "params": [
-        "newHeads",
-        ],
-    "id": 0,
-        }
+argparser = argparse.ArgumentParser(description='Print notifications from an Ethereum node websocket subscription')
+argparser.add_argument('-p', '--provider', type=str, default='ws://localhost:8545', help='Websocket RPC provider')
+argparser.add_argument('-a', '--address', type=str, action='append', help='Contract address to filter logs by (logs only)')
+argparser.add_argument('-v', action='store_true', help='Be verbose')
+argparser.add_argument('kind', type=str, nargs='?', choices=['heads', 'logs', 'pending'], default='heads', help='Subscription type')
+args = argparser.parse_args()
 
-ws.send(json.dumps(o).encode('utf-8'))
+if args.v:
+    logg.setLevel(logging.DEBUG)
 
-while True:
-    print(ws.recv())
 
-ws.close()
+def main():
+    conn = EthWebsocketConnection(args.provider, timeout=10.0)
+    if args.kind == 'heads':
+        s = conn.heads()
+    elif args.kind == 'logs':
+        s = conn.logs(address=args.address)
+    else:
+        s = conn.pending_transactions()
+
+    try:
+        for v in s:
+            if args.kind == 'heads':
+                v = str(v)
+            elif args.kind == 'logs':
+                v = json.dumps(v)
+            sys.stdout.write(v + '\n')
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        s.close()
+    conn.disconnect()
+
+
+if __name__ == '__main__':
+    main()
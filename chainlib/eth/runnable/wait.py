@@ -130,17 +130,13 @@ def main():
                 continue
             hashes_ready.append(hsh)
             
-    for hsh in hashes_ready:
-        logg.info('processing transaction hash {}'.format(hsh))
-        try:
-            r = settings.get('CONN').wait(hsh)
-        except RevertEthException:
-            if config.get('_IGNORE_ALL') or hsh in hashes_ignore:
-                logg.debug('ignoring revert in transaction hash {}'.format(hsh))
-                continue
-            sys.stderr.write('revert in transaction hash {}\n'.format(hsh))
-            sys.exit(1)
-           
+    try:
+        for r in settings.get('CONN').wait_many(hashes_ready, ignore=hashes_ignore, ignore_all=config.get('_IGNORE_ALL'), batch_limit=settings.get('RPC_BATCH_LIMIT')):
+            logg.info('confirmed transaction hash {}'.format(r['transaction_hash']))
+    except RevertEthException as e:
+        sys.stderr.write('revert in transaction hash {}\n'.format(e))
+        sys.exit(1)
+
 
 if __name__ == '__main__':
     main()
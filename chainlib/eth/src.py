@@ -3,7 +3,10 @@ import logging
 import json
 
 # external imports
-from potaahto.symbols import snake_and_camel
+from potaahto.symbols import (
+        camel_to_snake,
+        snake_to_camel,
+        )
 from hexathon import (
         uniform,
         strip_0x,
@@ -18,11 +21,192 @@ from chainlib.src import (
 logg = logging.getLogger(__name__)
 
 
+class SrcSchema:
+    """Field schema for a type of json-rpc object, used to look up object fields by both their camelCase and their snake_case names.
+
+    The alternate names of the listed fields are computed once, when the schema is created. Alternate names of other fields are computed on first lookup and kept.
+
+    :param name: Object type name
+    :type name: str
+    :param fields: Field names, in either form
+    :type fields: list of str
+    """
+
+    def __init__(self, name, fields=[]):
+        self.name = name
+        self.aliases = {}
+        for k in fields:
+            for v in (k,) + self.alias(k):
+                self.alias(v)
+
+
+    def alias(self, k):
+        """Get the alternate names of a field.
+
+        :param k: Field name
+        :type k: str
+        :rtype: tuple of str
+        :returns: Alternate field names, not including the name itself
+        """
+        try:
+            return self.aliases[k]
+        except KeyError:
+            pass
+        v = []
+        for a in (camel_to_snake(k), snake_to_camel(k),):
+            if a != k and a not in v:
+                v.append(a)
+        v = tuple(v)
+        self.aliases[k] = v
+        return v
+
+
+    def normalize(self, src):
+        """Create a normalized copy of an object.
+
+        :param src: Object, as returned by json-rpc
+        :type src: dict
+        :rtype: chainlib.eth.src.SrcDict
+        :returns: Normalized object
+        """
+        return SrcDict(src, self)
+
+
+class SrcDict(dict):
+    """Dictionary of json-rpc object fields, where every field can be accessed both by its camelCase and its snake_case name.
+
+    Fields are stored only once, under the name they were added with. Lookups of a name that is not stored are resolved through the alternate names in the schema. Assigning to an alternate name of a stored field changes the stored field.
+
+    :param src: Object fields
+    :type src: dict
+    :param schema: Field schema of object type
+    :type schema: chainlib.eth.src.SrcSchema
+    """
+
+    def __init__(self, src, schema):
+        super(SrcDict, self).__init__(src)
+        self.schema = schema
+
+
+    def __missing__(self, k):
+        for a in self.schema.alias(k):
+            if dict.__contains__(self, a):
+                return dict.get(self, a)
+        raise KeyError(k)
+
+
+    def __contains__(self, k):
+        if dict.__contains__(self, k):
+            return True
+        for a in self.schema.alias(k):
+            if dict.__contains__(self, a):
+                return True
+        return False
+
+
+    def __setitem__(self, k, v):
+        if not dict.__contains__(self, k):
+            for a in self.schema.alias(k):
+                if dict.__contains__(self, a):
+                    k = a
+                    break
+        dict.__setitem__(self, k, v)
+
+
+    def get(self, k, default=None):
+        try:
+            return self[k]
+        except KeyError:
+            return default
+
+
+tx_schema = SrcSchema('tx', [
+    'hash',
+    'nonce',
+    'blockHash',
+    'blockNumber',
+    'transactionIndex',
+    'from',
+    'to',
+    'value',
+    'gas',
+    'gasPrice',
+    'maxFeePerGas',
+    'maxPriorityFeePerGas',
+    'input',
+    'data',
+    'type',
+    'chainId',
+    'accessList',
+    'v',
+    'r',
+    's',
+    'raw',
+    ])
+
+receipt_schema = SrcSchema('receipt', [
+    'transactionHash',
+    'transactionIndex',
+    'blockHash',
+    'blockNumber',
+    'from',
+    'to',
+    'cumulativeGasUsed',
+    'effectiveGasPrice',
+    'gasUsed',
+    'contractAddress',
+    'logs',
+    'logsBloom',
+    'status',
+    'type',
+    ])
+
+block_schema = SrcSchema('block', [
+    'hash',
+    'number',
+    'parentHash',
+    'nonce',
+    'sha3Uncles',
+    'logsBloom',
+    'transactionsRoot',
+    'stateRoot',
+    'receiptsRoot',
+    'author',
+    'miner',
+    'coinbase',
+    'difficulty',
+    'totalDifficulty',
+    'extraData',
+    'size',
+    'gasLimit',
+    'gasUsed',
+    'baseFeePerGas',
+    'timestamp',
+    'transactions',
+    'uncles',
+    'mixHash',
+    ])
+
+log_schema = SrcSchema('log', [
+    'address',
+    'topics',
+    'data',
+    'blockHash',
+    'blockNumber',
+    'transactionHash',
+    'transactionIndex',
+    'logIndex',
+    'removed',
+    ])
+
+
 class Src(BaseSrc):
 
+    src_schema = SrcSchema('src')
+
     @classmethod
     def src_normalize(self, v):
-        src = snake_and_camel(v)
+        src = self.src_schema.normalize(v)
         if isinstance(src.get('v'), str):
             try:
                 src['v'] = int(src['v'])
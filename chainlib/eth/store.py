@@ -0,0 +1,344 @@
+# standard imports
+import logging
+import sqlite3
+import threading
+import zlib
+
+# external imports
+from hexathon import (
+        add_0x,
+        strip_0x,
+        uniform as hex_uniform,
+        )
+
+# local imports
+from . import codec
+from .block import (
+        Block,
+        block_by_number,
+        )
+from .tx import (
+        Tx,
+        receipt,
+        eth_dialect_filter,
+        )
+
+logg = logging.getLogger(__name__)
+
+
+def _hash(v):
+    return add_0x(hex_uniform(strip_0x(v)))
+
+
+def _int(v):
+    try:
+        return int(strip_0x(v), 16)
+    except TypeError:
+        return int(v)
+
+
+def _pack(o):
+    return zlib.compress(codec.dumps(o).encode('utf-8'))
+
+
+def _unpack(b):
+    return codec.loads(zlib.decompress(b))
+
+
+class BlockStore:
+    """Persistent store of blocks and transaction receipts, backed by a sqlite3 database.
+
+    Blocks and receipts are stored as they were returned by the node, as compressed json. Blocks are indexed by both number and hash, and the transactions in blocks are indexed by hash.
+
+    The store holds a single chain. When a block is added that does not link to the stored block before it, that the stored block after it does not link to, or that replaces a stored block at the same height with a different hash, the stored blocks from that height and up are considered orphaned by a chain reorganization, and are removed together with their receipts. Orphaned blocks further down are found when their replacements are added, or with the reconcile method.
+
+    :param path: Path to database file. If None, an in-memory database is used.
+    :type path: str
+    """
+
+    def __init__(self, path=None):
+        if path == None:
+            path = ':memory:'
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.__lock = threading.RLock()
+        with self.__lock, self.db:
+            self.db.execute('CREATE TABLE IF NOT EXISTS block (number INTEGER PRIMARY KEY, hash TEXT NOT NULL UNIQUE, parent_hash TEXT, data BLOB NOT NULL)')
+            self.db.execute('CREATE TABLE IF NOT EXISTS tx (hash TEXT PRIMARY KEY, block_number INTEGER NOT NULL, idx INTEGER NOT NULL)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS tx_block_number ON tx (block_number)')
+            self.db.execute('CREATE TABLE IF NOT EXISTS receipt (tx_hash TEXT PRIMARY KEY, block_number INTEGER NOT NULL, data BLOB NOT NULL)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS receipt_block_number ON receipt (block_number)')
+
+
+    def put_block(self, src, receipts=[]):
+        """Add a block to the store, along with any receipts of its transactions.
+
+        Stored blocks orphaned by the new block are removed first.
+
+        :param src: Block, as returned by the eth_getBlockByNumber or eth_getBlockByHash json-rpc methods
+        :type src: dict
+        :param receipts: Transaction receipts, as returned by the eth_getTransactionReceipt json-rpc method
+        :type receipts: list of dict
+        :rtype: int
+        :returns: Number of orphaned blocks removed
+        """
+        number = _int(src['number'])
+        block_hash = _hash(src['hash'])
+        parent_hash = src.get('parentHash', src.get('parent_hash'))
+        if parent_hash != None:
+            parent_hash = _hash(parent_hash)
+
+        with self.__lock, self.db:
+            orphaned = 0
+            r = self.db.execute('SELECT hash FROM block WHERE number = ?', (number,)).fetchone()
+            if r != None and r[0] != block_hash:
+                orphaned = self.__invalidate(number)
+            if parent_hash != None:
+                r = self.db.execute('SELECT hash FROM block WHERE number = ?', (number - 1,)).fetchone()
+                if r != None and r[0] != parent_hash:
+                    orphaned += self.__invalidate(number - 1)
+            r = self.db.execute('SELECT parent_hash FROM block WHERE number = ?', (number + 1,)).fetchone()
+            if r != None and r[0] != None and r[0] != block_hash:
+                orphaned += self.__invalidate(number + 1)
+
+            self.db.execute('INSERT OR REPLACE INTO block (number, hash, parent_hash, data) VALUES (?, ?, ?, ?)', (number, block_hash, parent_hash, _pack(src)))
+            txs = []
+            for i, tx in enumerate(src.get('transactions', [])):
+                if isinstance(tx, dict):
+                    tx = tx['hash']
+                txs.append((_hash(tx), number, i,))
+            self.db.executemany('INSERT OR REPLACE INTO tx (hash, block_number, idx) VALUES (?, ?, ?)', txs)
+            self.__put_receipts(number, receipts)
+
+        if orphaned > 0:
+            logg.info('block {} {} orphaned {} stored blocks'.format(number, block_hash, orphaned))
+        return orphaned
+
+
+    def __put_receipts(self, number, receipts):
+        v = []
+        for rcpt in receipts:
+            tx_hash = rcpt.get('transactionHash', rcpt.get('transaction_hash'))
+            v.append((_hash(tx_hash), number, _pack(rcpt),))
+        self.db.executemany('INSERT OR REPLACE INTO receipt (tx_hash, block_number, data) VALUES (?, ?, ?)', v)
+
+
+    def put_receipts(self, block_number, receipts):
+        """Add receipts for transactions in a stored block.
+
+        :param block_number: Block number
+        :type block_number: int
+        :param receipts: Transaction receipts, as returned by the eth_getTransactionReceipt json-rpc method
+        :type receipts: list of dict
+        """
+        with self.__lock, self.db:
+            self.__put_receipts(block_number, receipts)
+
+
+    def __invalidate(self, number):
+        n = self.db.execute('DELETE FROM block WHERE number >= ?', (number,)).rowcount
+        self.db.execute('DELETE FROM tx WHERE block_number >= ?', (number,))
+        self.db.execute('DELETE FROM receipt WHERE block_number >= ?', (number,))
+        return n
+
+
+    def invalidate(self, number):
+        """Remove the block at the given height and all blocks after it, together with their receipts.
+
+        :param number: Block number
+        :type number: int
+        :rtype: int
+        :returns: Number of blocks removed
+        """
+        with self.__lock, self.db:
+            return self.__invalidate(number)
+
+
+    def head(self):
+        """Get the number of the highest stored block.
+
+        :rtype: int
+        :returns: Block number, or None if store is empty
+        """
+        with self.__lock:
+            return self.db.execute('SELECT MAX(number) FROM block').fetchone()[0]
+
+
+    def __block_src(self, sql, v):
+        with self.__lock:
+            r = self.db.execute(sql, (v,)).fetchone()
+        if r == None:
+            return None
+        return _unpack(r[0])
+
+
+    def block_src_by_number(self, number):
+        """Get a stored block by number, as returned by the node.
+
+        :param number: Block number
+        :type number: int
+        :rtype: dict
+        :returns: Block, or None if not stored
+        """
+        return self.__block_src('SELECT data FROM block WHERE number = ?', number)
+
+
+    def block_src_by_hash(self, block_hash):
+        """Get a stored block by hash, as returned by the node.
+
+        :param block_hash: Block hash, hex
+        :type block_hash: str
+        :rtype: dict
+        :returns: Block, or None if not stored
+        """
+        return self.__block_src('SELECT data FROM block WHERE hash = ?', _hash(block_hash))
+
+
+    def get_block_by_number(self, number, dialect_filter=None):
+        """Get a stored block by number.
+
+        :param number: Block number
+        :type number: int
+        :rtype: chainlib.eth.block.Block
+        :returns: Block, or None if not stored
+        """
+        src = self.block_src_by_number(number)
+        if src == None:
+            return None
+        return Block(src, dialect_filter=dialect_filter)
+
+
+    def get_block_by_hash(self, block_hash, dialect_filter=None):
+        """Get a stored block by hash.
+
+        :param block_hash: Block hash, hex
+        :type block_hash: str
+        :rtype: chainlib.eth.block.Block
+        :returns: Block, or None if not stored
+        """
+        src = self.block_src_by_hash(block_hash)
+        if src == None:
+            return None
+        return Block(src, dialect_filter=dialect_filter)
+
+
+    def get_receipt(self, tx_hash):
+        """Get a stored transaction receipt, as returned by the node.
+
+        :param tx_hash: Transaction hash, hex
+        :type tx_hash: str
+        :rtype: dict
+        :returns: Receipt, or None if not stored
+        """
+        with self.__lock:
+            r = self.db.execute('SELECT data FROM receipt WHERE tx_hash = ?', (_hash(tx_hash),)).fetchone()
+        if r == None:
+            return None
+        return _unpack(r[0])
+
+
+    def get_tx(self, tx_hash, dialect_filter=eth_dialect_filter):
+        """Get a transaction from a stored block, with the block and the receipt of the transaction applied if stored.
+
+        :param tx_hash: Transaction hash, hex
+        :type tx_hash: str
+        :rtype: chainlib.eth.tx.Tx
+        :returns: Transaction, or None if not stored, or if the block was stored without transaction details
+        """
+        tx_hash = _hash(tx_hash)
+        with self.__lock:
+            r = self.db.execute('SELECT block_number, idx FROM tx WHERE hash = ?', (tx_hash,)).fetchone()
+        if r == None:
+            return None
+        block = self.get_block_by_number(r[0])
+        tx_src = block.txs[r[1]]
+        if not isinstance(tx_src, dict):
+            return None
+        rcpt = self.get_receipt(tx_hash)
+        return Tx(tx_src, block=block, rcpt=rcpt, dialect_filter=dialect_filter)
+
+
+    def fetch_block(self, conn, number, receipts=False, id_generator=None):
+        """Get a block from the store, or retrieve it from the node and store it if it is not stored.
+
+        :param conn: RPC connection
+        :type conn: chainlib.connection.RPCConnection
+        :param number: Block number
+        :type number: int
+        :param receipts: Also retrieve and store the receipts of all transactions in the block, in one batch request. For a block already stored, only the missing receipts are retrieved.
+        :type receipts: bool
+        :param id_generator: json-rpc id generator
+        :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        :rtype: chainlib.eth.block.Block
+        :returns: Block, or None if the node does not have it
+        """
+        block = self.get_block_by_number(number)
+        if block != None:
+            if receipts:
+                with self.__lock:
+                    r = self.db.execute('SELECT tx.hash FROM tx LEFT JOIN receipt ON receipt.tx_hash = tx.hash WHERE tx.block_number = ? AND receipt.tx_hash IS NULL ORDER BY tx.idx', (number,)).fetchall()
+                rcpts = self.__fetch_receipts(conn, [v[0] for v in r], id_generator)
+                self.put_receipts(number, rcpts)
+            return block
+        src = conn.do(block_by_number(number, include_tx=True, id_generator=id_generator))
+        if src == None:
+            return None
+        rcpts = []
+        if receipts:
+            tx_hashes = []
+            for tx in src['transactions']:
+                if isinstance(tx, dict):
+                    tx = tx['hash']
+                tx_hashes.append(tx)
+            rcpts = self.__fetch_receipts(conn, tx_hashes, id_generator)
+        self.put_block(src, receipts=rcpts)
+        return Block(src)
+
+
+    def __fetch_receipts(self, conn, tx_hashes, id_generator):
+        rcpts = []
+        if len(tx_hashes) == 0:
+            return rcpts
+        o = []
+        for tx_hash in tx_hashes:
+            o.append(receipt(tx_hash, id_generator=id_generator))
+        for rcpt in conn.do_batch(o):
+            if isinstance(rcpt, Exception):
+                raise rcpt
+            if rcpt != None:
+                rcpts.append(rcpt)
+        return rcpts
+
+
+    def reconcile(self, conn, depth=12, id_generator=None):
+        """Check the most recent stored blocks against the node, and remove those no longer on the canonical chain of the node.
+
+        :param conn: RPC connection
+        :type conn: chainlib.connection.RPCConnection
+        :param depth: Number of most recent stored blocks to check
+        :type depth: int
+        :param id_generator: json-rpc id generator
+        :type id_generator: chainlib.jsonrpc.JSONRPCIdGenerator
+        :rtype: int
+        :returns: Number of blocks removed
+        """
+        head = self.head()
+        if head == None:
+            return 0
+        with self.__lock:
+            stored = self.db.execute('SELECT number, hash FROM block WHERE number > ? ORDER BY number', (head - depth,)).fetchall()
+        invalid = None
+        for (number, block_hash) in stored:
+            r = conn.do(block_by_number(number, include_tx=False, id_generator=id_generator))
+            if r == None or _hash(r['hash']) != block_hash:
+                invalid = number
+                break
+        if invalid == None:
+            return 0
+        return self.invalidate(invalid)
+
+
+    def close(self):
+        """Close the database.
+        """
+        with self.__lock:
+            self.db.close()
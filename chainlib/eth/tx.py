@@ -2,10 +2,15 @@
 import logging
 import enum
 import re
+import os
+import functools
+import itertools
+import collections
+import threading
+import concurrent.futures
 
 # external imports
 import coincurve
-import sha3
 from hexathon import (
         strip_0x,
         add_0x,
@@ -13,11 +18,9 @@ from hexathon import (
         to_int as hex_to_int,
         same as hex_same,
         )
-from rlp import decode as rlp_decode
-from rlp import encode as rlp_encode
 from funga.eth.transaction import EIP155Transaction
 from funga.eth.encoding import (
-        public_key_to_address,
+        public_key_bytes_to_address,
         chain_id_to_v,
         )
 from potaahto.symbols import snake_and_camel
@@ -45,8 +48,19 @@ from .constant import (
         DEFAULT_FEE_LIMIT,
         )
 from .contract import ABIContractEncoder
+from .wire import (
+        tx_wire,
+        rlp_int,
+        rlp_bytes,
+        rlp_list_encode,
+        )
 from .jsonrpc import to_blockheight_param
-from .src import Src
+from .src import (
+        Src,
+        tx_schema,
+        receipt_schema,
+        log_schema,
+        )
 from .dialect import DialectFilter
 
 logg = logging.getLogger(__name__)
@@ -78,15 +92,126 @@ field_debugs = [
         's',
         ]
 
+typed_field_debugs = {
+    1: [
+        'chainId',
+        'nonce',
+        'gasPrice',
+        'gas',
+        'to',
+        'value',
+        'data',
+        'accessList',
+        'v',
+        'r',
+        's',
+        ],
+    2: [
+        'chainId',
+        'nonce',
+        'maxPriorityFeePerGas',
+        'maxFeePerGas',
+        'gas',
+        'to',
+        'value',
+        'data',
+        'accessList',
+        'v',
+        'r',
+        's',
+        ],
+    }
+
+quantity_fields = [
+        'type',
+        'nonce',
+        'gasPrice',
+        'maxPriorityFeePerGas',
+        'maxFeePerGas',
+        'gas',
+        'value',
+        'chainId',
+        ]
+
 
 count = nonce_query
 count_pending = nonce_query
 count_confirmed = nonce_query_confirmed
 
 
+class SenderCache:
+    """Thread-safe least-recently-used cache of recovered transaction senders, used by chainlib.eth.tx.unpack and its variants.
+
+    Entries are keyed by signed transaction hash and chain id, and hold the sender address and the unsigned transaction hash. Deserializing a transaction already in the cache skips signature recovery.
+
+    The cache in use is chainlib.eth.tx.sender_cache. Assign a new instance to it to change the cache size.
+
+    :param size: Max number of entries. If 0, nothing is cached.
+    :type size: int
+    """
+
+    def __init__(self, size=4096):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.__items = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+
+    def get(self, k):
+        """Retrieve an entry from the cache.
+
+        :param k: Signed transaction hash and chain id
+        :type k: tuple
+        :rtype: tuple
+        :returns: Sender address and unsigned transaction hash, or None if not in cache
+        """
+        with self.__lock:
+            v = self.__items.get(k)
+            if v == None:
+                self.misses += 1
+                return None
+            self.__items.move_to_end(k)
+            self.hits += 1
+        return v
+
+
+    def put(self, k, v):
+        """Add an entry to the cache, evicting the least recently used entry if the cache is full.
+
+        :param k: Signed transaction hash and chain id
+        :type k: tuple
+        :param v: Sender address and unsigned transaction hash
+        :type v: tuple
+        """
+        if self.size <= 0:
+            return
+        with self.__lock:
+            self.__items[k] = v
+            self.__items.move_to_end(k)
+            if len(self.__items) > self.size:
+                self.__items.popitem(last=False)
+
+
+    def clear(self):
+        """Remove all entries from the cache.
+        """
+        with self.__lock:
+            self.__items.clear()
+
+
+    def __len__(self):
+        return len(self.__items)
+
+
+sender_cache = SenderCache()
+
+
 def pack(tx_src, chain_spec):
     """Serialize wire format transaction from transaction representation.
 
+    Transactions of type 0x01 (EIP-2930) and 0x02 (EIP-1559) are serialized as EIP-2718 typed transactions. All other transactions are serialized as EIP-155 transactions.
+
     :param tx_src: Transaction source.
     :type tx_src: dict
     :param chain_spec: Chain spec to calculate EIP155 v value
@@ -97,6 +222,9 @@ def pack(tx_src, chain_spec):
     if isinstance(tx_src, Tx):
         tx_src = tx_src.as_dict()
     tx_src = Tx.src_normalize(tx_src)
+    tx_type = __quantity(tx_src.get('type'))
+    if tx_type == 1 or tx_type == 2:
+        return __pack_typed(tx_src, tx_type, chain_spec)
     tx = EIP155Transaction(tx_src, tx_src['nonce'], chain_spec.chain_id())
 
     signature = bytearray(65)
@@ -115,10 +243,73 @@ def pack(tx_src, chain_spec):
 
     #signature[cursor] = chainv_to_v(chain_spec.chain_id(), tx_src['v'])
     tx.apply_signature(chain_spec.chain_id(), signature, v=tx_src['v'])
-    logg.debug('tx {}'.format(tx.serialize()))
+    if logg.isEnabledFor(logging.DEBUG):
+        logg.debug('tx {}'.format(tx.serialize()))
     return tx.rlp_serialize()
 
 
+def __quantity(v):
+    if v == None:
+        return 0
+    if isinstance(v, str):
+        v = strip_0x(v, allow_empty=True)
+        if v == '':
+            return 0
+        return int(v, 16)
+    return int(v)
+
+
+def __binary(v):
+    if v == None:
+        return b''
+    if isinstance(v, str):
+        return bytes.fromhex(strip_0x(v, allow_empty=True))
+    return bytes(v)
+
+
+def __pack_typed(tx_src, tx_type, chain_spec):
+    chain_id = tx_src.get('chainId')
+    if chain_id == None:
+        chain_id = chain_spec.chain_id()
+    fields = [
+        rlp_int(__quantity(chain_id)),
+        rlp_int(__quantity(tx_src['nonce'])),
+        ]
+    if tx_type == 1:
+        fields.append(rlp_int(__quantity(tx_src['gasPrice'])))
+    else:
+        fields.append(rlp_int(__quantity(tx_src['maxPriorityFeePerGas'])))
+        fields.append(rlp_int(__quantity(tx_src['maxFeePerGas'])))
+
+    data = tx_src.get('data')
+    if data == None:
+        data = tx_src.get('input')
+
+    access_list = []
+    for entry in tx_src.get('accessList') or []:
+        keys = [rlp_bytes(__binary(k)) for k in entry['storageKeys']]
+        access_list.append(rlp_list_encode([
+            rlp_bytes(__binary(entry['address'])),
+            rlp_list_encode(keys),
+            ]))
+
+    v = tx_src.get('yParity')
+    if v == None:
+        v = tx_src['v']
+
+    fields += [
+        rlp_int(__quantity(tx_src['gas'])),
+        rlp_bytes(__binary(tx_src.get('to'))),
+        rlp_int(__quantity(tx_src['value'])),
+        rlp_bytes(__binary(data)),
+        rlp_list_encode(access_list),
+        rlp_int(__quantity(v)),
+        rlp_int(__quantity(tx_src['r'])),
+        rlp_int(__quantity(tx_src['s'])),
+        ]
+    return bytes([tx_type]) + rlp_list_encode(fields)
+
+
 def unpack(tx_raw_bytes, chain_spec):
     """Deserialize wire format transaction to transaction representation.
 
@@ -129,13 +320,8 @@ def unpack(tx_raw_bytes, chain_spec):
     :rtype: dict
     :returns: Transaction representation
     """
-    chain_id = chain_spec.chain_id()
-    tx = __unpack_raw(tx_raw_bytes, chain_id)
-    tx['nonce'] = int.from_bytes(tx['nonce'], 'big')
-    tx['gasPrice'] = int.from_bytes(tx['gasPrice'], 'big')
-    tx['gas'] = int.from_bytes(tx['gas'], 'big')
-    tx['value'] = int.from_bytes(tx['value'], 'big')
-    return tx
+    tx = unpack_bytes(tx_raw_bytes, chain_spec)
+    return __unpack_render(tx)
 
 
 def unpack_hex(tx_raw_bytes, chain_spec):
@@ -148,92 +334,275 @@ def unpack_hex(tx_raw_bytes, chain_spec):
     :rtype: dict
     :returns: Transaction representation
     """
-    chain_id = chain_spec.chain_id()
-    tx = __unpack_raw(tx_raw_bytes, chain_id)
-    tx['nonce'] = add_0x(hex(tx['nonce']))
-    tx['gasPrice'] = add_0x(hex(tx['gasPrice']))
-    tx['gas'] = add_0x(hex(tx['gas']))
-    tx['value'] = add_0x(hex(tx['value']))
-    tx['chainId'] = add_0x(hex(tx['chainId']))
+    tx = unpack_bytes(tx_raw_bytes, chain_spec)
+    tx = __unpack_render(tx)
+    for k in quantity_fields:
+        if k in tx:
+            tx[k] = add_0x(hex(tx[k]))
     return tx
 
 
-def __unpack_raw(tx_raw_bytes, chain_id=1):
-    try:
-        d = rlp_decode(tx_raw_bytes)
-    except Exception as e:
-        raise ValueError('RLP deserialization failed: {}'.format(e))
+def unpack_bytes(tx_raw_bytes, chain_spec):
+    """Deserialize wire format transaction to binary transaction representation.
 
-    logg.debug('decoding using chain id {}'.format(str(chain_id)))
-    
-    j = 0
-    for i in d:
-        v = i.hex()
-        if j != 3 and v == '':
-            v = '00'
-        logg.debug('decoded {}: {}'.format(field_debugs[j], v))
-        j += 1
-    vb = chain_id
-    if chain_id != 0:
-        v = int.from_bytes(d[6], 'big')
-        if v > 29:
-            vb = v - (chain_id * 2) - 35
-    r = bytearray(32)
-    r[32-len(d[7]):] = d[7]
-    s = bytearray(32)
-    s[32-len(d[8]):] = d[8]
-    logg.debug('vb {}'.format(vb))
-    sig = b''.join([r, s, bytes([vb])])
+    Hashes, addresses, signature values and input data are bytes, and all numeric values are int. Addresses are not checksummed, and no hex is generated.
+
+    :param tx_raw_bytes: Serialized transaction
+    :type tx_raw_bytes: bytes
+    :param chain_spec: Chain spec to calculate EIP155 v value
+    :type chain_spec: chainlib.chain.ChainSpec
+    :rtype: dict
+    :returns: Transaction representation
+    """
+    return __unpack_raw(tx_raw_bytes, chain_spec.chain_id())
 
-    h = sha3.keccak_256()
-    h.update(rlp_encode(d))
-    signed_hash = h.digest()
 
-    d[6] = chain_id
-    d[7] = b''
-    d[8] = b''
+def __unpack_chunk(chunk, chain_id, binary):
+    r = []
+    for tx_raw_bytes in chunk:
+        try:
+            tx = __unpack_raw(tx_raw_bytes, chain_id)
+        except ValueError as e:
+            r.append(e)
+            continue
+        if not binary:
+            tx = __unpack_render(tx)
+        r.append(tx)
+    return r
 
-    h = sha3.keccak_256()
-    h.update(rlp_encode(d))
-    unsigned_hash = h.digest()
-    
-    #p = so.recover_public_key_from_msg_hash(unsigned_hash)
-    #a = p.to_checksum_address()
+
+def unpack_iter(txs_raw_bytes, chain_spec, workers=None, chunk_size=256, binary=False, executor=None):
+    """Deserialize a stream of wire format transactions, recovering the senders in several processes.
+
+    Transactions are sent to the worker processes in chunks of chunk_size. At most two chunks per worker are processed at any time, and more transactions are only read from the source as results are consumed. Results are yielded in the order of the source.
+
+    If workers is 1 and no executor is given, transactions are deserialized in the current process.
+
+    :param txs_raw_bytes: Serialized transactions
+    :type txs_raw_bytes: iterable of bytes
+    :param chain_spec: Chain spec to calculate EIP155 v value
+    :type chain_spec: chainlib.chain.ChainSpec
+    :param workers: Number of worker processes. If None, the number of processors is used.
+    :type workers: int
+    :param chunk_size: Number of transactions per chunk
+    :type chunk_size: int
+    :param binary: Return binary representation, as chainlib.eth.tx.unpack_bytes
+    :type binary: bool
+    :param executor: Process pool to use instead of creating one. It is not shut down when done.
+    :type executor: concurrent.futures.Executor
+    :raises ValueError: Invalid serialized transaction, raised at its position in the stream
+    :rtype: generator of dict
+    :returns: Transaction representations, as chainlib.eth.tx.unpack
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    if workers == None:
+        workers = os.cpu_count() or 1
+    chain_id = chain_spec.chain_id()
+    it = iter(txs_raw_bytes)
+
+    if workers == 1 and executor == None:
+        for tx_raw_bytes in it:
+            for tx in __unpack_chunk([tx_raw_bytes], chain_id, binary):
+                if isinstance(tx, Exception):
+                    raise tx
+                yield tx
+        return
+
+    pool = executor
+    if pool == None:
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    futures = collections.deque()
+
+    def submit():
+        chunk = list(itertools.islice(it, chunk_size))
+        if len(chunk) == 0:
+            return False
+        futures.append(pool.submit(__unpack_chunk, chunk, chain_id, binary))
+        return True
+
+    try:
+        for i in range(workers * 2):
+            if not submit():
+                break
+        while len(futures) > 0:
+            r = futures.popleft().result()
+            submit()
+            for tx in r:
+                if isinstance(tx, Exception):
+                    raise tx
+                yield tx
+    finally:
+        for future in futures:
+            future.cancel()
+        if executor == None:
+            pool.shutdown(wait=False)
+
+
+def unpack_many(txs_raw_bytes, chain_spec, workers=None, chunk_size=256, binary=False, executor=None):
+    """Deserialize several wire format transactions, recovering the senders in several processes.
+
+    See chainlib.eth.tx.unpack_iter
+
+    :rtype: list of dict
+    :returns: Transaction representations, in order
+    """
+    return list(unpack_iter(txs_raw_bytes, chain_spec, workers=workers, chunk_size=chunk_size, binary=binary, executor=executor))
+
+
+def __unpack_render(tx):
+    # hex is generated here only, at the edge of the public unpack functions
+    tx = dict(tx)
+    tx['from'] = to_checksum(tx['from'].hex())
+    if tx['to'] != None:
+        tx['to'] = to_checksum(tx['to'].hex())
+    tx['data'] = add_0x(tx['data'].hex(), allow_empty=True)
+    tx['r'] = add_0x(tx['r'].hex())
+    tx['s'] = add_0x(tx['s'].hex())
+    tx['hash'] = add_0x(tx['hash'].hex())
+    tx['hash_unsigned'] = add_0x(tx['hash_unsigned'].hex())
+    if 'accessList' in tx:
+        access_list = []
+        for (address, keys) in tx['accessList']:
+            access_list.append({
+                'address': to_checksum(address.hex()),
+                'storageKeys': [add_0x(k.hex()) for k in keys],
+                })
+        tx['accessList'] = access_list
+    return tx
+
+
+def __recover_sender(signed_hash, chain_id, sig, unsigned_hash_fn):
+    k = (signed_hash, chain_id,)
+    cached = sender_cache.get(k)
+    if cached != None:
+        return cached
+    unsigned_hash = unsigned_hash_fn()
     pubk = coincurve.PublicKey.from_signature_and_message(sig, unsigned_hash, hasher=None)
-    a = public_key_to_address(pubk)
-    logg.debug('decoded recovery byte {}'.format(vb))
-    logg.debug('decoded address {}'.format(a))
-    logg.debug('decoded signed hash {}'.format(signed_hash.hex()))
-    logg.debug('decoded unsigned hash {}'.format(unsigned_hash.hex()))
+    a = public_key_bytes_to_address(pubk.format(compressed=False), result_format='bytes')
+    sender_cache.put(k, (a, unsigned_hash,))
+    return (a, unsigned_hash,)
 
-    to = d[3].hex() or None
-    if to != None:
-        to = to_checksum(to)
 
-    data = d[5].hex()
+def __unpack_raw(tx_raw_bytes, chain_id=1):
     try:
-        data = add_0x(data)
-    except:
-        data = '0x'
+        w = tx_wire(tx_raw_bytes)
+    except ValueError as e:
+        raise ValueError('RLP deserialization failed: {}'.format(e))
+
+    debug = logg.isEnabledFor(logging.DEBUG)
+    if debug:
+        logg.debug('decoding type {} using chain id {}'.format(w.tx_type, str(chain_id)))
+        names = field_debugs
+        if w.tx_type > 0:
+            names = typed_field_debugs[w.tx_type]
+        j = 0
+        for i in w.fields:
+            v = i.hex()
+            if names[j] != 'to' and v == '':
+                v = '00'
+            logg.debug('decoded {}: {}'.format(names[j], v))
+            j += 1
+
+    if w.tx_type > 0:
+        return __unpack_typed(w, chain_id, debug)
+
+    v = w.int(6)
+    signed_chain_id = chain_id
+    if v == 27 or v == 28:
+        vb = v - 27
+        signed_chain_id = None
+    else:
+        vb = chain_id
+        if chain_id != 0:
+            if v > 29:
+                vb = v - (chain_id * 2) - 35
+    r = bytes(w.fields[7]).rjust(32, b'\x00')
+    s = bytes(w.fields[8]).rjust(32, b'\x00')
+    if debug:
+        logg.debug('vb {}'.format(vb))
+    sig = b''.join([r, s, bytes([vb])])
+
+    signed_hash = w.signed_hash()
+    (a, unsigned_hash) = __recover_sender(signed_hash, chain_id, sig, lambda: w.unsigned_hash(signed_chain_id))
+    if debug:
+        logg.debug('decoded recovery byte {}'.format(vb))
+        logg.debug('decoded address {}'.format(a.hex()))
+        logg.debug('decoded signed hash {}'.format(signed_hash.hex()))
+        logg.debug('decoded unsigned hash {}'.format(unsigned_hash.hex()))
+
+    to = bytes(w.fields[3])
+    if len(to) == 0:
+        to = None
 
     return {
+        'type': 0,
         'from': a,
         'to': to, 
-        'nonce': d[0],
-        'gasPrice': d[1],
-        'gas': d[2],
-        'value': d[4],
-        'data': data,
+        'nonce': w.int(0),
+        'gasPrice': w.int(1),
+        'gas': w.int(2),
+        'value': w.int(4),
+        'data': bytes(w.fields[5]),
         'v': v,
         'recovery_byte': vb,
-        'r': add_0x(sig[:32].hex()),
-        's': add_0x(sig[32:64].hex()),
+        'r': r,
+        's': s,
         'chainId': chain_id,
-        'hash': add_0x(signed_hash.hex()),
-        'hash_unsigned': add_0x(unsigned_hash.hex()),
+        'hash': signed_hash,
+        'hash_unsigned': unsigned_hash,
             }
 
 
+def __unpack_typed(w, chain_id, debug):
+    # index of gas limit, after the one or two fee price fields
+    g = w.field_count - 8
+    vb = w.int(g + 5)
+    if vb > 1:
+        raise ValueError('invalid y parity {}'.format(vb))
+    r = bytes(w.fields[g + 6]).rjust(32, b'\x00')
+    s = bytes(w.fields[g + 7]).rjust(32, b'\x00')
+    sig = b''.join([r, s, bytes([vb])])
+
+    signed_hash = w.signed_hash()
+    (a, unsigned_hash) = __recover_sender(signed_hash, chain_id, sig, w.unsigned_hash)
+    if debug:
+        logg.debug('decoded recovery byte {}'.format(vb))
+        logg.debug('decoded address {}'.format(a.hex()))
+        logg.debug('decoded signed hash {}'.format(signed_hash.hex()))
+        logg.debug('decoded unsigned hash {}'.format(unsigned_hash.hex()))
+
+    to = bytes(w.fields[g + 1])
+    if len(to) == 0:
+        to = None
+
+    tx = {
+        'type': w.tx_type,
+        'from': a,
+        'to': to,
+        'nonce': w.int(1),
+        }
+    if w.tx_type == 1:
+        tx['gasPrice'] = w.int(2)
+    else:
+        tx['maxPriorityFeePerGas'] = w.int(2)
+        tx['maxFeePerGas'] = w.int(3)
+    tx.update({
+        'gas': w.int(g),
+        'value': w.int(g + 2),
+        'data': bytes(w.fields[g + 3]),
+        'accessList': w.access_list(),
+        'v': vb,
+        'recovery_byte': vb,
+        'r': r,
+        's': s,
+        'chainId': w.int(0),
+        'hash': signed_hash,
+        'hash_unsigned': unsigned_hash,
+        })
+    return tx
+
+
 def transaction(hsh, id_generator=None):
     """Generate json-rpc query to retrieve transaction by hash from node.
 
@@ -524,6 +893,17 @@ class TxFactory:
 
 class TxResult(BaseTxResult, Src):
 
+    src_schema = receipt_schema
+
+    @classmethod
+    def src_normalize(self, v):
+        src = super(TxResult, self).src_normalize(v)
+        logs = src.get('logs')
+        if logs != None:
+            src['logs'] = [log_schema.normalize(log) for log in logs]
+        return src
+
+
     def apply_src(self, v, dialect_filter=None):
         self.contract = None
 
@@ -585,6 +965,8 @@ class Tx(BaseTx, Src):
     #:todo: divide up constructor method
     """
 
+    src_schema = tx_schema
+
     def __init__(self, src, block=None, result=None, strict=False, rcpt=None, dialect_filter=eth_dialect_filter):
         # backwards compat
         self.gas_price = None
@@ -629,10 +1011,14 @@ class Tx(BaseTx, Src):
         except TypeError:
             self.fee_limit = int(self.src['gas'])
 
+        # typed transactions decoded from wire format have no gas price, only the max fee
+        fee_price = self.src.get('gas_price')
+        if fee_price == None:
+            fee_price = self.src['max_fee_per_gas']
         try:
-            self.fee_price = hex_to_int(self.src['gas_price'])
+            self.fee_price = hex_to_int(fee_price)
         except TypeError:
-            self.fee_price = int(self.src['gas_price'])
+            self.fee_price = int(fee_price)
 
         self.gas_price = self.fee_price
         self.gas_limit = self.fee_limit
@@ -808,3 +1194,135 @@ class Tx(BaseTx, Src):
                 s += '{} {}'.format(k, outvals[i])
 
         return s
+
+
+class LazyTx(Tx):
+    """Transaction object that parses transaction fields only when they are accessed.
+
+    Only the transaction hash and the raw wire data are read at construction. All other fields are parsed from the transaction data on first access, and the result is kept. The normalized transaction data in the src property is likewise only generated when accessed.
+
+    Arguments are the same as for chainlib.eth.tx.Tx.
+    """
+
+    lazy_fields = [
+        'value',
+        'nonce',
+        'fee_limit',
+        'fee_price',
+        'gas_limit',
+        'gas_price',
+        'outputs',
+        'inputs',
+        'payload',
+        'v',
+        'r',
+        's',
+        ]
+
+    def apply_src(self, src, dialect_filter=None):
+        if dialect_filter != None:
+            src = dialect_filter.apply_src(src)
+        self.__raw = src
+        self.__src = None
+        return src
+
+
+    @property
+    def src(self):
+        if self.__src == None:
+            self.__src = self.src_normalize(self.__raw)
+        return self.__src
+
+
+    def load_src(self, dialect_filter=eth_dialect_filter):
+        # drop the defaults set by the parent constructors, so that fields are parsed on access
+        for k in self.lazy_fields:
+            self.__dict__.pop(k, None)
+        if dialect_filter != None:
+            # the filter may change the source in place, which is owned by the block
+            self.__raw = dialect_filter.apply_tx(dict(self.__raw))
+        self.set_hash(self.normal(self.__raw['hash'], SrcItem.HASH))
+        self.set_wire(self.__raw.get('raw'))
+
+
+    def __int(self, *k):
+        for kk in k:
+            v = self.__raw.get(kk)
+            if v != None:
+                break
+        if v == None:
+            raise KeyError(k[0])
+        try:
+            return hex_to_int(v)
+        except TypeError:
+            return int(v)
+
+
+    @functools.cached_property
+    def value(self):
+        return self.__int('value')
+
+
+    @functools.cached_property
+    def nonce(self):
+        return self.__int('nonce')
+
+
+    @functools.cached_property
+    def fee_limit(self):
+        return self.__int('gas')
+
+
+    @functools.cached_property
+    def fee_price(self):
+        return self.__int('gasPrice', 'gas_price', 'maxFeePerGas', 'max_fee_per_gas')
+
+
+    @functools.cached_property
+    def gas_limit(self):
+        return self.fee_limit
+
+
+    @functools.cached_property
+    def gas_price(self):
+        return self.fee_price
+
+
+    @functools.cached_property
+    def outputs(self):
+        address_from = self.normal(self.__raw['from'], SrcItem.ADDRESS)
+        return [to_checksum(address_from)]
+
+
+    @functools.cached_property
+    def inputs(self):
+        to = self.__raw['to']
+        if to != None:
+            to = to_checksum(strip_0x(to))
+        return [to]
+
+
+    @functools.cached_property
+    def payload(self):
+        return self.normal(self.__raw['input'], SrcItem.PAYLOAD)
+
+
+    @functools.cached_property
+    def v(self):
+        v = self.__raw.get('v')
+        if isinstance(v, str):
+            try:
+                v = int(v)
+            except ValueError:
+                v = int(v, 16)
+        return v
+
+
+    @functools.cached_property
+    def r(self):
+        return self.__raw.get('r')
+
+
+    @functools.cached_property
+    def s(self):
+        return self.__raw.get('s')
@@ -0,0 +1,308 @@
+# standard imports
+import logging
+
+# external imports
+import sha3
+
+logg = logging.getLogger(__name__)
+
+
+def rlp_item(view, cursor, end):
+    """Parse the header of the RLP item at the given position.
+
+    Only canonical encodings are accepted.
+
+    :param view: Encoded data
+    :type view: memoryview
+    :param cursor: Position of item
+    :type cursor: int
+    :param end: Position after last byte the item may use
+    :type end: int
+    :raises ValueError: Invalid or non-canonical encoding, or item exceeds end
+    :rtype: tuple
+    :returns: Position of item payload, position after item payload, and whether item is a list
+    """
+    if cursor >= end:
+        raise ValueError('item at {} exceeds data'.format(cursor))
+    b = view[cursor]
+    is_list = b >= 0xc0
+    if b < 0x80:
+        return (cursor, cursor + 1, False,)
+    if is_list:
+        b -= 0x40
+    if b <= 0xb7:
+        start = cursor + 1
+        l = b - 0x80
+        if l == 1 and not is_list and start < end and view[start] < 0x80:
+            raise ValueError('single byte at {} not encoded as itself'.format(cursor))
+    else:
+        ll = b - 0xb7
+        start = cursor + 1 + ll
+        if start > end:
+            raise ValueError('length of item at {} exceeds data'.format(cursor))
+        if view[cursor + 1] == 0:
+            raise ValueError('length of item at {} has leading zeros'.format(cursor))
+        l = int.from_bytes(view[cursor+1:start], 'big')
+        if l <= 55:
+            raise ValueError('long length used for short item at {}'.format(cursor))
+    if start + l > end:
+        raise ValueError('item at {} exceeds data'.format(cursor))
+    return (start, start + l, is_list,)
+
+
+def rlp_list(view, start, end):
+    """Parse the items of an RLP list payload.
+
+    :param view: Encoded data
+    :type view: memoryview
+    :param start: Position of list payload
+    :type start: int
+    :param end: Position after list payload
+    :type end: int
+    :raises ValueError: Invalid or non-canonical encoding
+    :rtype: list of tuple
+    :returns: For each item; position of item, position of item payload, position after item payload, and whether item is a list
+    """
+    items = []
+    cursor = start
+    while cursor < end:
+        (item_start, item_end, is_list) = rlp_item(view, cursor, end)
+        items.append((cursor, item_start, item_end, is_list,))
+        cursor = item_end
+    return items
+
+
+def rlp_header(l, offset):
+    """Generate an RLP header.
+
+    :param l: Payload length
+    :type l: int
+    :param offset: 0x80 for a string, 0xc0 for a list
+    :type offset: int
+    :rtype: bytes
+    :returns: Header
+    """
+    if l <= 55:
+        return bytes([offset + l])
+    lb = l.to_bytes((l.bit_length() + 7) // 8, 'big')
+    return bytes([offset + 55 + len(lb)]) + lb
+
+
+def rlp_int(v):
+    """RLP encode an integer.
+
+    :param v: Value
+    :type v: int
+    :rtype: bytes
+    :returns: Encoded value
+    """
+    if v == 0:
+        return b'\x80'
+    if v < 0x80:
+        return bytes([v])
+    b = v.to_bytes((v.bit_length() + 7) // 8, 'big')
+    return rlp_header(len(b), 0x80) + b
+
+
+def rlp_bytes(b):
+    """RLP encode a byte string.
+
+    :param b: Value
+    :type b: bytes
+    :rtype: bytes
+    :returns: Encoded value
+    """
+    if len(b) == 1 and b[0] < 0x80:
+        return bytes(b)
+    return rlp_header(len(b), 0x80) + b
+
+
+def rlp_list_encode(items):
+    """RLP encode a list of already encoded items.
+
+    :param items: Encoded items
+    :type items: list of bytes
+    :rtype: bytes
+    :returns: Encoded list
+    """
+    b = b''.join(items)
+    return rlp_header(len(b), 0xc0) + b
+
+
+class TxWire:
+    """Signed transaction in wire format, parsed in place.
+
+    The fields are memoryview slices of the serialized transaction, in the order of the transaction type. No field data is copied.
+
+    :param tx_raw_bytes: Serialized transaction
+    :type tx_raw_bytes: bytes
+    :param offset: Position of the RLP list of transaction fields
+    :type offset: int
+    :raises ValueError: Invalid encoding, or wrong number of fields
+    """
+
+    field_count = 0
+    list_fields = ()
+
+    def __init__(self, tx_raw_bytes, offset=0):
+        self.raw = tx_raw_bytes
+        self.view = memoryview(tx_raw_bytes)
+        (start, end, is_list) = rlp_item(self.view, offset, len(self.view))
+        if not is_list:
+            raise ValueError('transaction is not an RLP list')
+        if end != len(self.view):
+            raise ValueError('{} superfluous bytes after transaction'.format(len(self.view) - end))
+        self.items = rlp_list(self.view, start, end)
+        if len(self.items) != self.field_count:
+            raise ValueError('expected {} transaction fields, got {}'.format(self.field_count, len(self.items)))
+        self.fields = []
+        i = 0
+        for (cursor, item_start, item_end, is_list) in self.items:
+            if is_list != (i in self.list_fields):
+                raise ValueError('unexpected item type in transaction field at {}'.format(cursor))
+            self.fields.append(self.view[item_start:item_end])
+            i += 1
+
+
+    def int(self, i):
+        """Get field value as int.
+
+        :param i: Field index
+        :type i: int
+        :rtype: int
+        :returns: Value
+        """
+        return int.from_bytes(self.fields[i], 'big')
+
+
+    def signed_hash(self):
+        """Calculate the transaction hash.
+
+        :rtype: bytes
+        :returns: Hash
+        """
+        h = sha3.keccak_256()
+        h.update(self.view)
+        return h.digest()
+
+
+    def _unsigned_hash(self, prefix, n, tail):
+        start = self.items[0][0]
+        end = self.items[n - 1][2]
+        h = sha3.keccak_256()
+        h.update(prefix)
+        h.update(rlp_header(end - start + len(tail), 0xc0))
+        h.update(self.view[start:end])
+        h.update(tail)
+        return h.digest()
+
+
+class LegacyTxWire(TxWire):
+    """Legacy and EIP-155 signed transaction in wire format.
+
+    Fields are nonce, gas price, gas limit, recipient, value, data, v, r, s.
+
+    :param tx_raw_bytes: Serialized transaction
+    :type tx_raw_bytes: bytes
+    :raises ValueError: Invalid encoding, or not a legacy transaction
+    """
+
+    tx_type = 0
+    field_count = 9
+
+    def unsigned_hash(self, chain_id=None):
+        """Calculate the hash of the unsigned transaction, as signed by the sender.
+
+        The unsigned transaction is framed from the slices of the first six fields. If chain id is given, the EIP-155 chain id and two empty values are appended.
+
+        :param chain_id: Chain id, or None for pre-EIP-155 transactions
+        :type chain_id: int
+        :rtype: bytes
+        :returns: Hash
+        """
+        tail = b''
+        if chain_id != None:
+            tail = rlp_int(chain_id) + b'\x80\x80'
+        return self._unsigned_hash(b'', 6, tail)
+
+
+class TypedTxWire(TxWire):
+    """EIP-2718 typed signed transaction in wire format, of type 0x01 (EIP-2930) or 0x02 (EIP-1559).
+
+    Fields for type 0x01 are chain id, nonce, gas price, gas limit, recipient, value, data, access list, y parity, r, s.
+
+    Fields for type 0x02 are chain id, nonce, max priority fee per gas, max fee per gas, gas limit, recipient, value, data, access list, y parity, r, s.
+
+    The access list field is the payload of the access list RLP list. Use chainlib.eth.wire.TypedTxWire.access_list to parse it.
+
+    :param tx_raw_bytes: Serialized transaction
+    :type tx_raw_bytes: bytes
+    :raises ValueError: Invalid encoding, or unsupported transaction type
+    """
+
+    field_counts = {
+        1: 11,
+        2: 12,
+        }
+
+    def __init__(self, tx_raw_bytes):
+        if len(tx_raw_bytes) == 0:
+            raise ValueError('empty transaction')
+        self.tx_type = tx_raw_bytes[0]
+        try:
+            self.field_count = self.field_counts[self.tx_type]
+        except KeyError:
+            raise ValueError('unsupported transaction type {}'.format(self.tx_type))
+        self.access_list_field = self.field_count - 4
+        self.list_fields = (self.access_list_field,)
+        super(TypedTxWire, self).__init__(tx_raw_bytes, offset=1)
+
+
+    def access_list(self):
+        """Parse the access list.
+
+        :raises ValueError: Invalid access list
+        :rtype: list of tuple
+        :returns: Address and list of storage keys, as bytes, for each entry
+        """
+        r = []
+        (cursor, start, end, is_list) = self.items[self.access_list_field]
+        for (cursor, item_start, item_end, is_list) in rlp_list(self.view, start, end):
+            entry = rlp_list(self.view, item_start, item_end)
+            if not is_list or len(entry) != 2 or entry[0][3] or not entry[1][3]:
+                raise ValueError('invalid access list entry at {}'.format(cursor))
+            address = bytes(self.view[entry[0][1]:entry[0][2]])
+            if len(address) != 20:
+                raise ValueError('invalid access list address at {}'.format(cursor))
+            keys = []
+            for (key_cursor, key_start, key_end, key_is_list) in rlp_list(self.view, entry[1][1], entry[1][2]):
+                if key_is_list or key_end - key_start != 32:
+                    raise ValueError('invalid access list storage key at {}'.format(key_cursor))
+                keys.append(bytes(self.view[key_start:key_end]))
+            r.append((address, keys,))
+        return r
+
+
+    def unsigned_hash(self):
+        """Calculate the hash of the unsigned transaction, as signed by the sender.
+
+        The unsigned transaction is the transaction type followed by the list framed from the slices of all fields up to and including the access list.
+
+        :rtype: bytes
+        :returns: Hash
+        """
+        return self._unsigned_hash(self.view[:1], self.field_count - 3, b'')
+
+
+def tx_wire(tx_raw_bytes):
+    """Parse a signed transaction in wire format, legacy or typed.
+
+    :param tx_raw_bytes: Serialized transaction
+    :type tx_raw_bytes: bytes
+    :raises ValueError: Invalid encoding, or unsupported transaction type
+    :rtype: chainlib.eth.wire.TxWire
+    :returns: Parsed transaction
+    """
+    if len(tx_raw_bytes) > 0 and tx_raw_bytes[0] < 0x80:
+        return TypedTxWire(tx_raw_bytes)
+    return LegacyTxWire(tx_raw_bytes)
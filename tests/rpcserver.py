@@ -0,0 +1,267 @@
+# standard imports
+import os
+import json
+import base64
+import hashlib
+import struct
+import threading
+import tempfile
+import socketserver
+from http.server import (
+        ThreadingHTTPServer,
+        BaseHTTPRequestHandler,
+        )
+
+# external imports
+from chainlib.jsonrpc import (
+        jsonrpc_response,
+        jsonrpc_error,
+        )
+
+
+class RPCRequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        l = int(self.headers['Content-Length'])
+        o = json.loads(self.rfile.read(l))
+        self.server.requests.append(o)
+        if isinstance(o, list):
+            r = []
+            for v in o:
+                r.append(self.server.respond(v))
+            if self.server.reverse:
+                r.reverse()
+        else:
+            r = self.server.respond(o)
+        data = json.dumps(r).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+    def log_message(self, *args):
+        pass
+
+
+class RPCServer(ThreadingHTTPServer):
+    """Minimal json-rpc server answering with the results of the methods registered in the methods dict.
+
+    Every request body received is recorded in the requests list. If reverse is set, batch responses are returned in reverse order.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, methods, reverse=False):
+        super(RPCServer, self).__init__(('127.0.0.1', 0), RPCRequestHandler)
+        self.methods = methods
+        self.reverse = reverse
+        self.requests = []
+        self.connections = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+
+    def get_request(self):
+        self.connections += 1
+        return super(RPCServer, self).get_request()
+
+
+    def respond(self, o):
+        m = self.methods.get(o['method'])
+        if m == None:
+            return jsonrpc_error(o['id'], code=-32601, message='method not found')
+        try:
+            return jsonrpc_response(o['id'], m(o['params']))
+        except Exception as e:
+            return jsonrpc_error(o['id'], message=str(e))
+
+
+    @property
+    def url(self):
+        return 'http://{}:{}'.format(self.server_address[0], self.server_address[1])
+
+
+    def start(self):
+        self.thread.start()
+
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class RPCUnixRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        b = b''
+        while True:
+            b += self.request.recv(4096)
+            try:
+                o = json.loads(b)
+                break
+            except ValueError:
+                pass
+        self.server.requests.append(o)
+        if isinstance(o, list):
+            r = [self.server.respond(v) for v in o]
+        else:
+            r = self.server.respond(o)
+        self.wfile.write(json.dumps(r).encode('utf-8'))
+        # keep the socket open like a node would, until the client hangs up
+        self.request.recv(1)
+
+
+class RPCUnixServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket counterpart of RPCServer.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, methods):
+        self.path = os.path.join(tempfile.mkdtemp(), 'rpc.ipc')
+        super(RPCUnixServer, self).__init__(self.path, RPCUnixRequestHandler)
+        self.methods = methods
+        self.requests = []
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+
+    respond = RPCServer.respond
+
+
+    @property
+    def url(self):
+        return 'ipc://' + self.path
+
+
+    def start(self):
+        self.thread.start()
+
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        os.unlink(self.path)
+
+
+class RPCWebsocketRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        key = None
+        while True:
+            l = self.rfile.readline().decode('latin-1').rstrip('\r\n')
+            if l == '':
+                break
+            (k, _, v) = l.partition(':')
+            if k.strip().lower() == 'sec-websocket-key':
+                key = v.strip()
+        accept = hashlib.sha1((key + '258EAFA5-E914-47DA-95CA-C5AB0DC85B11').encode('ascii')).digest()
+        self.wfile.write('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Accept: {}\r\n\r\n'.format(base64.b64encode(accept).decode('ascii')).encode('ascii'))
+
+        self.server.clients.append(self)
+        try:
+            while True:
+                data = self.read_frame()
+                if data == None:
+                    break
+                o = json.loads(data)
+                self.server.requests.append(o)
+                if isinstance(o, list):
+                    r = [self.server.respond(v) for v in o]
+                else:
+                    r = self.server.respond(o)
+                self.send(r)
+        finally:
+            self.server.clients.remove(self)
+
+
+    def read_frame(self):
+        h = self.rfile.read(2)
+        if len(h) < 2 or h[0] & 0x0f == 0x08:
+            return None
+        n = h[1] & 0x7f
+        if n == 126:
+            n = struct.unpack('>H', self.rfile.read(2))[0]
+        elif n == 127:
+            n = struct.unpack('>Q', self.rfile.read(8))[0]
+        mask = self.rfile.read(4)
+        data = bytearray(self.rfile.read(n))
+        for i in range(n):
+            data[i] ^= mask[i % 4]
+        return bytes(data)
+
+
+    def send(self, o):
+        data = json.dumps(o).encode('utf-8')
+        n = len(data)
+        if n < 126:
+            h = struct.pack('>BB', 0x81, n)
+        elif n < 0x10000:
+            h = struct.pack('>BBH', 0x81, 126, n)
+        else:
+            h = struct.pack('>BBQ', 0x81, 127, n)
+        with self.server.lock:
+            self.wfile.write(h + data)
+
+
+class RPCWebsocketServer(socketserver.ThreadingTCPServer):
+    """Websocket counterpart of RPCServer.
+
+    Subscriptions are accepted for any type, and notifications for them are pushed to all clients with the notify method.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, methods):
+        super(RPCWebsocketServer, self).__init__(('127.0.0.1', 0), RPCWebsocketRequestHandler)
+        self.methods = methods
+        self.methods['eth_subscribe'] = self.subscribe
+        self.methods['eth_unsubscribe'] = self.unsubscribe
+        self.requests = []
+        self.clients = []
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+
+    respond = RPCServer.respond
+
+
+    def subscribe(self, p):
+        subscription_id = hex(len(self.subscriptions) + 1)
+        self.subscriptions[subscription_id] = p
+        return subscription_id
+
+
+    def unsubscribe(self, p):
+        return self.subscriptions.pop(p[0], None) != None
+
+
+    def notify(self, subscription_id, result):
+        o = {
+            'jsonrpc': '2.0',
+            'method': 'eth_subscription',
+            'params': {
+                'subscription': subscription_id,
+                'result': result,
+                },
+            }
+        for client in list(self.clients):
+            client.send(o)
+
+
+    @property
+    def url(self):
+        return 'ws://{}:{}'.format(self.server_address[0], self.server_address[1])
+
+
+    def start(self):
+        self.thread.start()
+
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
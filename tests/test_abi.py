@@ -6,6 +6,7 @@ import os
 # local imports
 from chainlib.eth.contract import (
         ABIContractEncoder,
+        ABIContractDecoder,
         ABIContractType,
         )
 
@@ -71,6 +72,34 @@ class TestContract(unittest.TestCase):
         self.assertEqual(e.get(), 'f31a6969000000000000000000000000000000000000000000000000000000000000002000000000000000000000000000000000000000000000000000000000000000086465616462656566000000000000000000000000000000000000000000000000')
 
 
+    def test_abi_decode_bytes(self):
+        address = os.urandom(20)
+        e = ABIContractEncoder()
+        e.uint256(42)
+        e.address(address.hex())
+        e.bytes32('2a' * 32)
+        e.string('foo')
+        v = bytes.fromhex(e.get_contents())
+
+        for contents in [
+                [v[:32], v[32:64], v[64:96], v[96:]],
+                [v[:32].hex(), v[32:64].hex(), v[64:96].hex(), v[96:].hex()],
+                [memoryview(v)[:32], memoryview(v)[32:64], memoryview(v)[64:96], memoryview(v)[96:]],
+                ]:
+            d = ABIContractDecoder()
+            d.typ(ABIContractType.UINT256)
+            d.typ(ABIContractType.ADDRESS)
+            d.typ(ABIContractType.BYTES32)
+            d.typ(ABIContractType.STRING)
+            for c in contents:
+                d.val(c)
+            r = d.decode()
+            self.assertEqual(r[0], 42)
+            self.assertEqual(r[1].lower(), address.hex())
+            self.assertEqual(r[2], '2a' * 32)
+            self.assertEqual(r[3], 'foo')
+
+
     def test_abi_tuple(self):
         e = ABIContractEncoder()
         e.typ(ABIContractType.STRING)
@@ -63,6 +63,120 @@ class TestBlock(unittest.TestCase):
         self.assertEqual(tx_index, 1)
 
 
+    def test_tx_index(self):
+        tx_hashes = [os.urandom(32).hex() for i in range(3)]
+        block = Block({
+            'number': 42,
+            'hash': os.urandom(32).hex(),
+            'author': os.urandom(20).hex(),
+            'transactions': [
+                {'hash': '0x' + tx_hashes[0]},
+                tx_hashes[1],
+                ],
+            'timestamp': 0,
+            })
+        self.assertEqual(block.tx_index_by_hash(tx_hashes[0]), 0)
+        self.assertEqual(block.tx_index_by_hash('0x' + tx_hashes[1].upper()), 1)
+        with self.assertRaises(AttributeError):
+            block.tx_index_by_hash(tx_hashes[2])
+
+        block.txs.append(tx_hashes[2])
+        self.assertEqual(block.get_tx(tx_hashes[2]), 2)
+
+        block.txs = [tx_hashes[2]]
+        self.assertEqual(block.tx_index_by_hash(tx_hashes[2]), 0)
+        with self.assertRaises(AttributeError):
+            block.tx_index_by_hash(tx_hashes[0])
+
+
+    def test_tx_view(self):
+        txs = []
+        for i in range(3):
+            txs.append({
+                'hash': '0x' + os.urandom(32).hex(),
+                'from': '0x' + os.urandom(20).hex(),
+                'to': '0x' + os.urandom(20).hex(),
+                'value': hex(i + 1),
+                'nonce': hex(i),
+                'gas': '0x5208',
+                'gasPrice': '0x3b9aca00',
+                'input': '0x',
+                'v': '0x25',
+                })
+        block = Block({
+            'number': 42,
+            'hash': os.urandom(32).hex(),
+            'author': os.urandom(20).hex(),
+            'transactions': txs,
+            'timestamp': 0,
+            })
+
+        view = block.tx_view()
+        self.assertIs(block.tx_view(), view)
+        self.assertEqual(len(view), 3)
+        tx = view[1]
+        self.assertIs(view[-2], tx)
+        self.assertEqual(tx.index, 1)
+
+        # only accessed fields are parsed
+        self.assertEqual(tx.inputs, block.tx_by_index(1).inputs)
+        self.assertNotIn('value', tx.__dict__)
+        self.assertNotIn('outputs', tx.__dict__)
+
+        for i, tx in enumerate(view):
+            tx_full = block.tx_by_index(i)
+            self.assertEqual(tx.hash, tx_full.hash)
+            for k in ['value', 'nonce', 'fee_limit', 'fee_price', 'gas_price', 'gas_limit', 'outputs', 'inputs', 'payload', 'v']:
+                self.assertEqual(getattr(tx, k), getattr(tx_full, k))
+            self.assertEqual(tx.src, tx_full.src)
+
+        block.txs = [txs[2]]
+        self.assertEqual(len(view), 1)
+        self.assertEqual(view[0].hash, view[-1].hash)
+        with self.assertRaises(IndexError):
+            view[1]
+
+
+    def test_tx_view_src_unchanged(self):
+        tx_src = {
+            'hash': '0x' + os.urandom(32).hex(),
+            'from': '0x' + os.urandom(20).hex(),
+            'to': '0x' + os.urandom(20).hex(),
+            'value': '0x1',
+            'nonce': '0x0',
+            'gas': '0x5208',
+            'gasPrice': '0x3b9aca00',
+            'data': '0xdeadbeef',
+            'v': '0x25',
+            }
+        block = Block({
+            'number': 42,
+            'hash': os.urandom(32).hex(),
+            'author': os.urandom(20).hex(),
+            'transactions': [tx_src],
+            'timestamp': 0,
+            })
+        tx = block.tx_view()[0]
+        self.assertEqual(tx.payload, 'deadbeef')
+        self.assertNotIn('input', block.txs[0])
+
+        # the filter gets a copy of the block transaction to change
+        applied = []
+        class RecordingFilter(DialectFilter):
+            def apply_tx(self, src):
+                applied.append(src)
+                src = super(RecordingFilter, self).apply_tx(src)
+                src['value'] = '0x2'
+                return src
+
+        tx = block.tx_view(dialect_filter=RecordingFilter())[0]
+        self.assertEqual(tx.value, 2)
+        self.assertEqual(len(applied), 1)
+        self.assertIsNot(applied[0], block.txs[0])
+        self.assertEqual(block.txs[0]['value'], '0x1')
+        self.assertNotIn('input', block.txs[0])
+
+
     def test_blockheight_param(self):
         self.assertEqual(to_blockheight_param('latest'), 'latest')
         self.assertEqual(to_blockheight_param(0), 'latest')
@@ -0,0 +1,193 @@
+# standard imports
+import os
+import tempfile
+import unittest
+import logging
+
+# external imports
+from hexathon import add_0x
+
+# local imports
+from chainlib.eth.connection import EthHTTPConnection
+from chainlib.eth.cache import (
+        EthCacheConnection,
+        LRUCache,
+        )
+from chainlib.eth.block import (
+        block_by_hash,
+        block_by_number,
+        block_latest,
+        )
+from chainlib.eth.tx import receipt
+from chainlib.eth.contract import code
+from chainlib.eth.gas import balance
+from chainlib.block import BlockSpec
+
+# test imports
+from tests.rpcserver import RPCServer
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+class Chain:
+
+    def __init__(self, height=100):
+        self.height = height
+        self.receipts = {}
+
+
+    def block_number(self, p):
+        return hex(self.height)
+
+
+    def block(self, p):
+        return {
+            'hash': p[0] if len(p[0]) == 66 else add_0x(os.urandom(32).hex()),
+            'number': p[0] if len(p[0]) < 66 else '0x2a',
+            'transactions': [],
+            }
+
+
+    def receipt(self, p):
+        return self.receipts.get(p[0])
+
+
+    def code(self, p):
+        return '0x6001'
+
+
+    def balance(self, p):
+        return '0x2a'
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.chain = Chain()
+        self.server = RPCServer({
+            'eth_blockNumber': self.chain.block_number,
+            'eth_getBlockByHash': self.chain.block,
+            'eth_getBlockByNumber': self.chain.block,
+            'eth_getTransactionReceipt': self.chain.receipt,
+            'eth_getCode': self.chain.code,
+            'eth_getBalance': self.chain.balance,
+            })
+        self.server.start()
+        self.conn = EthCacheConnection(EthHTTPConnection(self.server.url), finality_depth=10)
+
+
+    def tearDown(self):
+        self.server.stop()
+
+
+    def test_lru(self):
+        cache = LRUCache(size=2)
+        cache.put('a', {'foo': 1})
+        cache.put('b', 2)
+        r = cache.get('a')
+        r['foo'] = 42
+        self.assertEqual(cache.get('a'), {'foo': 1})
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(cache.misses, 1)
+
+
+    def test_persist(self):
+        path = os.path.join(tempfile.mkdtemp(), 'cache')
+        cache = LRUCache(size=1, path=path)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.close()
+
+        cache = LRUCache(path=path)
+        self.assertEqual(cache.get('b'), 2)
+        cache.close()
+
+
+    def test_block(self):
+        block_hash = add_0x(os.urandom(32).hex())
+        for i in range(3):
+            r = self.conn.do(block_by_hash(block_hash))
+        self.assertEqual(r['hash'], block_hash)
+        self.assertEqual(self.conn.hits, 2)
+        self.assertEqual(len(self.server.requests), 1)
+
+        # only final blocks by number
+        self.conn.do(block_by_number(50))
+        self.conn.do(block_by_number(50))
+        self.conn.do(block_by_number(95))
+        self.conn.do(block_by_number(95))
+        self.assertEqual(self.conn.hits, 3)
+
+        # uncacheable queries are not counted
+        self.conn.do(balance(add_0x(os.urandom(20).hex())))
+        self.assertEqual(self.conn.misses, 4)
+
+
+    def test_receipt(self):
+        tx_hashes = []
+        for n in [50, 95]:
+            tx_hash = add_0x(os.urandom(32).hex())
+            self.chain.receipts[tx_hash] = {
+                'transactionHash': tx_hash,
+                'blockNumber': hex(n),
+                }
+            tx_hashes.append(tx_hash)
+        pending = add_0x(os.urandom(32).hex())
+        tx_hashes.append(pending)
+
+        o = [receipt(tx_hash) for tx_hash in tx_hashes]
+        o.append(block_latest())
+        r = self.conn.do_batch(o)
+        self.assertIsNone(r[2])
+        self.assertEqual(self.conn.head, 100)
+
+        r = self.conn.do_batch(o)
+        self.assertEqual(r[0]['transactionHash'], tx_hashes[0])
+        self.assertEqual(self.server.requests[-1], o[1:])
+
+        # receipt becomes final as chain advances
+        self.chain.height = 105
+        self.conn.do(block_latest())
+        self.conn.do(receipt(tx_hashes[1]))
+        n = len(self.server.requests)
+        self.conn.do(receipt(tx_hashes[1]))
+        self.assertEqual(len(self.server.requests), n)
+
+
+    def test_batch_error(self):
+        self.conn.do(block_latest())
+        def fail(p):
+            raise ValueError('no height')
+        self.server.methods['eth_blockNumber'] = fail
+        r = self.conn.do_batch([block_latest(), balance(add_0x(os.urandom(20).hex()))])
+        self.assertIsInstance(r[0], Exception)
+        self.assertEqual(r[1], '0x2a')
+
+
+    def test_do_list(self):
+        block_hash = add_0x(os.urandom(32).hex())
+        self.conn.do(block_by_hash(block_hash))
+        r = self.conn.do([block_by_hash(block_hash), balance(add_0x(os.urandom(20).hex()))])
+        self.assertEqual(r[0]['hash'], block_hash)
+        self.assertEqual(r[1], '0x2a')
+        self.assertEqual(self.conn.hits, 0)
+        self.assertEqual(len(self.server.requests), 2)
+
+
+    def test_code(self):
+        address = add_0x(os.urandom(20).hex())
+        self.conn.do(code(address, BlockSpec.LATEST))
+        self.conn.do(code(address, BlockSpec.LATEST))
+        self.conn.do(code(address, 10))
+        self.conn.do(code(address, 10))
+        self.assertEqual(self.conn.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
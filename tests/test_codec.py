@@ -0,0 +1,80 @@
+# standard imports
+import unittest
+import logging
+
+# local imports
+from chainlib.eth import codec
+from chainlib.eth.codec import (
+        orjson,
+        JSONCodec,
+        OrjsonCodec,
+        set_codec,
+        )
+from chainlib.eth.connection import EthHTTPConnection
+from chainlib.eth.block import block_latest
+
+# test imports
+from tests.rpcserver import RPCServer
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+class CountingCodec(JSONCodec):
+
+    def __init__(self):
+        self.calls = 0
+
+
+    def loads(self, s):
+        self.calls += 1
+        return super(CountingCodec, self).loads(s)
+
+
+class TestCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.codec = codec.codec
+
+
+    def tearDown(self):
+        set_codec(self.codec)
+
+
+    def test_roundtrip(self):
+        o = {'jsonrpc': '2.0', 'id': 1, 'result': {'number': '0x2a', 'transactions': [], 'ratio': [0.5]}}
+        codecs = [JSONCodec()]
+        if orjson != None:
+            codecs.append(OrjsonCodec())
+        for c in codecs:
+            s = c.dumps(o)
+            self.assertIsInstance(s, str)
+            self.assertEqual(c.loads(s), o)
+            self.assertEqual(c.loads(s.encode('utf-8')), o)
+            with self.assertRaises(ValueError):
+                c.loads(s[:-1])
+
+
+    @unittest.skipIf(orjson == None, 'orjson not installed')
+    def test_orjson_fallback(self):
+        c = OrjsonCodec()
+        o = {'value': 2**70}
+        self.assertEqual(JSONCodec().loads(c.dumps(o)), o)
+
+
+    def test_connection(self):
+        server = RPCServer({'eth_blockNumber': lambda p: '0x2a'})
+        server.start()
+        try:
+            c = CountingCodec()
+            set_codec(c)
+            conn = EthHTTPConnection(server.url)
+            self.assertEqual(conn.do(block_latest()), '0x2a')
+            self.assertEqual(conn.do_batch([block_latest(), block_latest()]), ['0x2a', '0x2a'])
+            self.assertGreaterEqual(c.calls, 2)
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,513 @@
+# standard imports
+import os
+import threading
+import asyncio
+import unittest
+import logging
+
+# external imports
+from chainlib.jsonrpc import IntSequenceGenerator
+from hexathon import add_0x
+
+# local imports
+from chainlib.eth.connection import (
+        _JSONScanner,
+        EthHTTPConnection,
+        EthUnixConnection,
+        AsyncEthHTTPConnection,
+        AsyncEthUnixConnection,
+        EthWebsocketConnection,
+        )
+from chainlib.eth.block import Block
+from chainlib.eth.gas import balance
+from chainlib.eth.error import (
+        EthException,
+        RevertEthException,
+        )
+from chainlib.eth.dialect import DefaultErrorParser
+from chainlib.eth.poll import (
+        PollStrategy,
+        BackoffPollStrategy,
+        )
+
+# test imports
+from tests.rpcserver import (
+        RPCServer,
+        RPCUnixServer,
+        RPCWebsocketServer,
+        )
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+def get_balance(p):
+    if p[0] == '0x' + '00' * 20:
+        raise ValueError('zero address')
+    return hex(int(p[0][-4:], 16))
+
+
+class ReceiptSource:
+
+    def __init__(self, delay=0, status=1):
+        self.delay = delay
+        self.status = status
+        self.calls = {}
+        self.delays = {}
+        self.statuses = {}
+
+
+    def __call__(self, p):
+        n = self.calls.get(p[0], 0)
+        self.calls[p[0]] = n + 1
+        if n < self.delays.get(p[0], self.delay):
+            return None
+        status = self.statuses.get(p[0], self.status)
+        return {
+            'transactionHash': p[0],
+            'blockHash': add_0x(os.urandom(32).hex()),
+            'blockNumber': '0x2a',
+            'transactionIndex': '0x0',
+            'status': hex(status),
+            'gasUsed': '0x5208',
+            'logs': [],
+            }
+
+
+class HeadSource:
+
+    def __init__(self, interval=1):
+        self.interval = interval
+        self.calls = 0
+
+
+    def __call__(self, p):
+        self.calls += 1
+        return hex(self.calls // self.interval)
+
+
+class TestConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.server = RPCServer({
+            'eth_getBalance': get_balance,
+            }, reverse=True)
+        self.server.start()
+        self.conn = EthHTTPConnection(self.server.url)
+
+
+    def tearDown(self):
+        self.server.stop()
+
+
+    def test_batch(self):
+        addresses = []
+        o = []
+        for i in range(10):
+            address = add_0x(os.urandom(20).hex())
+            addresses.append(address)
+            o.append(balance(address, id_generator=IntSequenceGenerator(i)))
+
+        r = self.conn.do_batch(o)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(r), 10)
+        for i, address in enumerate(addresses):
+            self.assertEqual(int(r[i], 16), int(address[-4:], 16))
+
+
+    def test_batch_limit(self):
+        o = []
+        for i in range(10):
+            o.append(balance(add_0x(os.urandom(20).hex())))
+        r = self.conn.do_batch(o, batch_limit=3)
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(len(r), 10)
+
+
+    def test_json_scanner(self):
+        data = b'{"id":1,"result":["a\\"]}\\\\",{"b":"{["}]}\n'
+        for n in range(1, len(data)):
+            scanner = _JSONScanner()
+            complete = False
+            for i in range(0, len(data), n):
+                if scanner.feed(data[i:i+n]):
+                    complete = True
+                    self.assertGreaterEqual(i + n, len(data) - 1)
+                    break
+            self.assertTrue(complete)
+        self.assertFalse(_JSONScanner().feed(data[:-3]))
+
+
+    def test_batch_empty(self):
+        self.assertEqual(self.conn.do_batch([]), [])
+        self.assertEqual(self.conn.do_batch([], batch_limit=3), [])
+        self.assertEqual(len(self.server.requests), 0)
+
+
+    def test_batch_error(self):
+        o = [
+            balance(add_0x(os.urandom(20).hex())),
+            balance('0x' + '00' * 20),
+            balance(add_0x(os.urandom(20).hex())),
+            ]
+        r = self.conn.do_batch(o, error_parser=DefaultErrorParser())
+        self.assertIsInstance(r[0], str)
+        self.assertIsInstance(r[1], EthException)
+        self.assertIsInstance(r[2], str)
+
+
+    def test_wait_many(self):
+        receipts = ReceiptSource()
+        self.server.methods['eth_getTransactionReceipt'] = receipts
+        tx_hashes = []
+        for i in range(5):
+            tx_hash = add_0x(os.urandom(32).hex())
+            receipts.delays[tx_hash] = 4 - i
+            tx_hashes.append(tx_hash)
+
+        r = []
+        for e in self.conn.wait_many(tx_hashes, delay=0.01):
+            r.append(e['transaction_hash'])
+        tx_hashes.reverse()
+        self.assertEqual(r, tx_hashes)
+        self.assertEqual(len(self.server.requests), 5)
+
+
+    def test_wait_many_empty(self):
+        self.assertEqual(list(self.conn.wait_many([], delay=0.01)), [])
+        self.assertEqual(len(self.server.requests), 0)
+
+
+    def test_wait_many_revert(self):
+        receipts = ReceiptSource()
+        self.server.methods['eth_getTransactionReceipt'] = receipts
+        tx_hashes = []
+        for i in range(3):
+            tx_hashes.append(add_0x(os.urandom(32).hex()))
+        receipts.statuses[tx_hashes[1]] = 0
+        receipts.delays[tx_hashes[2]] = 1
+
+        with self.assertRaises(RevertEthException):
+            for e in self.conn.wait_many(tx_hashes, delay=0.01):
+                pass
+
+        r = list(self.conn.wait_many(tx_hashes, delay=0.01, ignore=[tx_hashes[1]]))
+        self.assertEqual(len(r), 3)
+
+        receipts.delays[tx_hashes[2]] = 1000
+        with self.assertRaises(TimeoutError):
+            r = list(self.conn.wait_many(tx_hashes, delay=0.01, timeout=0.05, ignore_all=True))
+
+
+    def test_backoff(self):
+        strategy = BackoffPollStrategy(min_delay=0.1, max_delay=1.0, jitter=0)
+        r = [strategy.next_delay(i) for i in range(6)]
+        self.assertEqual(r, [0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
+        self.assertEqual(strategy.next_delay(10000), 1.0)
+
+        strategy = BackoffPollStrategy(min_delay=1.0, jitter=0.1)
+        for i in range(100):
+            self.assertTrue(0.9 <= strategy.next_delay(0) <= 1.1)
+
+        receipts = ReceiptSource(delay=3)
+        self.server.methods['eth_getTransactionReceipt'] = receipts
+        tx_hash = add_0x(os.urandom(32).hex())
+        strategy = BackoffPollStrategy(min_delay=0.01, max_delay=0.02)
+        r = self.conn.wait(tx_hash, strategy=strategy)
+        self.assertEqual(r['transaction_hash'], tx_hash)
+        self.assertEqual(receipts.calls[tx_hash], 4)
+
+
+    def test_wait_head(self):
+        receipts = ReceiptSource(delay=2)
+        head = HeadSource(interval=3)
+        self.server.methods['eth_getTransactionReceipt'] = receipts
+        self.server.methods['eth_blockNumber'] = head
+        tx_hashes = []
+        for i in range(2):
+            tx_hashes.append(add_0x(os.urandom(32).hex()))
+
+        strategy = PollStrategy(delay=0.01, head=True)
+        r = list(self.conn.wait_many(tx_hashes, strategy=strategy))
+        self.assertEqual(len(r), 2)
+
+        # receipts are polled once up front, then only after each of the two head advances
+        for tx_hash in tx_hashes:
+            self.assertEqual(receipts.calls[tx_hash], 3)
+        self.assertEqual(head.calls, 7)
+
+        tx_hash = add_0x(os.urandom(32).hex())
+        receipts.delays[tx_hash] = 1000
+        with self.assertRaises(TimeoutError):
+            self.conn.wait(tx_hash, timeout=0.05, strategy=strategy)
+
+
+    def test_pool(self):
+        conn = EthHTTPConnection(self.server.url, pool_size=2)
+        for i in range(5):
+            address = add_0x(os.urandom(20).hex())
+            r = conn.do(balance(address))
+            self.assertEqual(r, hex(int(address[-4:], 16)))
+        address = add_0x(os.urandom(20).hex())
+        r = conn.do_batch([balance(address)])
+        self.assertEqual(r, [hex(int(address[-4:], 16))])
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual(self.server.connections, 1)
+
+
+    def test_pool_threads(self):
+        conn = EthHTTPConnection(self.server.url, pool_size=2)
+        results = []
+
+        def get(n):
+            for i in range(n):
+                results.append(conn.do(balance(add_0x(os.urandom(20).hex()))))
+
+        threads = []
+        for i in range(4):
+            t = threading.Thread(target=get, args=(10,))
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(results), 40)
+        self.assertLessEqual(self.server.connections, 2)
+
+
+class TestUnixConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.receipts = ReceiptSource(delay=1)
+        self.server = RPCUnixServer({
+            'eth_getBalance': get_balance,
+            'eth_getTransactionReceipt': self.receipts,
+            })
+        self.server.start()
+        self.conn = EthUnixConnection(self.server.url)
+
+
+    def tearDown(self):
+        self.server.stop()
+
+
+    def test_wait(self):
+        tx_hash = add_0x(os.urandom(32).hex())
+        r = self.conn.wait(tx_hash, delay=0.01)
+        self.assertEqual(r['transaction_hash'], tx_hash)
+        self.assertEqual(self.receipts.calls[tx_hash], 2)
+
+        tx_hashes = [tx_hash]
+        for i in range(3):
+            tx_hashes.append(add_0x(os.urandom(32).hex()))
+        r = list(self.conn.wait_many(tx_hashes, delay=0.01))
+        self.assertEqual(len(r), 4)
+
+
+def header(n):
+    return {
+        'hash': add_0x(os.urandom(32).hex()),
+        'parentHash': add_0x(os.urandom(32).hex()),
+        'number': hex(n),
+        'timestamp': hex(1600000000 + n),
+        'miner': add_0x(os.urandom(20).hex()),
+        }
+
+
+class TestWebsocketConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.server = RPCWebsocketServer({
+            'eth_getBalance': get_balance,
+            })
+        self.server.start()
+        self.conn = EthWebsocketConnection(self.server.url)
+
+
+    def tearDown(self):
+        self.conn.disconnect()
+        self.server.stop()
+
+
+    def test_request(self):
+        results = []
+
+        def get(n):
+            for i in range(n):
+                address = add_0x(os.urandom(20).hex())
+                r = self.conn.do(balance(address))
+                results.append(int(r, 16) == int(address[-4:], 16))
+
+        threads = []
+        for i in range(4):
+            t = threading.Thread(target=get, args=(10,))
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [True] * 40)
+
+        o = [
+            balance(add_0x(os.urandom(20).hex())),
+            balance('0x' + '00' * 20),
+            ]
+        r = self.conn.do_batch(o, error_parser=DefaultErrorParser())
+        self.assertIsInstance(r[0], str)
+        self.assertIsInstance(r[1], EthException)
+        self.assertEqual(len(self.server.clients), 1)
+
+
+    def test_request_no_reparse(self):
+        # queries are passed to the connection as objects, without parsing the serialized payload again
+        def fail(data):
+            raise AssertionError('payload parsed again')
+        self.conn._request = fail
+        address = add_0x(os.urandom(20).hex())
+        self.assertEqual(int(self.conn.do(balance(address)), 16), int(address[-4:], 16))
+        r = self.conn.do_batch([balance(address), balance(address)])
+        self.assertEqual(len(r), 2)
+
+
+    def test_subscribe(self):
+        heads = self.conn.heads()
+        logs = self.conn.logs(address=add_0x(os.urandom(20).hex()))
+        self.assertEqual(self.server.subscriptions[heads.id], ['newHeads'])
+        self.assertEqual(self.server.subscriptions[logs.id][0], 'logs')
+
+        for i in range(3):
+            self.server.notify(heads.id, header(i))
+        self.server.notify(logs.id, {'logIndex': '0x0', 'topics': []})
+
+        for i in range(3):
+            block = next(heads)
+            self.assertIsInstance(block, Block)
+            self.assertEqual(block.number, i)
+            self.assertEqual(block.txs, [])
+        log = logs.get(timeout=1.0)
+        self.assertEqual(log['log_index'], '0x0')
+        with self.assertRaises(TimeoutError):
+            logs.get(timeout=0.01)
+
+        heads.close()
+        self.assertEqual(len(self.server.subscriptions), 1)
+        self.assertEqual(list(heads), [])
+
+        self.conn.disconnect()
+        self.assertEqual(list(logs), [])
+
+
+    def test_subscribe_async(self):
+        pending = self.conn.pending_transactions()
+        tx_hashes = []
+        for i in range(3):
+            tx_hashes.append(add_0x(os.urandom(32).hex()))
+
+        def notify():
+            for tx_hash in tx_hashes:
+                self.server.notify(pending.id, tx_hash)
+
+        async def run():
+            r = []
+            asyncio.get_running_loop().call_later(0.01, notify)
+            async for tx_hash in pending:
+                r.append(tx_hash)
+                if len(r) == len(tx_hashes):
+                    pending.close()
+            return r
+
+        r = asyncio.run(run())
+        self.assertEqual(r, tx_hashes)
+
+
+class TestAsyncConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.receipts = ReceiptSource(delay=2)
+        methods = {
+            'eth_getBalance': get_balance,
+            'eth_getTransactionReceipt': self.receipts,
+            }
+        self.server = RPCServer(methods, reverse=True)
+        self.server.start()
+        self.unix_server = RPCUnixServer(methods)
+        self.unix_server.start()
+
+
+    def tearDown(self):
+        self.server.stop()
+        self.unix_server.stop()
+
+
+    def test_http(self):
+        conn = AsyncEthHTTPConnection(self.server.url, pool_size=4)
+
+        async def run():
+            o = []
+            for i in range(20):
+                o.append(balance(add_0x(os.urandom(20).hex())))
+            r = await asyncio.gather(*[conn.do(v) for v in o])
+            rr = await conn.do_batch(o, batch_limit=7)
+            await conn.close()
+            return (o, r, rr,)
+
+        (o, r, rr) = asyncio.run(run())
+        for i, v in enumerate(o):
+            self.assertEqual(int(r[i], 16), int(v['params'][0][-4:], 16))
+        self.assertEqual(r, rr)
+        self.assertLessEqual(self.server.connections, 4)
+
+
+    def test_unix(self):
+        conn = AsyncEthUnixConnection(self.unix_server.url)
+
+        async def run():
+            o = []
+            for i in range(5):
+                o.append(balance(add_0x(os.urandom(20).hex())))
+            r = await asyncio.gather(*[conn.do(v) for v in o])
+            rr = await conn.do_batch(o)
+            self.assertEqual(await conn.do_batch([]), [])
+            return (r, rr,)
+
+        (r, rr) = asyncio.run(run())
+        self.assertEqual(len(r), 5)
+        self.assertEqual(r, rr)
+
+
+    def test_wait(self):
+        conn = AsyncEthHTTPConnection(self.server.url)
+        tx_hash = add_0x(os.urandom(32).hex())
+        r = asyncio.run(conn.wait(tx_hash, delay=0.01))
+        self.assertEqual(r['transaction_hash'], tx_hash)
+        self.assertEqual(self.receipts.calls[tx_hash], 3)
+
+        self.receipts.status = 0
+        tx_hash = add_0x(os.urandom(32).hex())
+        with self.assertRaises(RevertEthException):
+            asyncio.run(conn.wait(tx_hash, delay=0.01))
+
+
+    def test_wait_many(self):
+        conn = AsyncEthHTTPConnection(self.server.url)
+        tx_hashes = []
+        for i in range(3):
+            tx_hashes.append(add_0x(os.urandom(32).hex()))
+
+        async def run():
+            r = []
+            async for e in conn.wait_many(tx_hashes, delay=0.01):
+                r.append(e['transaction_hash'])
+            await conn.close()
+            return r
+
+        r = asyncio.run(run())
+        self.assertEqual(r, tx_hashes)
+
+        async def run_empty():
+            return [e async for e in conn.wait_many([], delay=0.01)]
+
+        self.assertEqual(asyncio.run(run_empty()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# standard imports
+import os
+import time
+import unittest
+import logging
+
+# external imports
+from hexathon import add_0x
+
+# local imports
+from chainlib.eth.connection import EthHTTPConnection
+from chainlib.eth.fetch import fetch_blocks
+from chainlib.eth.block import Block
+
+# test imports
+from tests.rpcserver import RPCServer
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+class Chain:
+
+    def __init__(self, height):
+        self.height = height
+
+
+    def block(self, p):
+        n = int(p[0], 16)
+        if n > self.height:
+            return None
+        return {
+            'number': hex(n),
+            'hash': '0x' + n.to_bytes(32, byteorder='big').hex(),
+            'timestamp': hex(1600000000 + n),
+            'miner': add_0x(os.urandom(20).hex()),
+            'transactions': [{'hash': '0x' + (n * 1000 + i).to_bytes(32, byteorder='big').hex()} for i in range(n % 3)],
+            }
+
+
+    def receipt(self, p):
+        return {
+            'transactionHash': p[0],
+            'status': '0x1',
+            }
+
+
+class TestFetch(unittest.TestCase):
+
+    def setUp(self):
+        self.chain = Chain(100)
+        self.server = RPCServer({
+            'eth_getBlockByNumber': self.chain.block,
+            'eth_getTransactionReceipt': self.chain.receipt,
+            }, reverse=True)
+        self.server.start()
+        self.conn = EthHTTPConnection(self.server.url)
+
+
+    def tearDown(self):
+        self.server.stop()
+
+
+    def test_fetch(self):
+        r = list(fetch_blocks(self.conn, 10, 47, max_in_flight=3, batch_size=5))
+        self.assertEqual([block.number for block in r], list(range(10, 47)))
+        self.assertIsInstance(r[0], Block)
+        self.assertEqual(len(self.server.requests), 8)
+
+        r = list(fetch_blocks(self.conn, 0, 3, batch_size=1))
+        self.assertEqual([block.number for block in r], [0, 1, 2])
+
+
+    def test_receipts(self):
+        for block in fetch_blocks(self.conn, 0, 20, batch_size=4, receipts=True):
+            self.assertEqual(len(block.receipts), len(block.txs))
+            for i, tx in enumerate(block.txs):
+                self.assertEqual(block.receipts[i]['transactionHash'], tx['hash'])
+
+
+    def test_backpressure(self):
+        g = fetch_blocks(self.conn, 0, 100, max_in_flight=2, batch_size=5)
+        next(g)
+        time.sleep(0.1)
+        self.assertEqual(len(self.server.requests), 3)
+        g.close()
+
+
+    def test_not_found(self):
+        with self.assertRaises(ValueError):
+            for block in fetch_blocks(self.conn, 90, 110):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+# standard imports
+import unittest
+import logging
+
+# external imports
+from chainlib.error import RPCException
+
+# local imports
+from chainlib.eth.connection import EthHTTPConnection
+from chainlib.eth.gas import (
+        FeeHistoryGasOracle,
+        OverrideGasOracle,
+        fee_history,
+        )
+
+# test imports
+from tests.rpcserver import RPCServer
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+class TestGas(unittest.TestCase):
+
+    def setUp(self):
+        self.head = 100
+        self.server = RPCServer({
+            'eth_feeHistory': self.fee_history,
+            'eth_gasPrice': lambda p: hex(42),
+            })
+        self.server.start()
+        self.conn = EthHTTPConnection(self.server.url)
+
+
+    def tearDown(self):
+        self.server.stop()
+
+
+    def fee_history(self, params):
+        block_count = int(params[0], 16)
+        oldest = self.head - block_count + 1
+        base_fees = []
+        rewards = []
+        ratios = []
+        for i in range(oldest, self.head + 1):
+            base_fees.append(hex(1000 + i))
+            rewards.append([hex(i)])
+            # every tenth block is empty
+            ratios.append(0.0 if i % 10 == 0 else 0.5)
+        base_fees.append(hex(2000))
+        return {
+            'oldestBlock': hex(oldest),
+            'baseFeePerGas': base_fees,
+            'reward': rewards,
+            'gasUsedRatio': ratios,
+            }
+
+
+    def methods(self):
+        return [o['method'] for o in self.server.requests]
+
+
+    def test_query(self):
+        o = fee_history(10, percentiles=[25, 75])
+        self.assertEqual(o['method'], 'eth_feeHistory')
+        self.assertEqual(o['params'], ['0xa', 'latest', [25, 75]])
+
+
+    def test_fee_history(self):
+        oracle = FeeHistoryGasOracle(self.conn, block_count=5, refresh_interval=3600)
+        self.assertEqual(oracle.get_fee(), (2000 + 98, 21000,))
+        # blocks 96 to 100, block 100 is empty
+        self.assertEqual(list(oracle.base_fees), [1096, 1097, 1098, 1099, 1100])
+        self.assertEqual(list(oracle.priority_fees), [96, 97, 98, 99, None])
+        self.assertEqual(oracle.get_dynamic_fee(), (2000 * 2 + 98, 98, 21000,))
+
+        # answered from model
+        for i in range(10):
+            oracle.get_fee()
+        self.assertEqual(self.methods(), ['eth_feeHistory'])
+
+        # only new blocks are added
+        self.head = 102
+        oracle.update()
+        self.assertEqual(list(oracle.base_fees), [1098, 1099, 1100, 1101, 1102])
+        self.assertEqual(list(oracle.priority_fees), [98, 99, None, 101, 102])
+        self.assertEqual(oracle.last_block, 102)
+
+        # refreshed when interval has passed
+        oracle.refresh_interval = 0
+        oracle.get_fee()
+        self.assertEqual(self.methods(), ['eth_feeHistory'] * 3)
+
+
+    def test_fee_history_unreachable(self):
+        oracle = FeeHistoryGasOracle(self.conn, block_count=5, refresh_interval=0)
+        fee = oracle.get_fee()
+        oracle.conn = EthHTTPConnection('http://127.0.0.1:1')
+        self.assertEqual(oracle.get_fee(), fee)
+        self.assertTrue(oracle.supported)
+
+        oracle = FeeHistoryGasOracle(EthHTTPConnection('http://127.0.0.1:1'))
+        with self.assertRaises(RPCException):
+            oracle.get_fee()
+
+
+    def test_fee_history_unsupported(self):
+        del self.server.methods['eth_feeHistory']
+        oracle = FeeHistoryGasOracle(self.conn)
+        self.assertEqual(oracle.get_fee(), (42, 21000,))
+        self.assertEqual(oracle.get_dynamic_fee(), (None, None, 21000,))
+        self.assertFalse(oracle.supported)
+        self.assertEqual(self.methods(), ['eth_feeHistory', 'eth_gasPrice'])
+
+
+    def test_override(self):
+        oracle = OverrideGasOracle(price=13, limit=666, conn=self.conn)
+        self.assertEqual(oracle.get_fee(), (13, 666,))
+        oracle = OverrideGasOracle(price=13, conn=self.conn)
+        self.assertEqual(oracle.get_fee(), (13, 21000,))
+        self.assertEqual(self.methods(), [])
+        oracle = OverrideGasOracle(limit=666, conn=self.conn)
+        self.assertEqual(oracle.get_fee(), (42, 666,))
+        self.assertEqual(self.methods(), ['eth_gasPrice'])
+
+
+if __name__ == '__main__':
+    unittest.main()
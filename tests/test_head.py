@@ -0,0 +1,168 @@
+# standard imports
+import os
+import unittest
+import logging
+
+# external imports
+from hexathon import add_0x
+
+# local imports
+from chainlib.eth.connection import EthHTTPConnection
+from chainlib.eth.block import Block
+from chainlib.eth.head import (
+        HeadTracker,
+        BlockEvent,
+        ReorgEvent,
+        poll_heads,
+        )
+
+# test imports
+from tests.rpcserver import RPCServer
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+def chain(start, count, parent_hash=None):
+    blocks = []
+    for i in range(count):
+        if parent_hash == None:
+            parent_hash = add_0x(os.urandom(32).hex())
+        block = {
+            'number': hex(start + i),
+            'hash': add_0x(os.urandom(32).hex()),
+            'parentHash': parent_hash,
+            'timestamp': hex(1600000000 + start + i),
+            'miner': add_0x(os.urandom(20).hex()),
+            'transactions': [],
+            }
+        blocks.append(block)
+        parent_hash = block['hash']
+    return blocks
+
+
+class TestHead(unittest.TestCase):
+
+    def setUp(self):
+        self.blocks = {}
+        self.canonical = []
+        self.server = RPCServer({
+            'eth_getBlockByHash': lambda p: self.blocks.get(p[0]),
+            'eth_blockNumber': lambda p: self.canonical[-1]['number'],
+            'eth_getBlockByNumber': lambda p: self.canonical[int(p[0], 16)],
+            })
+        self.server.start()
+        self.conn = EthHTTPConnection(self.server.url)
+
+
+    def tearDown(self):
+        self.server.stop()
+
+
+    def extend(self, blocks):
+        for block in blocks:
+            self.blocks[block['hash']] = block
+        return blocks
+
+
+    def test_extend(self):
+        blocks = self.extend(chain(10, 10))
+        tracker = HeadTracker(self.conn, window=5)
+        events = []
+        for block in blocks:
+            events += tracker.add(block)
+        self.assertEqual(len(events), 10)
+        self.assertTrue(all([isinstance(e, BlockEvent) for e in events]))
+        self.assertEqual(tracker.tip.number, 19)
+        self.assertEqual(tracker.get_by_number(19).parent_hash, blocks[8]['hash'])
+        self.assertIsNone(tracker.get_by_number(14))
+        self.assertIsNotNone(tracker.get_by_hash(blocks[5]['hash']))
+        self.assertEqual(tracker.add(blocks[9]), [])
+
+        # missing blocks are retrieved by number, in one batch
+        more = self.extend(chain(20, 3, parent_hash=blocks[9]['hash']))
+        self.canonical = [None] * 10 + blocks + more
+        events = tracker.add(more[2])
+        self.assertEqual([e.block.number for e in events], [20, 21, 22])
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(self.server.requests[0]), 2)
+
+
+    def test_reorg(self):
+        blocks = self.extend(chain(10, 5))
+        tracker = HeadTracker(self.conn)
+        for block in blocks:
+            tracker.add(block)
+
+        fork = self.extend(chain(13, 3, parent_hash=blocks[2]['hash']))
+        events = tracker.add(fork[2])
+        self.assertIsInstance(events[0], ReorgEvent)
+        self.assertEqual(events[0].ancestor.number, 12)
+        self.assertEqual([v.hash for v in events[0].orphaned], [blocks[3]['hash'], blocks[4]['hash']])
+        self.assertEqual([v.number for v in events[0].added], [13, 14, 15])
+        self.assertEqual([e.block.number for e in events[1:]], [13, 14, 15])
+        self.assertEqual(tracker.get_by_number(14).hash, fork[1]['hash'])
+        self.assertIsNone(tracker.get_by_hash(blocks[4]['hash']))
+
+        # unlinkable block resets the window
+        tracker = HeadTracker(window=5)
+        for block in blocks:
+            tracker.add(Block(block))
+        events = tracker.add(chain(16, 1)[0])
+        self.assertIsNone(events[0].ancestor)
+        self.assertEqual(len(events[0].orphaned), 5)
+        self.assertEqual(tracker.tip.number, 16)
+
+
+    def test_jump_ahead(self):
+        blocks = self.extend(chain(0, 301))
+        self.canonical = blocks
+        tracker = HeadTracker(self.conn, window=128)
+        for block in blocks[:10]:
+            tracker.add(block)
+
+        events = tracker.add(blocks[300])
+        self.assertTrue(all([isinstance(e, BlockEvent) for e in events]))
+        self.assertEqual([e.block.number for e in events], list(range(173, 301)))
+        self.assertEqual(tracker.tip.number, 300)
+        self.assertIsNone(tracker.get_by_number(9))
+
+        # the window and the tracked heights are retrieved in a single bounded batch
+        blocks = self.extend(chain(0, 1001))
+        self.canonical = blocks
+        tracker = HeadTracker(self.conn, window=128)
+        for block in blocks[:10]:
+            tracker.add(block)
+        self.server.requests = []
+        events = tracker.add(blocks[1000])
+        self.assertEqual(len(events), 128)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(self.server.requests[0]), 127 + 10)
+
+        # a reorg below the tip is still reported
+        blocks = self.extend(chain(0, 10))
+        fork = self.extend(chain(8, 293, parent_hash=blocks[7]['hash']))
+        self.canonical = blocks[:8] + fork
+        tracker = HeadTracker(self.conn, window=128)
+        for block in blocks:
+            tracker.add(block)
+        events = tracker.add(fork[-1])
+        self.assertIsInstance(events[0], ReorgEvent)
+        self.assertEqual(events[0].ancestor.number, 7)
+        self.assertEqual([v.number for v in events[0].orphaned], [8, 9])
+        self.assertEqual([e.block.number for e in events[1:]], list(range(173, 301)))
+
+
+    def test_poll(self):
+        self.canonical = chain(0, 3)
+        tracker = HeadTracker(self.conn)
+        events = tracker.follow(poll_heads(self.conn, delay=0.01))
+        e = next(events)
+        self.assertEqual(e.block.number, 2)
+        self.canonical += chain(3, 1, parent_hash=self.canonical[2]['hash'])
+        e = next(events)
+        self.assertEqual(e.block.number, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# standard imports
+import os
+import unittest
+import logging
+
+# external imports
+from funga.eth.keystore.dict import DictKeystore
+from funga.eth.signer import EIP155Signer
+from chainlib.chain import ChainSpec
+
+# local imports
+import chainlib.eth.tx
+import chainlib.eth.contract
+from chainlib.eth.tx import (
+        TxFactory,
+        TxFormat,
+        SenderCache,
+        unpack,
+        )
+from chainlib.eth.contract import (
+        ABIContractEncoder,
+        ABIContractDecoder,
+        ABIContractType,
+        )
+from chainlib.eth.nonce import OverrideNonceOracle
+from chainlib.eth.gas import OverrideGasOracle
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+class NullLogger:
+
+    def __init__(self):
+        self.calls = 0
+
+
+    def isEnabledFor(self, level):
+        return False
+
+
+    def debug(self, *args, **kwargs):
+        self.calls += 1
+
+    info = debug
+    warning = debug
+
+
+class TestLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.chain_spec = ChainSpec('evm', 'foo', 42)
+        keystore = DictKeystore()
+        signer = EIP155Signer(keystore)
+        address = keystore.new()
+        c = TxFactory(self.chain_spec, signer=signer, gas_oracle=OverrideGasOracle(price=100, limit=21000), nonce_oracle=OverrideNonceOracle(address, 42))
+        tx = c.template(address, address)
+        tx = c.set_code(tx, os.urandom(128).hex())
+        (tx_hash_hex, tx_raw_hex) = c.finalize(tx, tx_format=TxFormat.RLP_SIGNED)
+        self.tx_raw = bytes.fromhex(tx_raw_hex[2:])
+        self.address = address
+
+        e = ABIContractEncoder()
+        e.uint256(42)
+        e.address(address)
+        e.string('foo')
+        self.data = e.get_contents()
+
+        self.sender_cache = chainlib.eth.tx.sender_cache
+        chainlib.eth.tx.sender_cache = SenderCache(size=0)
+        self.loggers = (chainlib.eth.tx.logg, chainlib.eth.contract.logg,)
+        self.level = logging.getLogger('chainlib.eth').level
+        logging.getLogger('chainlib.eth').setLevel(logging.WARNING)
+
+
+    def tearDown(self):
+        chainlib.eth.tx.sender_cache = self.sender_cache
+        (chainlib.eth.tx.logg, chainlib.eth.contract.logg) = self.loggers
+        logging.getLogger('chainlib.eth').setLevel(self.level)
+
+
+    def run_ops(self, n):
+        for i in range(n):
+            unpack(self.tx_raw, self.chain_spec)
+
+            e = ABIContractEncoder()
+            e.method('foo')
+            e.typ(ABIContractType.UINT256)
+            e.typ(ABIContractType.ADDRESS)
+            e.typ(ABIContractType.STRING)
+            e.uint256(42)
+            e.address(self.address)
+            e.string('foo')
+            e.get()
+
+            d = ABIContractDecoder()
+            d.typ(ABIContractType.UINT256)
+            d.typ(ABIContractType.ADDRESS)
+            d.typ(ABIContractType.STRING)
+            d.val(self.data[:64])
+            d.val(self.data[64:128])
+            d.val(self.data[128:])
+            d.decode()
+
+
+    def use_null_logger(self):
+        null = NullLogger()
+        chainlib.eth.tx.logg = null
+        chainlib.eth.contract.logg = null
+        return null
+
+
+    def test_no_debug_calls(self):
+        null = self.use_null_logger()
+        self.run_ops(1)
+        self.assertEqual(null.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+# standard imports
+import os
+import json
+import unittest
+import tracemalloc
+import logging
+
+# external imports
+from hexathon import add_0x
+from chainlib.status import Status
+
+# local imports
+from chainlib.eth.tx import Tx
+from chainlib.eth.record import (
+        TxRecord,
+        TxResultRecord,
+        BlockRecord,
+        )
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+def h(n=32):
+    return add_0x(os.urandom(n).hex())
+
+
+def tx_src(nonce=0):
+    return {
+        'hash': h(),
+        'from': h(20),
+        'to': h(20),
+        'value': hex(1000000000000000000),
+        'nonce': hex(nonce),
+        'gas': '0x5208',
+        'gasPrice': '0x3b9aca00',
+        'input': h(68),
+        'v': '0x25',
+        'r': h(),
+        's': h(),
+        'blockHash': h(),
+        'blockNumber': '0x2a',
+        'transactionIndex': hex(nonce),
+        }
+
+
+class TestRecord(unittest.TestCase):
+
+    def test_tx(self):
+        src = tx_src()
+        tx = Tx(src)
+        o = TxRecord.from_tx(tx)
+        self.assertEqual(o.hash.hex(), tx.hash)
+        self.assertEqual(len(o.sender), 20)
+        self.assertEqual(o.value, tx.value)
+        self.assertIsNone(o.block_number)
+        with self.assertRaises(AttributeError):
+            o.foo = 'bar'
+
+        o = TxRecord.from_src(src)
+        self.assertEqual(o.block_number, 42)
+        self.assertEqual(o.index, 0)
+
+        tx_back = o.to_tx()
+        for k in ['hash', 'value', 'nonce', 'fee_limit', 'fee_price', 'gas_price', 'gas_limit', 'outputs', 'inputs', 'payload', 'v']:
+            self.assertEqual(getattr(tx_back, k), getattr(tx, k))
+        self.assertEqual(int(tx_back.r, 16), int(tx.r, 16))
+
+        src['to'] = None
+        o = TxRecord.from_src(src)
+        self.assertIsNone(o.recipient)
+        self.assertIsNone(o.to_tx().inputs[0])
+
+
+    def test_result(self):
+        tx_hash = h()
+        src = {
+            'transactionHash': tx_hash,
+            'blockHash': h(),
+            'blockNumber': '0x2a',
+            'transactionIndex': '0x1',
+            'status': '0x1',
+            'gasUsed': '0x5208',
+            'contractAddress': None,
+            'logs': [
+                {
+                    'address': h(20),
+                    'topics': [h(), h()],
+                    'data': h(64),
+                    'logIndex': '0x3',
+                    },
+                ],
+            }
+        o = TxResultRecord.from_src(src)
+        self.assertEqual(o.status, 1)
+        self.assertEqual(o.block_number, 42)
+        self.assertEqual(o.index, 1)
+        self.assertEqual(o.logs[0].log_index, 3)
+
+        result = o.to_result()
+        self.assertEqual(result.status, Status.SUCCESS)
+        self.assertEqual(result.hash, tx_hash)
+        self.assertEqual(result.fee_cost, 21000)
+        self.assertEqual(result.logs[0]['topics'], src['logs'][0]['topics'])
+        self.assertEqual(result.logs[0]['blockNumber'], '0x2a')
+
+        src['status'] = '0x0'
+        o = TxResultRecord.from_src(src)
+        self.assertEqual(o.status, 0)
+        self.assertEqual(o.to_result().status, Status.ERROR)
+
+        src['blockNumber'] = None
+        o = TxResultRecord.from_src(src)
+        self.assertIsNone(o.block_hash)
+        self.assertEqual(o.to_result().status, Status.PENDING)
+
+
+    def test_block(self):
+        txs = [tx_src(i) for i in range(3)]
+        src = {
+            'hash': h(),
+            'number': '0x2a',
+            'parentHash': h(),
+            'timestamp': '0x60000000',
+            'miner': h(20),
+            'gasLimit': '0x1c9c380',
+            'gasUsed': '0xf618',
+            'transactions': txs,
+            }
+        o = BlockRecord.from_src(src)
+        self.assertEqual(o.number, 42)
+        self.assertEqual(o.fee_cost, 63000)
+        self.assertEqual(add_0x(o.txs[2].hex()), txs[2]['hash'])
+
+        block = o.to_block()
+        self.assertEqual(block.hash, src['hash'])
+        self.assertEqual(block.parent_hash, src['parentHash'])
+        self.assertEqual(block.timestamp, 0x60000000)
+        self.assertEqual(block.get_tx(txs[1]['hash']), 1)
+
+
+    def test_size(self):
+        # transactions hold on to the strings of the decoded json-rpc response
+        srcs = [json.dumps(tx_src(i)) for i in range(500)]
+        TxRecord.from_tx(Tx(json.loads(srcs[0])))
+
+        tracemalloc.start()
+        a = tracemalloc.get_traced_memory()[0]
+        txs = [Tx(json.loads(src)) for src in srcs]
+        b = tracemalloc.get_traced_memory()[0]
+        records = [TxRecord.from_tx(tx) for tx in txs]
+        c = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        self.assertEqual([record.nonce for record in records], list(range(500)))
+        self.assertEqual(records[42].hash, bytes.fromhex(txs[42].hash))
+
+        logg.debug('memory per tx {} bytes, per record {} bytes'.format((b - a) / 500, (c - b) / 500))
+        self.assertLess((c - b) * 5, b - a)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+# standard imports
+import os
+import time
+import unittest
+import logging
+
+# external imports
+from hexathon import add_0x
+from chainlib.error import (
+        RPCException,
+        JSONRPCException,
+        )
+
+# local imports
+from chainlib.eth.connection import EthHTTPConnection
+from chainlib.eth.router import EthRouterConnection
+from chainlib.eth.gas import balance
+
+# test imports
+from tests.rpcserver import RPCServer
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+class Node:
+
+    def __init__(self, height=42, latency=0.0, head_latency=0.0):
+        self.height = height
+        self.latency = latency
+        self.head_latency = head_latency
+        self.server = RPCServer({
+            'eth_blockNumber': self.block_number,
+            'eth_getBalance': self.balance,
+            'eth_sendRawTransaction': self.send,
+            'eth_call': self.call,
+            })
+        self.server.start()
+        self.conn = EthHTTPConnection(self.server.url)
+        self.calls = 0
+
+
+    def block_number(self, p):
+        time.sleep(self.latency + self.head_latency)
+        return hex(self.height)
+
+
+    def balance(self, p):
+        self.calls += 1
+        time.sleep(self.latency)
+        return '0x2a'
+
+
+    def send(self, p):
+        self.calls += 1
+        return add_0x(os.urandom(32).hex())
+
+
+    def call(self, p):
+        self.calls += 1
+        raise ValueError('execution reverted')
+
+
+def address():
+    return add_0x(os.urandom(20).hex())
+
+
+class TestRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.nodes = []
+
+
+    def tearDown(self):
+        for node in self.nodes:
+            try:
+                node.server.stop()
+            except OSError:
+                pass
+
+
+    def node(self, **kwargs):
+        node = Node(**kwargs)
+        self.nodes.append(node)
+        return node
+
+
+    def test_failover(self):
+        dead = self.node()
+        dead.server.stop()
+        live = self.node()
+        conn = EthRouterConnection(connections=[dead.conn, live.conn], head_interval=0)
+
+        r = conn.do(balance(address()))
+        self.assertEqual(r, '0x2a')
+        self.assertEqual(conn.endpoints[0].failures, 1)
+        self.assertGreater(conn.endpoints[0].error_rate, 0.0)
+
+        # dead node is skipped during its cooldown
+        conn.do(balance(address()))
+        self.assertEqual(live.calls, 2)
+        self.assertEqual(conn.endpoints[0].failures, 1)
+
+        # no retry for writes
+        conn = EthRouterConnection(connections=[dead.conn, live.conn], head_interval=0)
+        o = {'jsonrpc': '2.0', 'id': 0, 'method': 'eth_sendRawTransaction', 'params': ['0x00']}
+        with self.assertRaises(RPCException):
+            conn.do(o)
+        self.assertEqual(conn.do(o)[:2], '0x')
+
+
+    def test_jsonrpc_error(self):
+        nodes = [self.node(), self.node(), self.node()]
+        conn = EthRouterConnection(connections=[node.conn for node in nodes], head_interval=0)
+        o = {'jsonrpc': '2.0', 'id': 0, 'method': 'eth_call', 'params': [{}, 'latest']}
+        with self.assertRaises(JSONRPCException):
+            conn.do(o)
+        self.assertEqual(sum([node.calls for node in nodes]), 1)
+        for endpoint in conn.endpoints:
+            self.assertEqual(endpoint.failures, 0)
+            self.assertEqual(endpoint.error_rate, 0.0)
+
+
+    def test_lag(self):
+        behind = self.node(height=90)
+        ahead = self.node(height=100)
+        conn = EthRouterConnection(connections=[behind.conn, ahead.conn], lag_limit=5)
+
+        # first request starts the height check in the background
+        conn.do(balance(address()))
+        t = time.monotonic()
+        while not conn.endpoints[0].lagging and time.monotonic() - t < 2.0:
+            time.sleep(0.01)
+        self.assertTrue(conn.endpoints[0].lagging)
+        behind.calls = 0
+        ahead.calls = 0
+        for i in range(3):
+            conn.do(balance(address()))
+        self.assertEqual(behind.calls, 0)
+        self.assertEqual(ahead.calls, 3)
+
+        behind.height = 98
+        self.assertEqual(conn.check_heads(), 100)
+        self.assertFalse(conn.endpoints[0].lagging)
+
+
+    def test_head_check_background(self):
+        slow = self.node(head_latency=0.5)
+        fast = self.node()
+        conn = EthRouterConnection(connections=[slow.conn, fast.conn], head_interval=0.01)
+        t = time.monotonic()
+        for i in range(3):
+            self.assertEqual(conn.do(balance(address())), '0x2a')
+        self.assertLess(time.monotonic() - t, 0.25)
+
+
+    def test_latency(self):
+        slow = self.node(latency=0.05)
+        fast = self.node()
+        conn = EthRouterConnection(connections=[slow.conn, fast.conn], head_interval=0)
+        conn.check_heads()
+        for i in range(5):
+            conn.do_batch([balance(address()), balance(address())])
+        self.assertEqual(slow.calls, 0)
+        self.assertEqual(fast.calls, 10)
+        self.assertLess(conn.endpoints[1].score, conn.endpoints[0].score)
+
+
+    def test_hedge(self):
+        nodes = [self.node(), self.node()]
+        conn = EthRouterConnection(connections=[node.conn for node in nodes], head_interval=0, hedge=True, hedge_delay=0.01, hedge_min_samples=5)
+        for i in range(5):
+            conn.check_heads()
+        self.assertEqual(len(conn.endpoints[0].samples), 5)
+        if conn.endpoints[1].score < conn.endpoints[0].score:
+            nodes.reverse()
+        (primary, secondary) = nodes
+
+        # primary misses its own percentile deadline, the hedge answers first
+        primary.latency = 0.2
+        t = time.monotonic()
+        r = conn.do(balance(address()))
+        self.assertEqual(r, '0x2a')
+        self.assertLess(time.monotonic() - t, 0.15)
+        self.assertEqual(primary.calls, 1)
+        self.assertEqual(secondary.calls, 1)
+
+        # primary failing before deadline goes straight to second node
+        dead = self.node()
+        dead.server.stop()
+        conn = EthRouterConnection(connections=[dead.conn, secondary.conn], head_interval=0, hedge=True, hedge_delay=1.0)
+        t = time.monotonic()
+        self.assertEqual(conn.do(balance(address())), '0x2a')
+        self.assertLess(time.monotonic() - t, 0.5)
+        conn.disconnect()
+
+
+    def test_hedge_jsonrpc_error(self):
+        nodes = [self.node(), self.node()]
+        conn = EthRouterConnection(connections=[node.conn for node in nodes], head_interval=0, hedge=True, hedge_delay=1.0)
+        o = {'jsonrpc': '2.0', 'id': 0, 'method': 'eth_call', 'params': [{}, 'latest']}
+        with self.assertRaises(JSONRPCException):
+            conn.do(o)
+        self.assertEqual(sum([node.calls for node in nodes]), 1)
+        for endpoint in conn.endpoints:
+            self.assertEqual(endpoint.failures, 0)
+        conn.disconnect()
+
+
+    def test_url(self):
+        nodes = [self.node(), self.node()]
+        conn = EthRouterConnection(','.join([node.server.url for node in nodes]), head_interval=0)
+        self.assertEqual(len(conn.endpoints), 2)
+        self.assertIsInstance(conn.endpoints[1].conn, EthHTTPConnection)
+        self.assertEqual(conn.do(balance(address())), '0x2a')
+        self.assertEqual(conn.endpoints[0].conn.pool, None)
+
+        conn = EthRouterConnection(','.join([node.server.url for node in nodes]), head_interval=0, pool_size=2)
+        for endpoint in conn.endpoints:
+            self.assertNotEqual(endpoint.conn.pool, None)
+        self.assertEqual(conn.do(balance(address())), '0x2a')
+        conn.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
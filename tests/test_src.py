@@ -0,0 +1,71 @@
+# standard imports
+import os
+import json
+import unittest
+
+# external imports
+from hexathon import add_0x
+
+# local imports
+from chainlib.eth.src import (
+        SrcSchema,
+        tx_schema,
+        )
+from chainlib.eth.tx import TxResult
+
+
+class TestSrc(unittest.TestCase):
+
+    def test_schema(self):
+        schema = SrcSchema('test', ['gasPrice', 'block_hash'])
+        self.assertEqual(schema.alias('gasPrice'), ('gas_price',))
+        self.assertEqual(schema.alias('gas_price'), ('gasPrice',))
+        self.assertEqual(schema.alias('blockHash'), ('block_hash',))
+        self.assertEqual(schema.alias('value'), ())
+        self.assertEqual(schema.alias('logIndex'), ('log_index',))
+        self.assertIn('logIndex', schema.aliases)
+
+
+    def test_normalize(self):
+        src = {
+            'hash': add_0x(os.urandom(32).hex()),
+            'gasPrice': '0x3b9aca00',
+            'block_number': '0x2a',
+            }
+        o = tx_schema.normalize(src)
+        self.assertEqual(len(o), 3)
+        self.assertEqual(o['gas_price'], '0x3b9aca00')
+        self.assertEqual(o['blockNumber'], '0x2a')
+        self.assertEqual(o.get('gas_price'), '0x3b9aca00')
+        self.assertIsNone(o.get('transaction_index'))
+        self.assertIn('gas_price', o)
+        self.assertNotIn('foo', o)
+        with self.assertRaises(KeyError):
+            o['gas']
+
+        # assigning to alternate name updates the stored field
+        o['gas_price'] = '0x2a'
+        self.assertEqual(len(o), 3)
+        self.assertEqual(o['gasPrice'], '0x2a')
+        self.assertEqual(src['gasPrice'], '0x3b9aca00')
+
+        self.assertEqual(json.loads(json.dumps(o)), o)
+
+
+    def test_receipt_logs(self):
+        tx_hash = add_0x(os.urandom(32).hex())
+        result = TxResult(src={
+            'transactionHash': tx_hash,
+            'blockHash': add_0x(os.urandom(32).hex()),
+            'blockNumber': '0x2a',
+            'transactionIndex': '0x0',
+            'status': '0x1',
+            'gasUsed': '0x5208',
+            'logs': [{'address': add_0x(os.urandom(20).hex()), 'topics': [], 'data': '0x', 'logIndex': '0x0'}],
+            })
+        self.assertEqual(result.src['transaction_hash'], tx_hash)
+        self.assertEqual(result.logs[0]['log_index'], '0x0')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+# standard imports
+import os
+import tempfile
+import unittest
+import logging
+
+# external imports
+from hexathon import add_0x
+
+# local imports
+from chainlib.eth.store import BlockStore
+from chainlib.eth.block import Block
+from chainlib.eth.tx import Tx
+from chainlib.eth.connection import EthHTTPConnection
+
+# test imports
+from tests.rpcserver import RPCServer
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+def tx_src():
+    return {
+        'hash': add_0x(os.urandom(32).hex()),
+        'from': add_0x(os.urandom(20).hex()),
+        'to': add_0x(os.urandom(20).hex()),
+        'value': '0x0d',
+        'input': '0xdeadbeef',
+        'nonce': '0x29a',
+        'gasPrice': '0x64',
+        'gas': '0x5208',
+        }
+
+
+def chain(start, count, parent_hash=None, txs=0):
+    blocks = []
+    for i in range(count):
+        if parent_hash == None:
+            parent_hash = add_0x(os.urandom(32).hex())
+        block = {
+            'number': hex(start + i),
+            'hash': add_0x(os.urandom(32).hex()),
+            'parentHash': parent_hash,
+            'timestamp': hex(1600000000 + start + i),
+            'miner': add_0x(os.urandom(20).hex()),
+            'transactions': [tx_src() for j in range(txs)],
+            }
+        blocks.append(block)
+        parent_hash = block['hash']
+    return blocks
+
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'blocks.sqlite')
+        self.store = BlockStore(self.path)
+
+
+    def tearDown(self):
+        self.store.close()
+
+
+    def test_block(self):
+        blocks = chain(10, 3, txs=2)
+        rcpt = {
+            'transactionHash': blocks[1]['transactions'][1]['hash'],
+            'blockHash': blocks[1]['hash'],
+            'blockNumber': blocks[1]['number'],
+            'transactionIndex': '0x1',
+            'status': '0x1',
+            'gasUsed': '0x5208',
+            'logs': [],
+            }
+        for block in blocks:
+            self.assertEqual(self.store.put_block(block, receipts=[rcpt] if block == blocks[1] else []), 0)
+        self.assertEqual(self.store.head(), 12)
+        self.store.close()
+
+        self.store = BlockStore(self.path)
+        block = self.store.get_block_by_number(11)
+        self.assertIsInstance(block, Block)
+        self.assertEqual(block.hash, blocks[1]['hash'])
+        self.assertEqual(self.store.get_block_by_hash(blocks[2]['hash'].upper()[2:]).number, 12)
+        self.assertIsNone(self.store.get_block_by_number(13))
+
+        tx = self.store.get_tx(rcpt['transactionHash'])
+        self.assertIsInstance(tx, Tx)
+        self.assertEqual(tx.block.number, 11)
+        self.assertEqual(tx.status.name, 'SUCCESS')
+        self.assertIsNone(self.store.get_tx(add_0x(os.urandom(32).hex())))
+
+
+    def test_reorg(self):
+        blocks = chain(10, 5, txs=1)
+        for block in blocks:
+            self.store.put_block(block)
+
+        # fork replacing block 13 removes 13 and 14
+        fork = chain(13, 2, parent_hash=blocks[2]['hash'])
+        self.assertEqual(self.store.put_block(fork[0]), 2)
+        self.assertEqual(self.store.head(), 13)
+        self.assertIsNone(self.store.get_tx(blocks[4]['transactions'][0]['hash']))
+
+        # block that stored child does not link to removes the child
+        blocks = chain(20, 3)
+        for block in blocks:
+            self.store.put_block(block)
+        self.store.invalidate(21)
+        self.store.put_block(blocks[2])
+        fork = chain(21, 1, parent_hash=blocks[0]['hash'])
+        self.assertEqual(self.store.put_block(fork[0]), 1)
+        self.assertIsNone(self.store.get_block_by_number(22))
+        self.assertEqual(self.store.get_block_by_number(21).hash, fork[0]['hash'])
+        self.store.invalidate(20)
+
+        # block not linking to stored parent also removes the parent
+        fork = chain(12, 1)
+        self.assertEqual(self.store.put_block(fork[0]), 3)
+        self.assertEqual(self.store.head(), 12)
+        self.assertIsNone(self.store.get_block_by_number(11))
+        self.assertIsNotNone(self.store.get_block_by_number(10))
+
+
+    def test_reconcile(self):
+        blocks = chain(10, 5)
+        for block in blocks:
+            self.store.put_block(block)
+        canonical = blocks[:3] + chain(13, 2, parent_hash=blocks[2]['hash'])
+
+        def get_block(p):
+            n = int(p[0], 16)
+            return canonical[n - 10]
+
+        server = RPCServer({
+            'eth_getBlockByNumber': get_block,
+            })
+        server.start()
+        conn = EthHTTPConnection(server.url)
+        try:
+            self.assertEqual(self.store.reconcile(conn, depth=4), 2)
+            self.assertEqual(len(server.requests), 3)
+            block = self.store.fetch_block(conn, 13)
+            self.assertEqual(block.hash, canonical[3]['hash'])
+            self.assertEqual(self.store.get_block_by_number(13).hash, canonical[3]['hash'])
+        finally:
+            server.stop()
+
+
+    def test_fetch_receipts(self):
+        block = chain(42, 1, txs=5)[0]
+        # node may return transaction hashes only
+        block_hashes = dict(block)
+        block_hashes['transactions'] = [tx['hash'] for tx in block['transactions']]
+
+        def get_receipt(p):
+            return {
+                'transactionHash': p[0],
+                'blockHash': block['hash'],
+                'blockNumber': block['number'],
+                'transactionIndex': '0x0',
+                'status': '0x1',
+                'gasUsed': '0x5208',
+                'logs': [],
+                }
+
+        server = RPCServer({
+            'eth_getBlockByNumber': lambda p: block_hashes,
+            'eth_getTransactionReceipt': get_receipt,
+            })
+        server.start()
+        conn = EthHTTPConnection(server.url)
+        try:
+            self.store.fetch_block(conn, 42, receipts=True)
+            self.assertEqual(len(server.requests), 2)
+            self.assertEqual(len(server.requests[1]), 5)
+            for tx in block['transactions']:
+                self.assertIsNotNone(self.store.get_receipt(tx['hash']))
+
+            # block stored without receipts gets the missing ones
+            self.store.invalidate(42)
+            self.store.put_block(block, receipts=[get_receipt([block['transactions'][0]['hash']])])
+            server.requests = []
+            self.assertEqual(self.store.fetch_block(conn, 42, receipts=True).hash, block['hash'])
+            self.assertEqual(len(server.requests), 1)
+            self.assertEqual([v['params'][0] for v in server.requests[0]], [tx['hash'] for tx in block['transactions'][1:]])
+            for tx in block['transactions']:
+                self.assertIsNotNone(self.store.get_receipt(tx['hash']))
+
+            # nothing is requested when all receipts are stored
+            server.requests = []
+            self.store.fetch_block(conn, 42, receipts=True)
+            self.assertEqual(len(server.requests), 0)
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
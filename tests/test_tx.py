@@ -4,6 +4,7 @@ import unittest
 import logging
 
 # local imports
+import chainlib.eth.tx
 from chainlib.eth.unittest.ethtester import EthTesterCase
 from chainlib.eth.nonce import RPCNonceOracle
 from chainlib.eth.gas import (
@@ -12,6 +13,11 @@ from chainlib.eth.gas import (
         )
 from chainlib.eth.tx import (
         unpack,
+        unpack_hex,
+        unpack_bytes,
+        unpack_many,
+        unpack_iter,
+        SenderCache,
         pack,
         raw,
         transaction,
@@ -72,6 +78,86 @@ class TxTestCase(EthTesterCase):
         self.assertTrue(is_same_address(tx['to'], self.accounts[1]))
 
 
+    def test_tx_unpack_bytes(self):
+        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
+        gas_oracle = RPCGasOracle(self.rpc)
+        c = Gas(signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=gas_oracle, chain_spec=self.chain_spec)
+        (tx_hash_hex, o) = c.create(self.accounts[0], self.accounts[1], 1024, tx_format=TxFormat.RLP_SIGNED)
+        tx_raw = bytes.fromhex(strip_0x(o))
+
+        tx = unpack_bytes(tx_raw, self.chain_spec)
+        self.assertEqual(tx['from'], bytes.fromhex(strip_0x(self.accounts[0])))
+        self.assertEqual(tx['to'], bytes.fromhex(strip_0x(self.accounts[1])))
+        self.assertEqual(tx['value'], 1024)
+        self.assertEqual(tx['data'], b'')
+        self.assertEqual(len(tx['r']), 32)
+        self.assertEqual(add_0x(tx['hash'].hex()), tx_hash_hex)
+
+        tx_hex = unpack(tx_raw, self.chain_spec)
+        self.assertTrue(is_same_address(tx_hex['from'], self.accounts[0]))
+        self.assertEqual(tx_hex['value'], 1024)
+        self.assertEqual(tx_hex['data'], '0x')
+        self.assertEqual(tx_hex['r'], add_0x(tx['r'].hex()))
+        self.assertEqual(tx_hex['hash'], tx_hash_hex)
+
+        tx_hex = unpack_hex(tx_raw, self.chain_spec)
+        self.assertEqual(tx_hex['value'], '0x0400')
+        self.assertEqual(int(tx_hex['chainId'], 16), self.chain_spec.chain_id())
+
+
+    def test_tx_unpack_many(self):
+        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
+        gas_oracle = RPCGasOracle(self.rpc)
+        c = Gas(signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=gas_oracle, chain_spec=self.chain_spec)
+        txs_raw = []
+        for i in range(7):
+            (tx_hash_hex, o) = c.create(self.accounts[0], self.accounts[1], 1024 + i, tx_format=TxFormat.RLP_SIGNED)
+            txs_raw.append(bytes.fromhex(strip_0x(o)))
+
+        r = unpack_many(txs_raw, self.chain_spec, workers=2, chunk_size=2)
+        self.assertEqual(len(r), 7)
+        for i, tx in enumerate(r):
+            self.assertEqual(tx, unpack(txs_raw[i], self.chain_spec))
+
+        r = unpack_many(txs_raw, self.chain_spec, workers=1, binary=True)
+        self.assertEqual(r[6], unpack_bytes(txs_raw[6], self.chain_spec))
+
+        # results before an invalid transaction are delivered first
+        txs_raw.insert(3, b'\x01\x02')
+        r = []
+        with self.assertRaises(ValueError):
+            for tx in unpack_iter(iter(txs_raw), self.chain_spec, workers=2, chunk_size=2):
+                r.append(tx)
+        self.assertEqual(len(r), 3)
+
+
+    def test_tx_sender_cache(self):
+        nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
+        gas_oracle = RPCGasOracle(self.rpc)
+        c = Gas(signer=self.signer, nonce_oracle=nonce_oracle, gas_oracle=gas_oracle, chain_spec=self.chain_spec)
+        (tx_hash_hex, o) = c.create(self.accounts[0], self.accounts[1], 1024, tx_format=TxFormat.RLP_SIGNED)
+        tx_raw = bytes.fromhex(strip_0x(o))
+
+        cache = chainlib.eth.tx.sender_cache
+        chainlib.eth.tx.sender_cache = SenderCache(size=2)
+        try:
+            tx = unpack(tx_raw, self.chain_spec)
+            self.assertEqual(chainlib.eth.tx.sender_cache.misses, 1)
+            self.assertEqual(unpack(tx_raw, self.chain_spec), tx)
+            self.assertEqual(chainlib.eth.tx.sender_cache.hits, 1)
+        finally:
+            chainlib.eth.tx.sender_cache = cache
+
+        cache = SenderCache(size=2)
+        for i in range(3):
+            cache.put((os.urandom(32), i,), (os.urandom(20), os.urandom(32),))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get((b'', 0,)))
+        cache = SenderCache(size=0)
+        cache.put((b'', 0,), (b'', b'',))
+        self.assertEqual(len(cache), 0)
+
+
     def test_tx_repack(self):
         nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
         gas_oracle = RPCGasOracle(self.rpc)
@@ -116,6 +202,59 @@ class TxTestCase(EthTesterCase):
         self.assertEqual(tx_signed_raw_bytes, tx_signed_raw_bytes_recovered)
 
 
+    def test_tx_typed(self):
+        try:
+            from eth_account import Account
+        except ImportError:
+            self.skipTest('eth_account not installed')
+        account = Account.create()
+        recipient = add_0x(to_checksum_address(add_0x(os.urandom(20).hex())))
+        access_list = [{
+            'address': add_0x(to_checksum_address(add_0x(os.urandom(20).hex()))),
+            'storageKeys': [add_0x(os.urandom(32).hex()), add_0x(os.urandom(32).hex())],
+            }]
+        for tx_type in [1, 2]:
+            tx_src = {
+                'type': tx_type,
+                'chainId': self.chain_spec.chain_id(),
+                'nonce': 13,
+                'gas': 50000,
+                'to': recipient,
+                'value': 1024,
+                'data': '0xdeadbeef',
+                'accessList': access_list,
+                }
+            if tx_type == 1:
+                tx_src['gasPrice'] = 10**9
+            else:
+                tx_src['maxPriorityFeePerGas'] = 10**9
+                tx_src['maxFeePerGas'] = 10**10
+            signed = Account.sign_transaction(tx_src, account.key)
+            tx_raw = bytes(signed.raw_transaction)
+
+            tx = unpack(tx_raw, self.chain_spec)
+            self.assertEqual(tx['type'], tx_type)
+            self.assertTrue(is_same_address(tx['from'], account.address))
+            self.assertTrue(is_same_address(tx['to'], recipient))
+            self.assertEqual(tx['hash'], add_0x(signed.hash.hex()))
+            self.assertEqual(tx['value'], 1024)
+            self.assertEqual(tx['nonce'], 13)
+            self.assertEqual(tx['data'], '0xdeadbeef')
+            self.assertTrue(is_same_address(tx['accessList'][0]['address'], access_list[0]['address']))
+            self.assertEqual(tx['accessList'][0]['storageKeys'], access_list[0]['storageKeys'])
+            if tx_type == 2:
+                self.assertEqual(tx['maxFeePerGas'], 10**10)
+
+            self.assertEqual(pack(tx, self.chain_spec), tx_raw)
+            txo = Tx(tx)
+            self.assertEqual(txo.fee_price, tx_src.get('gasPrice', 10**10))
+            self.assertEqual(pack(txo, self.chain_spec), tx_raw)
+
+            tx = unpack_hex(tx_raw, self.chain_spec)
+            self.assertEqual(int(tx['type'], 16), tx_type)
+            self.assertEqual(int(tx['gas'], 16), 50000)
+
+
     def test_apply_block(self):
         nonce_oracle = RPCNonceOracle(self.accounts[0], self.rpc)
         gas_oracle = RPCGasOracle(self.rpc)
@@ -0,0 +1,172 @@
+# standard imports
+import os
+import unittest
+import logging
+
+# external imports
+import coincurve
+import sha3
+import rlp
+from funga.eth.keystore.dict import DictKeystore
+from funga.eth.signer import EIP155Signer
+from funga.eth.encoding import public_key_bytes_to_address
+from chainlib.chain import ChainSpec
+
+# local imports
+from chainlib.eth.wire import (
+        LegacyTxWire,
+        TypedTxWire,
+        tx_wire,
+        rlp_int,
+        rlp_header,
+        )
+from chainlib.eth.tx import (
+        TxFactory,
+        TxFormat,
+        unpack_bytes,
+        )
+from chainlib.eth.nonce import OverrideNonceOracle
+from chainlib.eth.gas import OverrideGasOracle
+
+logging.basicConfig(level=logging.DEBUG)
+logg = logging.getLogger()
+
+
+def keccak(b):
+    h = sha3.keccak_256()
+    h.update(b)
+    return h.digest()
+
+
+class TestWire(unittest.TestCase):
+
+    def setUp(self):
+        self.chain_spec = ChainSpec('evm', 'foo', 4242)
+        keystore = DictKeystore()
+        signer = EIP155Signer(keystore)
+        self.address = keystore.new()
+        c = TxFactory(self.chain_spec, signer=signer, gas_oracle=OverrideGasOracle(price=10**12, limit=8000000), nonce_oracle=OverrideNonceOracle(self.address, 1024))
+        tx = c.template(self.address, self.address)
+        tx['value'] = 10**18
+        tx = c.set_code(tx, os.urandom(200).hex())
+        (tx_hash_hex, tx_raw_hex) = c.finalize(tx, tx_format=TxFormat.RLP_SIGNED)
+        self.tx_hash = bytes.fromhex(tx_hash_hex[2:])
+        self.tx_raw = bytes.fromhex(tx_raw_hex[2:])
+
+
+    def test_encode(self):
+        for v in [0, 1, 0x7f, 0x80, 0xff, 4242, 2**64, 2**256-1]:
+            self.assertEqual(rlp_int(v), rlp.encode(v))
+        for l in [0, 1, 55, 56, 255, 256, 70000]:
+            self.assertEqual(rlp_header(l, 0x80) + b'\xff' * l, rlp.encode(b'\xff' * l))
+
+
+    def test_fields(self):
+        w = LegacyTxWire(self.tx_raw)
+        d = rlp.decode(self.tx_raw)
+        self.assertEqual(len(w.fields), 9)
+        for i in range(9):
+            self.assertIsInstance(w.fields[i], memoryview)
+            self.assertEqual(bytes(w.fields[i]), d[i])
+        self.assertEqual(w.int(0), int.from_bytes(d[0], 'big'))
+        self.assertEqual(w.int(4), 10**18)
+
+
+    def test_hashes(self):
+        w = LegacyTxWire(self.tx_raw)
+        self.assertEqual(w.signed_hash(), self.tx_hash)
+        d = rlp.decode(self.tx_raw)
+        d[6] = 4242
+        d[7] = b''
+        d[8] = b''
+        self.assertEqual(w.unsigned_hash(4242), keccak(rlp.encode(d)))
+        self.assertEqual(w.unsigned_hash(), keccak(rlp.encode(d[:6])))
+
+
+    def test_invalid(self):
+        # trailing bytes
+        with self.assertRaises(ValueError):
+            LegacyTxWire(self.tx_raw + b'\x00')
+        # truncated
+        with self.assertRaises(ValueError):
+            LegacyTxWire(self.tx_raw[:-1])
+        # wrong field count
+        with self.assertRaises(ValueError):
+            LegacyTxWire(rlp.encode([b'\x01'] * 8))
+        # nested list
+        with self.assertRaises(ValueError):
+            LegacyTxWire(rlp.encode([b'\x01'] * 8 + [[]]))
+        # single byte encoded as string
+        with self.assertRaises(ValueError):
+            LegacyTxWire(b'\xca' + b'\x81\x01' + b'\x80' * 8)
+        # long length form for short list
+        with self.assertRaises(ValueError):
+            LegacyTxWire(b'\xf8\x09' + b'\x80' * 9)
+        # not a list
+        with self.assertRaises(ValueError):
+            LegacyTxWire(b'\x80')
+        with self.assertRaises(ValueError):
+            unpack_bytes(self.tx_raw + b'\x00', self.chain_spec)
+
+
+    def test_unpack(self):
+        tx = unpack_bytes(self.tx_raw, self.chain_spec)
+        self.assertEqual(tx['from'].hex(), self.address[2:].lower())
+        self.assertEqual(tx['hash'], self.tx_hash)
+        self.assertEqual(tx['data'], rlp.decode(self.tx_raw)[5])
+        self.assertIsInstance(tx['data'], bytes)
+
+
+    def test_unpack_legacy(self):
+        pk = coincurve.PrivateKey()
+        address = public_key_bytes_to_address(pk.public_key.format(compressed=False), result_format='bytes')
+        d = [42, 10**9, 21000, os.urandom(20), 1, b'']
+        sig = pk.sign_recoverable(keccak(rlp.encode(d)), hasher=None)
+        tx_raw = rlp.encode(d + [sig[64] + 27, sig[:32], sig[32:64]])
+        tx = unpack_bytes(tx_raw, self.chain_spec)
+        self.assertEqual(tx['from'], address)
+        self.assertEqual(tx['recovery_byte'], sig[64])
+
+
+    def test_typed(self):
+        pk = coincurve.PrivateKey()
+        access_list = [[os.urandom(20), [os.urandom(32), os.urandom(32)]], [os.urandom(20), []]]
+        d = [4242, 42, 10**9, 10**10, 21000, os.urandom(20), 1, b'\xde\xad', access_list]
+        unsigned_hash = keccak(b'\x02' + rlp.encode(d))
+        sig = pk.sign_recoverable(unsigned_hash, hasher=None)
+        tx_raw = b'\x02' + rlp.encode(d + [sig[64], sig[:32], sig[32:64]])
+
+        w = tx_wire(tx_raw)
+        self.assertIsInstance(w, TypedTxWire)
+        self.assertEqual(w.tx_type, 2)
+        self.assertEqual(w.int(3), 10**10)
+        self.assertEqual(w.signed_hash(), keccak(tx_raw))
+        self.assertEqual(w.unsigned_hash(), unsigned_hash)
+        self.assertEqual(w.access_list(), [(access_list[0][0], access_list[0][1],), (access_list[1][0], [],)])
+
+        tx = unpack_bytes(tx_raw, self.chain_spec)
+        self.assertEqual(tx['from'], public_key_bytes_to_address(pk.public_key.format(compressed=False), result_format='bytes'))
+        self.assertEqual(tx['type'], 2)
+        self.assertEqual(tx['maxPriorityFeePerGas'], 10**9)
+        self.assertEqual(tx['data'], b'\xde\xad')
+
+        d = [4242, 42, 10**9, 21000, b'', 1, b'', []]
+        tx_raw = b'\x01' + rlp.encode(d + [1, b'\x01', b'\x02'])
+        w = tx_wire(tx_raw)
+        self.assertEqual(w.tx_type, 1)
+        self.assertEqual(w.unsigned_hash(), keccak(b'\x01' + rlp.encode(d)))
+        self.assertEqual(w.access_list(), [])
+
+        # unknown type
+        with self.assertRaises(ValueError):
+            tx_wire(b'\x03' + rlp.encode(d + [1, b'\x01', b'\x02']))
+        # access list not a list
+        with self.assertRaises(ValueError):
+            tx_wire(b'\x01' + rlp.encode(d[:7] + [b''] + [1, b'\x01', b'\x02']))
+        # invalid access list address
+        with self.assertRaises(ValueError):
+            tx_wire(b'\x01' + rlp.encode(d[:7] + [[[b'\x01', []]]] + [1, b'\x01', b'\x02'])).access_list()
+
+
+if __name__ == '__main__':
+    unittest.main()